@@ -7,9 +7,13 @@
 
 from django.shortcuts import render, get_object_or_404
 from django.views.generic import ListView, DetailView
-from django.db.models import Q, F
+from django.db.models import Q
+from django.utils.decorators import method_decorator
 from .models import Post
+from content.utils.counters import engagement_counter
+from core.page_cache import cache_anonymous_page, page_cache
 
+@method_decorator(cache_anonymous_page, name='dispatch')
 class PostListView(ListView):
     model = Post
     template_name = 'blog/post_list.html'
@@ -29,7 +33,16 @@ class PostListView(ListView):
             )
         
         return queryset.order_by('-is_featured', '-published_at')
+    
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        page_cache.add_keys(
+            self.request, 'post-list',
+            *(f'post:{post.pk}' for post in context['posts'])
+        )
+        return context
 
+@method_decorator(cache_anonymous_page, name='dispatch')
 class PostDetailView(DetailView):
     model = Post
     template_name = 'blog/post_detail.html'
@@ -39,7 +52,13 @@ class PostDetailView(DetailView):
     
     def get_object(self):
         obj = get_object_or_404(Post, slug=self.kwargs['slug'], is_published=True)
-        # زيادة عدد المشاهدات
-        Post.objects.filter(pk=obj.pk).update(views_count=F('views_count') + 1)
+        # المشاهدات تُسجل من المتصفح عبر ajax/hit/ لتعمل مع الصفحات المخزنة
+        engagement_counter.apply_pending(obj)
         return obj
+    
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['page_hit'] = {'type': 'post', 'id': self.object.pk}
+        page_cache.add_keys(self.request, f'post:{self.object.pk}')
+        return context
 
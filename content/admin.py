@@ -4,6 +4,7 @@
 
 from django.contrib import admin
 from django.utils.translation import gettext_lazy as _
+from django.utils import timezone
 from django.utils.html import format_html
 from django.urls import reverse, path
 from django.shortcuts import render, redirect
@@ -12,9 +13,16 @@ from django.http import HttpResponse
 import csv
 import io
 
+from core.page_cache import page_cache
+from core.search import search_index
+from core.search.autocomplete import autocomplete
 from .models import (
-    Playlist, PlaylistItem, Tag, Comment, PlaylistItemTag
+    Playlist, PlaylistItem, Tag, Comment, PlaylistItemTag,
+    EngagementDaily, MediaMetadata, MediaSyncState
 )
+from .utils.playlist_index import playlist_index
+from .utils.playlist_manifest import playlist_manifest
+from .utils.playlist_stats import playlist_stats
 
 
 @admin.register(Playlist)
@@ -49,12 +57,17 @@ class PlaylistAdmin(admin.ModelAdmin):
             'fields': ('is_featured', 'is_published', 'allow_comments', 'order')
         }),
         (_('معلومات إضافية'), {
-            'fields': ('created_by', 'views_count'),
+            'fields': (
+                'created_by', 'views_count', 'published_items_count',
+                'total_duration', 'total_item_views'
+            ),
             'classes': ('collapse',)
         }),
     ]
     
-    readonly_fields = ['views_count']
+    readonly_fields = [
+        'views_count', 'published_items_count', 'total_duration', 'total_item_views'
+    ]
     
     def save_model(self, request, obj, form, change):
         if not change:  # إنشاء جديد
@@ -63,7 +76,7 @@ class PlaylistAdmin(admin.ModelAdmin):
     
     def items_count(self, obj):
         """عدد العناصر في القائمة"""
-        count = obj.playlistitem_set.filter(is_published=True).count()
+        count = obj.published_items_count
         url = reverse('admin:content_playlistitem_changelist') + f'?playlist__id__exact={obj.id}'
         return format_html(
             '<a href="{}" class="button">{} عنصر</a>',
@@ -86,15 +99,40 @@ class PlaylistAdmin(admin.ModelAdmin):
     def publish_playlists(self, request, queryset):
         """نشر القوائم"""
         updated = queryset.update(is_published=True)
+        self._refresh_category_stats(queryset)
+        self._refresh_search(queryset)
         self.message_user(request, _('تم نشر {} قائمة').format(updated))
     publish_playlists.short_description = _('نشر القوائم')
     
     def unpublish_playlists(self, request, queryset):
         """إلغاء نشر القوائم"""
         updated = queryset.update(is_published=False)
+        self._refresh_category_stats(queryset)
+        self._refresh_search(queryset)
         self.message_user(request, _('تم إلغاء نشر {} قائمة').format(updated))
     unpublish_playlists.short_description = _('إلغاء النشر')
     
+    def _refresh_category_stats(self, queryset):
+        """update() لا يُطلق الإشارات فيُعاد حساب عدد قوائم التصنيفات المتأثرة وتُبطل بيانات القوائم وصفحاتها هنا"""
+        playlist_ids = list(queryset.values_list('pk', flat=True))
+        category_ids = set(queryset.values_list('category_id', flat=True))
+        playlist_stats.refresh_categories(category_ids)
+        playlist_manifest.invalidate(*playlist_ids)
+        page_cache.purge(
+            'playlist-list',
+            *(f'category:{pk}' for pk in category_ids),
+            *(f'playlist:{pk}' for pk in playlist_ids),
+        )
+    
+    def _refresh_search(self, queryset):
+        """تحديث وثائق البحث والإكمال التلقائي للقوائم وعناصرها (update() لا يُطلق الإشارات)"""
+        for playlist in queryset.model.objects.filter(pk__in=queryset.values('pk')):
+            search_index.update(playlist)
+            search_index.update_playlist_items(playlist)
+            autocomplete.update(playlist)
+            for item in playlist.playlistitem_set.select_related('playlist'):
+                autocomplete.update(item)
+    
     def export_playlists(self, request, queryset):
         """تصدير القوائم إلى CSV"""
         response = HttpResponse(content_type='text/csv; charset=utf-8')
@@ -106,7 +144,7 @@ class PlaylistAdmin(admin.ModelAdmin):
             'Is Published', 'Views', 'Items Count', 'Created Date'
         ])
         
-        for playlist in queryset:
+        for playlist in queryset.select_related('category'):
             writer.writerow([
                 playlist.title,
                 playlist.category.name,
@@ -156,7 +194,7 @@ class PlaylistItemAdmin(admin.ModelAdmin):
             'fields': ('playlist', 'title', 'slug', 'content_type', 'thumbnail')
         }),
         (_('الوسائط'), {
-            'fields': ('youtube_url', 'soundcloud_url'),
+            'fields': ('youtube_url', 'soundcloud_url', 'duration'),
             'classes': ('collapse',)
         }),
         (_('المحتوى النصي'), {
@@ -206,15 +244,38 @@ class PlaylistItemAdmin(admin.ModelAdmin):
     def publish_items(self, request, queryset):
         """نشر العناصر"""
         updated = queryset.update(is_published=True)
+        self._refresh_playlist_stats(queryset)
+        self._refresh_search(queryset)
         self.message_user(request, _('تم نشر {} عنصر').format(updated))
     publish_items.short_description = _('نشر العناصر')
     
     def unpublish_items(self, request, queryset):
         """إلغاء نشر العناصر"""
         updated = queryset.update(is_published=False)
+        self._refresh_playlist_stats(queryset)
+        self._refresh_search(queryset)
         self.message_user(request, _('تم إلغاء نشر {} عنصر').format(updated))
     unpublish_items.short_description = _('إلغاء النشر')
     
+    def _refresh_playlist_stats(self, queryset):
+        """update() لا يُطلق الإشارات فيُعاد حساب إحصائيات القوائم المتأثرة وفهرسها وبيانها وتُبطل الصفحات هنا"""
+        item_ids = list(queryset.values_list('pk', flat=True))
+        playlist_ids = set(queryset.values_list('playlist_id', flat=True))
+        playlist_stats.refresh_playlists(playlist_ids)
+        playlist_index.invalidate(*playlist_ids)
+        playlist_manifest.invalidate(*playlist_ids)
+        page_cache.purge(
+            *(f'item:{pk}' for pk in item_ids),
+            *(f'playlist:{pk}' for pk in playlist_ids),
+        )
+    
+    def _refresh_search(self, queryset):
+        """تحديث وثائق البحث والإكمال التلقائي للعناصر (update() لا يُطلق الإشارات)"""
+        items = queryset.model.objects.filter(pk__in=queryset.values('pk'))
+        for item in search_index.item_queryset(items):
+            search_index.update(item)
+            autocomplete.update(item)
+    
     def export_items(self, request, queryset):
         """تصدير العناصر إلى CSV"""
         response = HttpResponse(content_type='text/csv; charset=utf-8')
@@ -418,6 +479,70 @@ class CommentAdmin(admin.ModelAdmin):
     mark_as_not_spam.short_description = _('ليس مزعج')
 
 
+@admin.register(EngagementDaily)
+class EngagementDailyAdmin(admin.ModelAdmin):
+    list_display = [
+        'playlist_item', 'day', 'views', 'youtube_downloads',
+        'soundcloud_downloads', 'text_copies', 'shares'
+    ]
+    list_filter = ['day']
+    search_fields = ['playlist_item__title']
+    date_hierarchy = 'day'
+    list_select_related = ['playlist_item', 'playlist_item__playlist']
+    
+    def has_add_permission(self, request):
+        """الصفوف تُنشأ تلقائياً من عدادات التفاعل"""
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(MediaMetadata)
+class MediaMetadataAdmin(admin.ModelAdmin):
+    list_display = ['provider', 'external_id', 'is_missing', 'fetched_at', 'expires_at', 'error_count']
+    list_filter = ['provider', 'is_missing']
+    search_fields = ['external_id', 'source_url']
+    readonly_fields = [
+        'provider', 'external_id', 'source_url', 'data', 'etag', 'is_missing',
+        'fetched_at', 'expires_at', 'error_count', 'last_error'
+    ]
+    actions = ['expire']
+    
+    def has_add_permission(self, request):
+        """السجلات تُنشأ تلقائياً عند جلب معلومات الوسائط"""
+        return False
+    
+    def expire(self, request, queryset):
+        """إنهاء الصلاحية ليُحدث السجل في القراءة التالية"""
+        updated = queryset.update(expires_at=timezone.now())
+        self.message_user(request, _('تم إنهاء صلاحية {} سجل').format(updated))
+    expire.short_description = _('تحديث من المزود في القراءة التالية')
+
+
+@admin.register(MediaSyncState)
+class MediaSyncStateAdmin(admin.ModelAdmin):
+    list_display = ['playlist_item', 'provider', 'last_status', 'last_synced_at', 'next_sync_at', 'failure_count']
+    list_filter = ['provider', 'last_status']
+    search_fields = ['playlist_item__title', 'source_url']
+    list_select_related = ['playlist_item', 'playlist_item__playlist']
+    readonly_fields = [
+        'playlist_item', 'provider', 'source_url', 'last_synced_at', 'last_status',
+        'failure_count', 'content_hash', 'next_sync_at'
+    ]
+    actions = ['sync_next_run']
+    
+    def has_add_permission(self, request):
+        """الحالات تُنشأ تلقائياً عند مزامنة الوسائط"""
+        return False
+    
+    def sync_next_run(self, request, queryset):
+        """جعل العناصر مستحقة في تشغيل المزامنة التالي"""
+        updated = queryset.update(next_sync_at=timezone.now())
+        self.message_user(request, _('ستُزامن {} عنصر في التشغيل التالي').format(updated))
+    sync_next_run.short_description = _('مزامنة في التشغيل التالي')
+
+
 # تحسين واجهة الإدارة
 admin.site.site_header = _('إدارة منصة المحتوى المتعدد الوسائط')
 admin.site.site_title = _('لوحة الإدارة')
@@ -67,18 +67,99 @@ class ContentConfig(AppConfig):
                 }
             )
             
-            # مهمة مزامنة معلومات الوسائط (أسبوعياً)
-            weekly_schedule, created = IntervalSchedule.objects.get_or_create(
-                every=7,
-                period=IntervalSchedule.DAYS,
+            # مهمة مزامنة معلومات الوسائط المستحقة ضمن ميزانية كل تشغيل (يومياً)
+            # update_or_create لتحديث التثبيتات السابقة (أسبوعياً مع batch_size=10)
+            PeriodicTask.objects.update_or_create(
+                name='مزامنة معلومات الوسائط',
+                defaults={
+                    'task': 'content.tasks.sync_media_info',
+                    'interval': schedule,
+                    'kwargs': json.dumps({}),
+                }
             )
             
+            # مهمة مطابقة إحصائيات القوائم المحسوبة مسبقاً (يومياً)
             PeriodicTask.objects.get_or_create(
-                name='مزامنة معلومات الوسائط',
+                name='مطابقة إحصائيات القوائم',
                 defaults={
-                    'task': 'content.tasks.sync_media_info',
-                    'interval': weekly_schedule,
-                    'kwargs': json.dumps({'batch_size': 10}),
+                    'task': 'content.tasks.reconcile_playlist_stats',
+                    'interval': schedule,
+                    'enabled': True
+                }
+            )
+            
+            # مهمة إعادة بناء التوصيات كاملة (يومياً)
+            PeriodicTask.objects.get_or_create(
+                name='إعادة بناء التوصيات',
+                defaults={
+                    'task': 'content.tasks.refresh_recommendations',
+                    'interval': schedule,
+                    'kwargs': json.dumps({'full': True}),
+                    'enabled': True
+                }
+            )
+            
+            # مهمة كتابة عدادات التفاعل المعلقة (كل دقيقة)
+            minute_schedule, created = IntervalSchedule.objects.get_or_create(
+                every=1,
+                period=IntervalSchedule.MINUTES,
+            )
+            
+            PeriodicTask.objects.get_or_create(
+                name='كتابة عدادات التفاعل',
+                defaults={
+                    'task': 'content.tasks.flush_engagement_counters',
+                    'interval': minute_schedule,
+                    'enabled': True
+                }
+            )
+            
+            # مهمة ضغط أحداث التحليلات (كل 5 دقائق)
+            five_minutes_schedule, created = IntervalSchedule.objects.get_or_create(
+                every=5,
+                period=IntervalSchedule.MINUTES,
+            )
+            
+            PeriodicTask.objects.get_or_create(
+                name='ضغط أحداث التحليلات',
+                defaults={
+                    'task': 'core.tasks.compact_analytics_events',
+                    'interval': five_minutes_schedule,
+                    'enabled': True
+                }
+            )
+            
+            # مهمة إعادة حساب لقطة لوحة التحكم (كل 10 دقائق)
+            ten_minutes_schedule, created = IntervalSchedule.objects.get_or_create(
+                every=10,
+                period=IntervalSchedule.MINUTES,
+            )
+            
+            PeriodicTask.objects.get_or_create(
+                name='إعادة حساب لقطة لوحة التحكم',
+                defaults={
+                    'task': 'core.tasks.rebuild_dashboard_snapshot',
+                    'interval': ten_minutes_schedule,
+                    'enabled': True
+                }
+            )
+            
+            # مهمة إعادة بناء فهرس الإكمال التلقائي لتحديث أوزان المشاهدات (كل 10 دقائق)
+            PeriodicTask.objects.get_or_create(
+                name='إعادة بناء فهرس الإكمال التلقائي',
+                defaults={
+                    'task': 'core.tasks.rebuild_autocomplete_index',
+                    'interval': ten_minutes_schedule,
+                    'enabled': True
+                }
+            )
+            
+            # مهمة تحديث التوصيات للعناصر المتغيرة (كل 10 دقائق)
+            PeriodicTask.objects.get_or_create(
+                name='تحديث التوصيات',
+                defaults={
+                    'task': 'content.tasks.refresh_recommendations',
+                    'interval': ten_minutes_schedule,
                     'enabled': True
                 }
             )
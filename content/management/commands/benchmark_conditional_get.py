@@ -0,0 +1,109 @@
+# content/management/commands/benchmark_conditional_get.py
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.urls import reverse
+import statistics
+import time
+
+from content.models import Playlist, PlaylistItem
+
+
+class Command(BaseCommand):
+    help = 'قياس أثر الطلبات الشرطية (ETag) على حجم الاستجابة وزمنها'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=50,
+            help='عدد الطلبات لكل رابط وكل حالة'
+        )
+        parser.add_argument(
+            '--url',
+            action='append',
+            dest='urls',
+            help='رابط للقياس (يمكن تكراره، مثل روابط التصدير؛ الافتراضي صفحات القائمة الأكثر مشاهدة)'
+        )
+        parser.add_argument(
+            '--user',
+            help='القياس كمستخدم مسجل (دون تخزين الصفحات) لمقارنة 304 ببناء الصفحة كاملة'
+        )
+
+    def handle(self, *args, **options):
+        urls = options['urls'] or self.default_urls()
+        if not urls:
+            raise CommandError('لا توجد قوائم منشورة للقياس، استخدم --url')
+
+        hosts = [host for host in settings.ALLOWED_HOSTS if host not in ('*', '')]
+        client = Client(HTTP_HOST=(hosts[0].lstrip('.') if hosts else 'localhost'))
+        if options['user']:
+            from django.contrib.auth.models import User
+            try:
+                client.force_login(User.objects.get(username=options['user']))
+            except User.DoesNotExist:
+                raise CommandError(f'المستخدم {options["user"]} غير موجود')
+        count = options['requests']
+
+        self.stdout.write(
+            f'{"الرابط":<50} {"الحالة":<10} {"البايتات":>10} {"الوسيط ms":>10} {"p95 ms":>8}'
+        )
+        totals = {'full': [0, 0.0], 'revalidate': [0, 0.0]}
+        for url in urls:
+            first = client.get(url)
+            if first.status_code != 200:
+                self.stdout.write(self.style.WARNING(f'{url}: {first.status_code}، تم التخطي'))
+                continue
+
+            validators = {}
+            if first.has_header('ETag'):
+                validators['HTTP_IF_NONE_MATCH'] = first['ETag']
+            if first.has_header('Last-Modified'):
+                validators['HTTP_IF_MODIFIED_SINCE'] = first['Last-Modified']
+            if not validators:
+                self.stdout.write(self.style.WARNING(f'{url}: لا توجد أدوات تحقق في الاستجابة'))
+
+            for mode, headers in (('full', {}), ('revalidate', validators)):
+                sizes, timings, statuses = [], [], set()
+                for _ in range(count):
+                    started = time.perf_counter()
+                    response = client.get(url, **headers)
+                    timings.append((time.perf_counter() - started) * 1000)
+                    sizes.append(len(response.content))
+                    statuses.add(response.status_code)
+
+                timings.sort()
+                p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+                totals[mode][0] += sum(sizes)
+                totals[mode][1] += sum(timings)
+                self.stdout.write(
+                    f'{url[:50]:<50} {mode:<10} {statistics.mean(sizes):>10,.0f} '
+                    f'{statistics.median(timings):>10.2f} {p95:>8.2f}  {sorted(statuses)}'
+                )
+
+        full_bytes, full_time = totals['full']
+        revalidate_bytes, revalidate_time = totals['revalidate']
+        if full_bytes and full_time:
+            self.stdout.write(self.style.SUCCESS(
+                f'=> البايتات: {full_bytes:,} مقابل {revalidate_bytes:,} '
+                f'(توفير {100 * (1 - revalidate_bytes / full_bytes):.1f}%)، '
+                f'الزمن: {full_time:.0f} ms مقابل {revalidate_time:.0f} ms '
+                f'(أسرع {full_time / max(revalidate_time, 1e-9):.1f}x)'
+            ))
+
+    def default_urls(self):
+        playlist = Playlist.objects.filter(
+            is_published=True, published_items_count__gt=0
+        ).order_by('-views_count').first()
+        if playlist is None:
+            return []
+
+        urls = [reverse('content:playlist_list'), playlist.get_absolute_url()]
+        item = PlaylistItem.objects.filter(
+            playlist=playlist, is_published=True
+        ).select_related('playlist').order_by('order', 'created_at').first()
+        if item is not None:
+            urls.append(item.get_absolute_url())
+
+        return urls
@@ -0,0 +1,121 @@
+# content/management/commands/benchmark_media_metadata.py
+
+from concurrent.futures import ThreadPoolExecutor
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+import time
+
+from content.models import MediaMetadata
+from content.utils.media_utils import youtube_handler
+from content.utils.youtube_stub import YouTubeStubServer
+from core.rate_limit import rate_limiter
+
+
+class Command(BaseCommand):
+    help = 'قياس مخزن معلومات الوسائط (دمج الطلبات، القراءة المخزنة، التحديث في الخلفية) على خادم محلي بديل'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--burst',
+            type=int,
+            default=50,
+            help='عدد الطلبات المتزامنة للفيديو نفسه'
+        )
+        parser.add_argument(
+            '--reads',
+            type=int,
+            default=500,
+            help='عدد القراءات المتتالية من المخزن'
+        )
+        parser.add_argument(
+            '--latency',
+            type=float,
+            default=0.1,
+            help='زمن استجابة الخادم البديل لكل طلب (ثواني)'
+        )
+
+    def handle(self, *args, **options):
+        burst = options['burst']
+        video_id = f'bm{time.time_ns() % 10 ** 9:09d}'
+
+        original = youtube_handler.api_key, youtube_handler.api_base_url
+        original_limits = rate_limiter.limits
+        rate_limiter.limits = {**original_limits, 'youtube': 1000}
+        rate_limiter.reset('youtube')
+        try:
+            with YouTubeStubServer(options['latency']) as stub:
+                youtube_handler.api_key = 'stub'
+                youtube_handler.api_base_url = stub.base_url
+
+                # الطريقة القديمة: كل طلب يمر إلى المزود
+                result = self.run_burst(stub, burst, lambda: youtube_handler.fetch_video(video_id))
+                self.report('بلا مخزن', burst, result)
+
+                # مخزن فارغ: موجة طلبات متزامنة تنتظر جلباً واحداً
+                result = self.run_burst(stub, burst, lambda: youtube_handler.get_video_info(video_id))
+                self.report('مخزن بارد', burst, result)
+
+                # قراءات من سجل صالح
+                result = self.run_burst(
+                    stub, options['reads'], lambda: youtube_handler.get_video_info(video_id), workers=1
+                )
+                self.report('مخزن صالح', options['reads'], result)
+
+                # سجل منتهي الصلاحية: النسخة القديمة فوراً وتحديث شرطي واحد في الخلفية
+                MediaMetadata.objects.filter(provider='youtube', external_id=video_id).update(
+                    expires_at=timezone.now()
+                )
+                result = self.run_burst(stub, burst, lambda: youtube_handler.get_video_info(video_id))
+                self.wait_for_refresh(video_id)
+                result['requests'] = stub.requests - result['before'][0]
+                result['not_modified'] = stub.not_modified - result['before'][1]
+                self.report('مخزن قديم', burst, result)
+
+                row = MediaMetadata.objects.get(provider='youtube', external_id=video_id)
+                self.stdout.write(self.style.SUCCESS(
+                    f'=> موجة {burst} طلباً: {result["requests"]} طلب للمزود '
+                    f'(304: {result["not_modified"]})، السجل صالح حتى {row.expires_at:%H:%M:%S}'
+                ))
+        finally:
+            youtube_handler.api_key, youtube_handler.api_base_url = original
+            rate_limiter.limits = original_limits
+            rate_limiter.reset('youtube')
+            MediaMetadata.objects.filter(provider='youtube', external_id=video_id).delete()
+
+    def run_burst(self, stub, count, func, workers=None):
+        def call(_):
+            started = time.perf_counter()
+            try:
+                func()
+            finally:
+                connection.close()
+            return time.perf_counter() - started
+
+        before = stub.requests, stub.not_modified
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers or count) as executor:
+            latencies = sorted(executor.map(call, range(count)))
+        return {
+            'before': before,
+            'elapsed': time.perf_counter() - started,
+            'requests': stub.requests - before[0],
+            'not_modified': stub.not_modified - before[1],
+            'p50_ms': latencies[len(latencies) // 2] * 1000,
+            'max_ms': latencies[-1] * 1000,
+        }
+
+    def wait_for_refresh(self, video_id, timeout=10):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            row = MediaMetadata.objects.get(provider='youtube', external_id=video_id)
+            if row.expires_at > timezone.now():
+                return
+            time.sleep(0.05)
+
+    def report(self, label, count, result):
+        self.stdout.write(
+            f'{label:<10} {count:>5} طلب في {result["elapsed"]:>6.2f} ث، '
+            f'الوسيط {result["p50_ms"]:>7.2f} ms، الأقصى {result["max_ms"]:>7.2f} ms، '
+            f'طلبات المزود: {result["requests"]} (304: {result["not_modified"]})'
+        )
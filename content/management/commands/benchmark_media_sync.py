@@ -0,0 +1,152 @@
+# content/management/commands/benchmark_media_sync.py
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from io import StringIO
+import time
+
+from content.models import Playlist, PlaylistItem
+from content.utils.media_utils import youtube_handler
+from content.utils.youtube_stub import YouTubeStubServer
+from core.models import Category
+from core.rate_limit import rate_limiter
+
+
+class Command(BaseCommand):
+    help = 'قياس مزامنة YouTube (لكل عنصر، دفعات، دفعات متوازية) على خادم محلي بديل'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--items',
+            type=int,
+            default=1000,
+            help='عدد العناصر المؤقتة (تُحذف بعد القياس)'
+        )
+        parser.add_argument(
+            '--latency',
+            type=float,
+            default=0.02,
+            help='زمن استجابة الخادم البديل لكل طلب (ثواني)'
+        )
+        parser.add_argument(
+            '--missing-ratio',
+            type=float,
+            default=0.02,
+            help='نسبة الفيديوهات غير الموجودة'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=8,
+            help='عدد الطلبات المتزامنة في وضع الدفعات المتوازي'
+        )
+        parser.add_argument(
+            '--rate',
+            type=float,
+            default=50,
+            help='حد معدل youtube المضبوط في المحدد (طلب/ثانية)'
+        )
+        parser.add_argument(
+            '--stub-rate',
+            type=int,
+            default=0,
+            help='حد معدل الخادم البديل، يرفض ما يزيد بـ 429 (0 = بلا حد)'
+        )
+        parser.add_argument(
+            '--per-item-limit',
+            type=int,
+            default=200,
+            help='أقصى عدد عناصر لقياس الطريقة القديمة (تُقدر البقية نسبياً)'
+        )
+
+    def handle(self, *args, **options):
+        count = options['items']
+        per_item_count = min(count, options['per_item_limit'])
+
+        original = youtube_handler.api_key, youtube_handler.api_base_url
+        original_limits = rate_limiter.limits
+        rate_limiter.limits = {**original_limits, 'youtube': options['rate']}
+        try:
+            with YouTubeStubServer(
+                options['latency'], options['missing_ratio'], options['stub_rate']
+            ) as stub, transaction.atomic():
+                youtube_handler.api_key = 'stub'
+                youtube_handler.api_base_url = stub.base_url
+
+                runs = [
+                    ('لكل عنصر', per_item_count, ['--per-item']),
+                    ('دفعات', count, ['--full', '--workers', '1']),
+                    (f'دفعات x{options["workers"]}', count, ['--full', '--workers', str(options['workers'])]),
+                ]
+                results = []
+                for label, run_count, arguments in runs:
+                    playlist = self.create_playlist(run_count)
+                    result = self.run(stub, playlist, arguments)
+                    results.append((label, run_count, playlist, result))
+                    self.report(label, run_count, result)
+
+                per_item_rate = per_item_count / max(results[0][3]['elapsed'], 1e-9)
+                _, _, playlist, best = results[-1]
+                best_rate = count / max(best['elapsed'], 1e-9)
+                self.stdout.write(self.style.SUCCESS(
+                    f'=> {count} عنصر: ~{count / per_item_rate:.1f} ث لكل عنصر مقابل {best["elapsed"]:.1f} ث '
+                    f'(أسرع {best_rate / per_item_rate:.1f}x)، وحدات الحصة {count} مقابل {best["quota_units"]}'
+                ))
+
+                # التحقق من تطبيق النتائج الجزئية
+                updated = PlaylistItem.objects.filter(playlist=playlist, duration__gt=0).count()
+                missing = sum(
+                    stub.is_missing(video_id) for video_id in
+                    PlaylistItem.objects.filter(playlist=playlist).values_list('youtube_video_id', flat=True)
+                )
+                self.stdout.write(f'محدثة {updated}، غير موجودة {missing}، المجموع {updated + missing}/{count}')
+
+                transaction.set_rollback(True)
+        finally:
+            youtube_handler.api_key, youtube_handler.api_base_url = original
+            rate_limiter.limits = original_limits
+            rate_limiter.reset('youtube')
+
+    def create_playlist(self, count):
+        user = User.objects.filter(is_superuser=True).first() or User.objects.create(
+            username=f'benchmark-media-sync-{time.time_ns()}'
+        )
+        category = Category.objects.create(
+            name='benchmark media sync', slug=f'benchmark-media-sync-{time.time_ns()}'
+        )
+        playlist = Playlist.objects.create(
+            title='benchmark media sync', slug=f'benchmark-media-sync-{time.time_ns()}',
+            category=category, created_by=user, is_published=False
+        )
+        PlaylistItem.objects.bulk_create([
+            PlaylistItem(
+                playlist=playlist, title='', slug=f'item-{index}', content_type='youtube', order=index,
+                youtube_url=f'https://www.youtube.com/watch?v={playlist.pk:02d}{index:09d}', is_published=False,
+            )
+            for index in range(count)
+        ])
+        return playlist
+
+    def run(self, stub, playlist, arguments):
+        rate_limiter.reset('youtube')
+        before = stub.requests, stub.quota_units, stub.throttled
+        started = time.perf_counter()
+        call_command(
+            'sync_media_info', '--type', 'youtube', '--playlist-id', str(playlist.pk), *arguments,
+            stdout=StringIO()
+        )
+        return {
+            'elapsed': time.perf_counter() - started,
+            'requests': stub.requests - before[0],
+            'quota_units': stub.quota_units - before[1],
+            'throttled': stub.throttled - before[2],
+        }
+
+    def report(self, label, count, result):
+        self.stdout.write(
+            f'{label:<12} {count:>6} عنصر في {result["elapsed"]:>7.2f} ث '
+            f'= {count / max(result["elapsed"], 1e-9):>8,.1f} عنصر/ث، طلبات API: {result["requests"]} '
+            f'(429: {result["throttled"]})'
+        )
@@ -0,0 +1,126 @@
+# content/management/commands/benchmark_sync_scheduler.py
+
+from datetime import timedelta
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from io import StringIO
+import time
+
+from content.models import MediaSyncState, PlaylistItem
+from content.utils.media_utils import youtube_handler
+from content.utils.youtube_stub import YouTubeStubServer
+from core.rate_limit import rate_limiter
+from .benchmark_media_sync import Command as MediaSyncBenchmark
+
+
+class Command(BaseCommand):
+    help = 'قياس المزامنة التزايدية: كلفة كل تشغيل مقابل ما تغير على خادم YouTube محلي بديل'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--items',
+            type=int,
+            default=5000,
+            help='عدد العناصر المؤقتة (تُحذف بعد القياس)'
+        )
+        parser.add_argument(
+            '--changed-ratio',
+            type=float,
+            default=0.05,
+            help='نسبة العناصر التي يتغير رابطها أو يحين موعدها بين التشغيلين'
+        )
+        parser.add_argument(
+            '--budget',
+            type=int,
+            default=20,
+            help='ميزانية التشغيل المحدود بوحدات طلبات YouTube'
+        )
+        parser.add_argument(
+            '--latency',
+            type=float,
+            default=0.02,
+            help='زمن استجابة الخادم البديل لكل طلب (ثواني)'
+        )
+
+    def handle(self, *args, **options):
+        count = options['items']
+        changed = max(1, int(count * options['changed_ratio']))
+
+        original = youtube_handler.api_key, youtube_handler.api_base_url
+        original_limits = rate_limiter.limits
+        rate_limiter.limits = {**original_limits, 'youtube': 1000}
+        try:
+            with YouTubeStubServer(options['latency'], missing_ratio=0.02) as stub, transaction.atomic():
+                youtube_handler.api_key = 'stub'
+                youtube_handler.api_base_url = stub.base_url
+                playlist = MediaSyncBenchmark().create_playlist(count)
+                items = PlaylistItem.objects.filter(playlist=playlist)
+
+                # شعبية متفاوتة ليظهر ترتيب الأولوية في التشغيل المحدود
+                items.update(views_count=F('order') % 1000)
+
+                self.report('أول تشغيل', self.run(stub, playlist))
+                self.report('دون تغيير', self.run(stub, playlist))
+
+                # تغير روابط بعض العناصر وحلول موعد بعضها الآخر
+                pks = list(items.order_by('?').values_list('pk', flat=True)[:changed * 2])
+                for item in items.filter(pk__in=pks[:changed]):
+                    item.youtube_url = f'https://www.youtube.com/watch?v=n{item.pk:010d}'
+                    item.youtube_video_id = ''
+                    item.save(update_fields=['youtube_url', 'youtube_video_id'])
+                MediaSyncState.objects.filter(playlist_item_id__in=pks[changed:]).update(
+                    next_sync_at=F('next_sync_at') - timedelta(days=365)
+                )
+                self.report(f'تغير {len(pks)}', self.run(stub, playlist))
+
+                # تشغيل محدود الميزانية: الأكثر مشاهدة أولاً
+                MediaSyncState.objects.filter(playlist_item__playlist=playlist).update(
+                    next_sync_at=F('next_sync_at') - timedelta(days=365)
+                )
+                result = self.run(stub, playlist, ['--budget', str(options['budget'])])
+                self.report(f'ميزانية {options["budget"]}', result)
+                synced = items.filter(sync_states__last_synced_at__gte=result['since'])
+                views = sorted(synced.values_list('views_count', flat=True))
+                self.stdout.write(
+                    f'مزامنة {len(views)} عنصر، أقل مشاهدات بينها {views[0] if views else 0} '
+                    f'(أعلى مشاهدات في القائمة {items.order_by("-views_count").first().views_count})'
+                )
+
+                # الطريقة السابقة: كل العناصر في كل تشغيل
+                self.report('كامل', self.run(stub, playlist, ['--full']))
+
+                self.stdout.write(self.style.SUCCESS(
+                    f'=> الكلفة تتبع التغيير: {count} عنصر، التشغيل دون تغيير 0 طلب، '
+                    f'وتغير {len(pks)} عنصر يكلف {-(-len(pks) // youtube_handler.MAX_IDS_PER_REQUEST)} طلب تقريباً'
+                ))
+                transaction.set_rollback(True)
+        finally:
+            youtube_handler.api_key, youtube_handler.api_base_url = original
+            rate_limiter.limits = original_limits
+            rate_limiter.reset('youtube')
+
+    def run(self, stub, playlist, arguments=()):
+        before = stub.requests
+        since = timezone.now()
+        started = time.perf_counter()
+        call_command(
+            'sync_media_info', '--type', 'youtube', '--playlist-id', str(playlist.pk), *arguments,
+            stdout=StringIO()
+        )
+        return {
+            'since': since,
+            'elapsed': time.perf_counter() - started,
+            'requests': stub.requests - before,
+            'synced': MediaSyncState.objects.filter(
+                playlist_item__playlist=playlist, last_synced_at__gte=since
+            ).count(),
+        }
+
+    def report(self, label, result):
+        self.stdout.write(
+            f'{label:<12} عناصر مُزامنة {result["synced"]:>6} في {result["elapsed"]:>6.2f} ث، '
+            f'طلبات API: {result["requests"]}'
+        )
@@ -0,0 +1,42 @@
+# content/management/commands/build_recommendations.py
+
+from django.core.management.base import BaseCommand
+from django.utils.dateparse import parse_datetime
+import time
+
+from content.utils.recommendations import recommender
+
+
+class Command(BaseCommand):
+    help = 'بناء توصيات العناصر والقوائم من تشارك العلامات (كامل أو تزايدي)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='إعادة بناء كل التوصيات بدلاً من تحديث العناصر المتغيرة فقط'
+        )
+        parser.add_argument(
+            '--since',
+            help='تحديث العناصر المتغيرة منذ هذا التاريخ (ISO 8601) بدلاً من آخر تشغيل'
+        )
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            since = parse_datetime(options['since'])
+            if since is None:
+                self.stderr.write(self.style.ERROR('تاريخ غير صالح'))
+                return
+
+        started = time.perf_counter()
+        if options['full']:
+            stats = recommender.rebuild()
+        else:
+            stats = recommender.refresh(since)
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(self.style.SUCCESS(
+            f"تم تحديث {stats['refreshed']} عنصر ({stats['item_rows']} توصية عنصر، "
+            f"{stats['playlist_rows']} توصية قائمة) في {elapsed * 1000:.0f} ms"
+        ))
@@ -0,0 +1,160 @@
+# content/management/commands/cleanup_media.py
+
+from django.core.management.base import BaseCommand
+from django.core.files.storage import default_storage
+from content.models import PlaylistItem
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'تنظيف الملفات الغير مستخدمة'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='عرض الملفات فقط بدون حذف'
+        )
+        
+        parser.add_argument(
+            '--older-than',
+            type=int,
+            default=30,
+            help='حذف الملفات الأقدم من عدد الأيام المحدد'
+        )
+    
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        older_than_days = options['older_than']
+        
+        self.stdout.write('بحث عن الملفات الغير مستخدمة...')
+        
+        # البحث عن الصور المصغرة الغير مستخدمة
+        unused_thumbnails = self.find_unused_thumbnails()
+        
+        # البحث عن ملفات التحميل القديمة
+        old_downloads = self.find_old_downloads(older_than_days)
+        
+        total_files = len(unused_thumbnails) + len(old_downloads)
+        
+        if total_files == 0:
+            self.stdout.write(
+                self.style.SUCCESS('لا توجد ملفات للتنظيف')
+            )
+            return
+        
+        self.stdout.write(
+            f'تم العثور على {total_files} ملف للتنظيف:'
+        )
+        self.stdout.write(f'  - {len(unused_thumbnails)} صورة مصغرة غير مستخدمة')
+        self.stdout.write(f'  - {len(old_downloads)} ملف تحميل قديم')
+        
+        if dry_run:
+            self.stdout.write('\n--- الملفات التي سيتم حذفها (وضع الاختبار) ---')
+            
+            for file_path in unused_thumbnails:
+                self.stdout.write(f'  صورة: {file_path}')
+            
+            for file_path in old_downloads:
+                self.stdout.write(f'  تحميل: {file_path}')
+                
+            self.stdout.write('\nلتنفيذ الحذف الفعلي، استخدم الأمر بدون --dry-run')
+            return
+        
+        # تنفيذ الحذف
+        deleted_count = 0
+        
+        for file_path in unused_thumbnails + old_downloads:
+            try:
+                if default_storage.exists(file_path):
+                    default_storage.delete(file_path)
+                    deleted_count += 1
+                    
+            except Exception as e:
+                logger.error(f'خطأ في حذف الملف {file_path}: {e}')
+        
+        self.stdout.write(
+            self.style.SUCCESS(f'تم حذف {deleted_count} ملف بنجاح')
+        )
+    
+    def find_unused_thumbnails(self):
+        """البحث عن الصور المصغرة الغير مستخدمة"""
+        unused_files = []
+        
+        try:
+            # مسارات الصور المصغرة
+            thumbnail_dirs = [
+                'youtube_thumbnails',
+                'soundcloud_artworks',
+                'playlist_items'
+            ]
+            
+            for dir_name in thumbnail_dirs:
+                if default_storage.exists(dir_name):
+                    files = default_storage.listdir(dir_name)[1]  # الملفات فقط
+                    
+                    for filename in files:
+                        file_path = f'{dir_name}/{filename}'
+                        
+                        # التحقق من استخدام الملف
+                        if not self.is_thumbnail_used(file_path):
+                            unused_files.append(file_path)
+                            
+        except Exception as e:
+            logger.error(f'خطأ في البحث عن الصور الغير مستخدمة: {e}')
+        
+        return unused_files
+    
+    def find_old_downloads(self, days):
+        """البحث عن ملفات التحميل القديمة"""
+        from datetime import datetime, timedelta
+        
+        old_files = []
+        cutoff_date = datetime.now() - timedelta(days=days)
+        
+        try:
+            download_dirs = ['downloads/youtube', 'downloads/soundcloud']
+            
+            for dir_name in download_dirs:
+                if default_storage.exists(dir_name):
+                    files = default_storage.listdir(dir_name)[1]
+                    
+                    for filename in files:
+                        file_path = f'{dir_name}/{filename}'
+                        
+                        try:
+                            # التحقق من تاريخ الملف
+                            file_time = default_storage.get_modified_time(file_path)
+                            
+                            if file_time < cutoff_date:
+                                old_files.append(file_path)
+                                
+                        except Exception:
+                            # إذا فشل في الحصول على التاريخ، أضفه للقائمة
+                            old_files.append(file_path)
+                            
+        except Exception as e:
+            logger.error(f'خطأ في البحث عن الملفات القديمة: {e}')
+        
+        return old_files
+    
+    def is_thumbnail_used(self, file_path):
+        """التحقق من استخدام الصورة المصغرة"""
+        try:
+            # البحث في قواعد البيانات
+            filename = os.path.basename(file_path)
+            
+            used_in_items = PlaylistItem.objects.filter(
+                thumbnail__contains=filename
+            ).exists()
+            
+            # يمكن إضافة المزيد من الفحوصات هنا
+            
+            return used_in_items
+            
+        except Exception as e:
+            logger.error(f'خطأ في فحص استخدام الملف {file_path}: {e}')
+            return True  # احتياطي: لا تحذف إذا لم تتأكد
@@ -0,0 +1,22 @@
+# content/management/commands/flush_engagement_counters.py
+
+from django.core.management.base import BaseCommand
+from content.utils.counters import engagement_counter
+
+
+class Command(BaseCommand):
+    help = 'كتابة عدادات التفاعل المعلقة (المشاهدات والتحميلات) في قاعدة البيانات'
+    
+    def handle(self, *args, **options):
+        total = 0
+        
+        # الكتابة على دفعات حتى يفرغ السجل (بحد أقصى للدورات)
+        for _ in range(100):
+            flushed = engagement_counter.flush()
+            if not flushed:
+                break
+            total += flushed
+        
+        self.stdout.write(
+            self.style.SUCCESS(f'تمت كتابة {total} زيادة معلقة')
+        )
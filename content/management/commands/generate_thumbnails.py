@@ -0,0 +1,127 @@
+# content/management/commands/generate_thumbnails.py
+
+from django.core.management.base import BaseCommand
+from django.conf import settings
+from content.models import PlaylistItem
+from content.utils.media_fetcher import media_fetcher
+from content.utils.media_utils import youtube_handler, soundcloud_handler
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'إنشاء صور مصغرة للوسائط المحلية'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--regenerate',
+            action='store_true',
+            help='إعادة إنشاء الصور الموجودة'
+        )
+        
+        parser.add_argument(
+            '--video-timestamp',
+            default='00:00:05',
+            help='الوقت لاستخراج الصورة من الفيديو'
+        )
+        
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=settings.MEDIA_FETCH_WORKERS,
+            help='عدد التنزيلات المتزامنة'
+        )
+    
+    def handle(self, *args, **options):
+        regenerate = options['regenerate']
+        
+        # العناصر التي تحتاج صور مصغرة
+        items = PlaylistItem.objects.filter(
+            content_type__in=['youtube', 'soundcloud', 'mixed']
+        )
+        
+        if not regenerate:
+            items = items.filter(thumbnail='')
+        
+        total_items = items.count()
+        
+        if total_items == 0:
+            self.stdout.write(
+                self.style.WARNING('لا توجد عناصر تحتاج صور مصغرة')
+            )
+            return
+        
+        self.stdout.write(
+            self.style.SUCCESS(f'بدء إنشاء {total_items} صورة مصغرة...')
+        )
+        
+        success_count = 0
+        error_count = 0
+        
+        # التنزيل بالتوازي ضمن حد معدل media-download، والحفظ في الخيط الرئيسي
+        workers = max(1, options['workers'])
+        items = list(items.order_by('pk'))
+        for start in range(0, len(items), workers * 4):
+            chunk = items[start:start + workers * 4]
+            paths = media_fetcher.map(self.fetch_thumbnail, chunk, workers=workers)
+            
+            for item, thumbnail_path in zip(chunk, paths):
+                try:
+                    if thumbnail_path:
+                        item.thumbnail = thumbnail_path
+                        item.save()
+                        success_count += 1
+                        
+                        if options['verbosity'] >= 2:
+                            self.stdout.write(
+                                self.style.SUCCESS(f'✓ {item.title}')
+                            )
+                    else:
+                        error_count += 1
+                        
+                except Exception as e:
+                    error_count += 1
+                    logger.error(f'خطأ في إنشاء صورة مصغرة للعنصر {item.id}: {e}')
+        
+        # النتائج
+        self.stdout.write('\n' + '='*50)
+        self.stdout.write(
+            self.style.SUCCESS(f'تم إنشاء {success_count} صورة مصغرة بنجاح')
+        )
+        
+        if error_count > 0:
+            self.stdout.write(
+                self.style.ERROR(f'فشل في إنشاء {error_count} صورة')
+            )
+    
+    def fetch_thumbnail(self, item):
+        """تنزيل صورة مصغرة لعنصر وإرجاع مسارها (دون حفظ العنصر)"""
+        # صورة YouTube
+        if item.youtube_video_id:
+            try:
+                thumbnail_path = youtube_handler.download_thumbnail(
+                    item.youtube_video_id,
+                    f'auto_youtube_{item.youtube_video_id}'
+                )
+                if thumbnail_path:
+                    return thumbnail_path
+                    
+            except Exception as e:
+                logger.error(f'خطأ في تحميل صورة YouTube: {e}')
+        
+        # صورة SoundCloud
+        if item.soundcloud_url:
+            try:
+                info = soundcloud_handler.extract_track_info(item.soundcloud_url)
+                
+                if info and info.get('artwork_url'):
+                    return soundcloud_handler.download_artwork(
+                        info['artwork_url'],
+                        f'auto_soundcloud_{item.id}'
+                    )
+                    
+            except Exception as e:
+                logger.error(f'خطأ في تحميل صورة SoundCloud: {e}')
+        
+        return None
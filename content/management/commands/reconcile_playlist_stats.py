@@ -0,0 +1,40 @@
+# content/management/commands/reconcile_playlist_stats.py
+
+from django.core.management.base import BaseCommand
+from content.utils.playlist_stats import playlist_stats
+
+
+class Command(BaseCommand):
+    help = 'مطابقة إحصائيات القوائم والتصنيفات المحسوبة مسبقاً مع البيانات الفعلية وتصحيح الانحراف'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='عرض الانحراف فقط دون تصحيح'
+        )
+    
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        playlist_drift, category_drift = playlist_stats.reconcile(fix=not dry_run)
+        
+        if options['verbosity'] >= 2:
+            for row, values in playlist_drift:
+                changes = ', '.join(
+                    f'{field}: {row[field]} -> {value}'
+                    for field, value in values.items() if row[field] != value
+                )
+                self.stdout.write(f"قائمة {row['pk']} ({row['title']}): {changes}")
+            
+            for row, values in category_drift:
+                self.stdout.write(
+                    f"تصنيف {row['pk']} ({row['name']}): "
+                    f"{row['published_playlists_count']} -> {values['published_playlists_count']}"
+                )
+        
+        action = 'تم العثور على' if dry_run else 'تم تصحيح'
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'{action} {len(playlist_drift)} قائمة و{len(category_drift)} تصنيف'
+            )
+        )
@@ -0,0 +1,34 @@
+# Generated by Django 5.0.6 on 2026-10-17 03:08
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EngagementDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='اليوم')),
+                ('views', models.PositiveIntegerField(default=0, verbose_name='المشاهدات')),
+                ('youtube_downloads', models.PositiveIntegerField(default=0, verbose_name='تحميلات يوتيوب')),
+                ('soundcloud_downloads', models.PositiveIntegerField(default=0, verbose_name='تحميلات ساوندكلاود')),
+                ('text_copies', models.PositiveIntegerField(default=0, verbose_name='نسخ النص')),
+                ('shares', models.PositiveIntegerField(default=0, verbose_name='المشاركات')),
+                ('playlist_item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='content.playlistitem', verbose_name='العنصر')),
+            ],
+            options={
+                'verbose_name': 'تفاعل يومي',
+                'verbose_name_plural': 'التفاعل اليومي',
+                'ordering': ['-day'],
+                'indexes': [models.Index(fields=['day', 'playlist_item'], name='content_engagement_day_idx')],
+                'unique_together': {('playlist_item', 'day')},
+            },
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.0.6 on 2026-10-17 03:29
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def populate_stats(apps, schema_editor):
+    """حساب الإحصائيات المحسوبة مسبقاً للبيانات الموجودة"""
+    Playlist = apps.get_model('content', 'Playlist')
+    PlaylistItem = apps.get_model('content', 'PlaylistItem')
+    Category = apps.get_model('core', 'Category')
+
+    rows = PlaylistItem.objects.filter(is_published=True).order_by().values('playlist_id').annotate(
+        count=Count('id'), views=Sum('views_count')
+    )
+    for row in rows:
+        Playlist.objects.filter(pk=row['playlist_id']).update(
+            published_items_count=row['count'], total_item_views=row['views'] or 0
+        )
+
+    rows = Playlist.objects.filter(is_published=True).order_by().values('category_id').annotate(
+        count=Count('id')
+    )
+    for row in rows:
+        Category.objects.filter(pk=row['category_id']).update(published_playlists_count=row['count'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0002_engagementdaily'),
+        ('core', '0005_category_published_playlists_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='playlist',
+            name='published_items_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='عدد العناصر المنشورة'),
+        ),
+        migrations.AddField(
+            model_name='playlist',
+            name='total_duration',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='المدة الإجمالية (ثواني)'),
+        ),
+        migrations.AddField(
+            model_name='playlist',
+            name='total_item_views',
+            field=models.PositiveBigIntegerField(default=0, editable=False, verbose_name='مشاهدات العناصر'),
+        ),
+        migrations.AddField(
+            model_name='playlistitem',
+            name='duration',
+            field=models.PositiveIntegerField(default=0, verbose_name='المدة (ثواني)'),
+        ),
+        migrations.RunPython(populate_stats, migrations.RunPython.noop),
+    ]
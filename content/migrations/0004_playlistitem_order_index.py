@@ -0,0 +1,17 @@
+# Generated by Django 5.0.6 on 2026-10-17 03:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0003_playlist_stats'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='playlistitem',
+            index=models.Index(fields=['playlist', 'order', 'created_at', 'id'], name='content_item_order_idx'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.0.6 on 2026-10-17 03:38
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0004_playlistitem_order_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ItemRecommendation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.PositiveSmallIntegerField(verbose_name='الترتيب')),
+                ('score', models.FloatField(verbose_name='الدرجة')),
+                ('playlist_item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recommendations', to='content.playlistitem', verbose_name='العنصر')),
+                ('recommended', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='content.playlistitem', verbose_name='العنصر المقترح')),
+            ],
+            options={
+                'verbose_name': 'توصية عنصر',
+                'verbose_name_plural': 'توصيات العناصر',
+                'ordering': ['playlist_item', 'rank'],
+                'unique_together': {('playlist_item', 'rank')},
+            },
+        ),
+        migrations.CreateModel(
+            name='PlaylistRecommendation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.PositiveSmallIntegerField(verbose_name='الترتيب')),
+                ('score', models.FloatField(verbose_name='الدرجة')),
+                ('playlist', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recommendations', to='content.playlist', verbose_name='القائمة')),
+                ('recommended', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='content.playlist', verbose_name='القائمة المقترحة')),
+            ],
+            options={
+                'verbose_name': 'توصية قائمة',
+                'verbose_name_plural': 'توصيات القوائم',
+                'ordering': ['playlist', 'rank'],
+                'unique_together': {('playlist', 'rank')},
+            },
+        ),
+    ]
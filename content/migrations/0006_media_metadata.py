@@ -0,0 +1,35 @@
+# Generated by Django 5.0.6 on 2026-10-17 03:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0005_recommendations'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaMetadata',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('provider', models.CharField(choices=[('youtube', 'YouTube'), ('soundcloud', 'SoundCloud')], max_length=20, verbose_name='المزود')),
+                ('external_id', models.CharField(max_length=64, verbose_name='المعرف الخارجي')),
+                ('source_url', models.URLField(blank=True, max_length=500, verbose_name='الرابط')),
+                ('data', models.JSONField(blank=True, default=dict, verbose_name='البيانات')),
+                ('etag', models.CharField(blank=True, max_length=255, verbose_name='ETag')),
+                ('is_missing', models.BooleanField(default=False, verbose_name='غير موجود')),
+                ('fetched_at', models.DateTimeField(blank=True, null=True, verbose_name='تاريخ الجلب')),
+                ('expires_at', models.DateTimeField(verbose_name='تنتهي الصلاحية')),
+                ('error_count', models.PositiveSmallIntegerField(default=0, verbose_name='عدد الأخطاء المتتالية')),
+                ('last_error', models.CharField(blank=True, max_length=255, verbose_name='آخر خطأ')),
+            ],
+            options={
+                'verbose_name': 'معلومات وسائط',
+                'verbose_name_plural': 'معلومات الوسائط',
+                'indexes': [models.Index(fields=['provider', 'expires_at'], name='content_media_expires_idx')],
+                'unique_together': {('provider', 'external_id')},
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.0.6 on 2026-10-17 03:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0006_media_metadata'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaSyncState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('provider', models.CharField(choices=[('youtube', 'YouTube'), ('soundcloud', 'SoundCloud')], max_length=20, verbose_name='المزود')),
+                ('source_url', models.URLField(blank=True, max_length=500, verbose_name='الرابط')),
+                ('last_synced_at', models.DateTimeField(blank=True, null=True, verbose_name='آخر مزامنة')),
+                ('last_status', models.CharField(blank=True, choices=[('success', 'نجحت'), ('missing', 'غير موجودة'), ('failed', 'فشلت')], max_length=20, verbose_name='آخر نتيجة')),
+                ('failure_count', models.PositiveSmallIntegerField(default=0, verbose_name='عدد الإخفاقات المتتالية')),
+                ('content_hash', models.CharField(blank=True, max_length=40, verbose_name='بصمة المحتوى')),
+                ('next_sync_at', models.DateTimeField(verbose_name='المزامنة التالية')),
+                ('playlist_item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sync_states', to='content.playlistitem', verbose_name='العنصر')),
+            ],
+            options={
+                'verbose_name': 'حالة مزامنة',
+                'verbose_name_plural': 'حالات المزامنة',
+                'indexes': [models.Index(fields=['provider', 'next_sync_at'], name='content_sync_due_idx')],
+                'unique_together': {('playlist_item', 'provider')},
+            },
+        ),
+    ]
@@ -32,6 +32,11 @@ class Playlist(models.Model):
     # إحصائيات
     views_count = models.PositiveIntegerField(_('عدد المشاهدات'), default=0)
     
+    # إحصائيات العناصر المنشورة (محسوبة مسبقاً عبر الإشارات وكاتب العدادات)
+    published_items_count = models.PositiveIntegerField(_('عدد العناصر المنشورة'), default=0, editable=False)
+    total_duration = models.PositiveIntegerField(_('المدة الإجمالية (ثواني)'), default=0, editable=False)
+    total_item_views = models.PositiveBigIntegerField(_('مشاهدات العناصر'), default=0, editable=False)
+    
     # التواريخ
     created_by = models.ForeignKey(User, on_delete=models.CASCADE, verbose_name=_('أنشأ بواسطة'))
     created_at = models.DateTimeField(_('تاريخ الإنشاء'), auto_now_add=True)
@@ -55,7 +60,7 @@ class Playlist(models.Model):
     
     @property
     def total_items(self):
-        return self.playlistitem_set.filter(is_published=True).count()
+        return self.published_items_count
 
 
 class PlaylistItem(models.Model):
@@ -83,6 +88,9 @@ class PlaylistItem(models.Model):
     # المحتوى النصي
     content_text = models.TextField(_('النص'), blank=True)
     
+    # مدة الوسائط (تُملأ من مزامنة معلومات الوسائط)
+    duration = models.PositiveIntegerField(_('المدة (ثواني)'), default=0)
+    
     # الصور
     thumbnail = models.ImageField(_('الصورة المصغرة'), upload_to='playlist_items/', blank=True)
     
@@ -111,6 +119,10 @@ class PlaylistItem(models.Model):
         verbose_name_plural = _('عناصر قوائم التشغيل')
         ordering = ['playlist', 'order', 'created_at']
         unique_together = ['playlist', 'slug']
+        indexes = [
+            # التنقل السابق/التالي بـ keyset داخل القائمة
+            models.Index(fields=['playlist', 'order', 'created_at', 'id'], name='content_item_order_idx'),
+        ]
     
     def __str__(self):
         return f'{self.playlist.title} - {self.title}'
@@ -248,3 +260,204 @@ class PlaylistItemTag(models.Model):
         unique_together = ['playlist_item', 'tag']
         verbose_name = _('علامة العنصر')
         verbose_name_plural = _('علامات العناصر')
+
+
+class EngagementDaily(models.Model):
+    """إحصائيات التفاعل اليومية لكل عنصر (جدول تجميعي للرسوم البيانية)"""
+    
+    # ربط حقول العدادات في PlaylistItem بأعمدة الجدول اليومي
+    COUNTER_FIELD_MAP = {
+        'views_count': 'views',
+        'youtube_downloads': 'youtube_downloads',
+        'soundcloud_downloads': 'soundcloud_downloads',
+        'text_copies': 'text_copies',
+        'shares_count': 'shares',
+    }
+    
+    playlist_item = models.ForeignKey(PlaylistItem, on_delete=models.CASCADE, verbose_name=_('العنصر'))
+    day = models.DateField(_('اليوم'))
+    
+    views = models.PositiveIntegerField(_('المشاهدات'), default=0)
+    youtube_downloads = models.PositiveIntegerField(_('تحميلات يوتيوب'), default=0)
+    soundcloud_downloads = models.PositiveIntegerField(_('تحميلات ساوندكلاود'), default=0)
+    text_copies = models.PositiveIntegerField(_('نسخ النص'), default=0)
+    shares = models.PositiveIntegerField(_('المشاركات'), default=0)
+    
+    class Meta:
+        verbose_name = _('تفاعل يومي')
+        verbose_name_plural = _('التفاعل اليومي')
+        ordering = ['-day']
+        unique_together = ['playlist_item', 'day']
+        indexes = [
+            # للاستعلامات حسب الفترة الزمنية مع التجميع حسب العنصر
+            models.Index(fields=['day', 'playlist_item'], name='content_engagement_day_idx'),
+        ]
+    
+    def __str__(self):
+        return f'{self.playlist_item_id} - {self.day}'
+    
+    @classmethod
+    def add_deltas(cls, rows, day=None):
+        """إضافة زيادات العدادات إلى صفوف اليوم
+        
+        rows = {item_id: {'views_count': 3, 'shares_count': 1, ...}}
+        
+        جملة INSERT ... ON CONFLICT DO UPDATE واحدة تجمع الزيادة على القيمة
+        المخزنة داخل قاعدة البيانات، فلا يضيع تحديث عمليتين تكتبان معاً ولا
+        يفشل إنشاء صف اليوم نفسه من عمليتين (SQLite وPostgreSQL).
+        """
+        from django.db import connection
+        from django.utils import timezone
+        
+        day = day or timezone.localdate()
+        
+        # تجاهل العناصر المحذوفة قبل الكتابة
+        item_ids = sorted(
+            PlaylistItem.objects.filter(pk__in=list(rows)).values_list('pk', flat=True)
+        )
+        if not item_ids:
+            return
+        
+        quote = connection.ops.quote_name
+        columns = list(cls.COUNTER_FIELD_MAP.values())
+        sql = (
+            f'INSERT INTO {quote(cls._meta.db_table)} '
+            f'({quote("playlist_item_id")}, {quote("day")}, {", ".join(quote(c) for c in columns)}) '
+            f'VALUES ({", ".join(["%s"] * (len(columns) + 2))}) '
+            f'ON CONFLICT ({quote("playlist_item_id")}, {quote("day")}) DO UPDATE SET '
+            + ', '.join(
+                f'{quote(c)} = {quote(cls._meta.db_table)}.{quote(c)} + excluded.{quote(c)}' for c in columns
+            )
+        )
+        
+        params = []
+        for item_id in item_ids:
+            values = dict.fromkeys(columns, 0)
+            for field, value in rows[item_id].items():
+                column = cls.COUNTER_FIELD_MAP.get(field)
+                if column:
+                    values[column] += value
+            params.append([item_id, day] + [values[column] for column in columns])
+        
+        with connection.cursor() as cursor:
+            cursor.executemany(sql, params)
+
+
+class ItemRecommendation(models.Model):
+    """العناصر المقترحة لكل عنصر (محسوبة مسبقاً من تشارك العلامات والشعبية)"""
+    playlist_item = models.ForeignKey(
+        PlaylistItem, on_delete=models.CASCADE,
+        related_name='recommendations', verbose_name=_('العنصر')
+    )
+    recommended = models.ForeignKey(
+        PlaylistItem, on_delete=models.CASCADE,
+        related_name='+', verbose_name=_('العنصر المقترح')
+    )
+    rank = models.PositiveSmallIntegerField(_('الترتيب'))
+    score = models.FloatField(_('الدرجة'))
+    
+    class Meta:
+        verbose_name = _('توصية عنصر')
+        verbose_name_plural = _('توصيات العناصر')
+        ordering = ['playlist_item', 'rank']
+        # الفهرس الفريد يخدم قراءة قائمة الجيران باستعلام واحد
+        unique_together = ['playlist_item', 'rank']
+    
+    def __str__(self):
+        return f'{self.playlist_item_id} -> {self.recommended_id}'
+
+
+class PlaylistRecommendation(models.Model):
+    """قوائم التشغيل المقترحة لكل قائمة"""
+    playlist = models.ForeignKey(
+        Playlist, on_delete=models.CASCADE,
+        related_name='recommendations', verbose_name=_('القائمة')
+    )
+    recommended = models.ForeignKey(
+        Playlist, on_delete=models.CASCADE,
+        related_name='+', verbose_name=_('القائمة المقترحة')
+    )
+    rank = models.PositiveSmallIntegerField(_('الترتيب'))
+    score = models.FloatField(_('الدرجة'))
+    
+    class Meta:
+        verbose_name = _('توصية قائمة')
+        verbose_name_plural = _('توصيات القوائم')
+        ordering = ['playlist', 'rank']
+        unique_together = ['playlist', 'rank']
+    
+    def __str__(self):
+        return f'{self.playlist_id} -> {self.recommended_id}'
+
+
+class MediaMetadata(models.Model):
+    """معلومات الوسائط الخارجية المخزنة (YouTube وSoundCloud)
+
+    القراءة تُخدم من هنا، والتحديث من المزود يتم عند انتهاء الصلاحية
+    بطلب شرطي (ETag). is_missing سجل سلبي لوسائط غير موجودة حتى لا يُسأل
+    المزود عنها في كل طلب.
+    """
+    PROVIDER_CHOICES = [
+        ('youtube', 'YouTube'),
+        ('soundcloud', 'SoundCloud'),
+    ]
+    
+    provider = models.CharField(_('المزود'), max_length=20, choices=PROVIDER_CHOICES)
+    # معرف الفيديو في YouTube، وبصمة الرابط في SoundCloud
+    external_id = models.CharField(_('المعرف الخارجي'), max_length=64)
+    source_url = models.URLField(_('الرابط'), max_length=500, blank=True)
+    data = models.JSONField(_('البيانات'), default=dict, blank=True)
+    etag = models.CharField(_('ETag'), max_length=255, blank=True)
+    is_missing = models.BooleanField(_('غير موجود'), default=False)
+    fetched_at = models.DateTimeField(_('تاريخ الجلب'), null=True, blank=True)
+    expires_at = models.DateTimeField(_('تنتهي الصلاحية'))
+    error_count = models.PositiveSmallIntegerField(_('عدد الأخطاء المتتالية'), default=0)
+    last_error = models.CharField(_('آخر خطأ'), max_length=255, blank=True)
+    
+    class Meta:
+        verbose_name = _('معلومات وسائط')
+        verbose_name_plural = _('معلومات الوسائط')
+        unique_together = ['provider', 'external_id']
+        indexes = [
+            models.Index(fields=['provider', 'expires_at'], name='content_media_expires_idx'),
+        ]
+    
+    def __str__(self):
+        return f'{self.provider}:{self.external_id}'
+
+
+class MediaSyncState(models.Model):
+    """حالة مزامنة معلومات الوسائط لكل عنصر ومزود
+
+    next_sync_at يحدده مجدول المزامنة حسب نتيجة آخر مزامنة (تغير المحتوى،
+    فشل، وسائط غير موجودة) فلا تُجلب في كل تشغيل إلا العناصر المستحقة.
+    """
+    STATUS_CHOICES = [
+        ('success', _('نجحت')),
+        ('missing', _('غير موجودة')),
+        ('failed', _('فشلت')),
+    ]
+    
+    playlist_item = models.ForeignKey(
+        PlaylistItem, on_delete=models.CASCADE, related_name='sync_states', verbose_name=_('العنصر')
+    )
+    provider = models.CharField(_('المزود'), max_length=20, choices=MediaMetadata.PROVIDER_CHOICES)
+    # الرابط وقت المزامنة: تغييره يجعل العنصر مستحقاً فوراً
+    source_url = models.URLField(_('الرابط'), max_length=500, blank=True)
+    last_synced_at = models.DateTimeField(_('آخر مزامنة'), null=True, blank=True)
+    last_status = models.CharField(_('آخر نتيجة'), max_length=20, choices=STATUS_CHOICES, blank=True)
+    failure_count = models.PositiveSmallIntegerField(_('عدد الإخفاقات المتتالية'), default=0)
+    # بصمة الحقول المستخدمة من معلومات المزود لمعرفة تغير المحتوى
+    content_hash = models.CharField(_('بصمة المحتوى'), max_length=40, blank=True)
+    next_sync_at = models.DateTimeField(_('المزامنة التالية'))
+    
+    class Meta:
+        verbose_name = _('حالة مزامنة')
+        verbose_name_plural = _('حالات المزامنة')
+        unique_together = ['playlist_item', 'provider']
+        indexes = [
+            models.Index(fields=['provider', 'next_sync_at'], name='content_sync_due_idx'),
+        ]
+    
+    def __str__(self):
+        return f'{self.playlist_item_id}:{self.provider}'
@@ -0,0 +1,147 @@
+# content/signals.py
+
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from core.activity import activity_tracker
+from core.page_cache import page_cache
+from .models import EngagementDaily, Playlist, PlaylistItem, PlaylistItemTag
+from .utils.counters import counters_flushed
+from .utils.playlist_index import playlist_index
+from .utils.playlist_manifest import playlist_manifest
+from .utils.playlist_stats import playlist_stats
+
+
+@receiver(counters_flushed)
+def update_daily_engagement(sender, deltas, **kwargs):
+    """تحديث جدول التفاعل اليومي من الزيادات المكتوبة"""
+    rows = deltas.get('content.playlistitem')
+    if rows:
+        EngagementDaily.add_deltas(rows)
+
+
+@receiver(counters_flushed)
+def update_daily_downloads(sender, deltas, **kwargs):
+    """تحديث عدادات تحميلات اليوم في متتبع النشاط (للإحصائيات السريعة)"""
+    totals = {'youtube_downloads': 0, 'soundcloud_downloads': 0}
+    for fields in deltas.get('content.playlistitem', {}).values():
+        for field in totals:
+            totals[field] += fields.get(field, 0)
+
+    for field, total in totals.items():
+        if total:
+            activity_tracker.incr_daily(field, total)
+
+
+@receiver(counters_flushed)
+def update_playlist_item_views(sender, deltas, **kwargs):
+    """إضافة مشاهدات العناصر المكتوبة إلى إجمالي مشاهدات قوائمها"""
+    rows = deltas.get('content.playlistitem')
+    if rows:
+        playlist_stats.add_item_views(rows)
+
+
+# === إحصائيات القوائم والتصنيفات المحسوبة مسبقاً ===
+
+@receiver(post_init, sender=PlaylistItem)
+def remember_item_playlist(sender, instance, **kwargs):
+    instance._stats_playlist_id = instance.__dict__.get('playlist_id')
+
+
+@receiver(post_save, sender=PlaylistItem)
+@receiver(post_delete, sender=PlaylistItem)
+def refresh_item_playlist_stats(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+
+    playlist_ids = {instance.playlist_id, instance._stats_playlist_id}
+    instance._stats_playlist_id = instance.playlist_id
+
+    changed = playlist_stats.refresh_playlists(playlist_ids)
+    if changed:
+        # بطاقات القوائم في الصفحات الأخرى تعرض عدد العناصر
+        page_cache.purge(*(f'playlist:{pk}' for pk in changed))
+
+
+@receiver(post_init, sender=Playlist)
+def remember_playlist_category(sender, instance, **kwargs):
+    instance._stats_state = (instance.__dict__.get('is_published'), instance.__dict__.get('category_id'))
+
+
+@receiver(post_save, sender=Playlist)
+def refresh_playlist_category_stats(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+
+    old_published, old_category = instance._stats_state
+    instance._stats_state = (instance.is_published, instance.category_id)
+
+    if created:
+        if instance.is_published:
+            playlist_stats.refresh_categories([instance.category_id])
+    elif (old_published, old_category) != instance._stats_state:
+        playlist_stats.refresh_categories([instance.category_id, old_category])
+
+
+@receiver(post_delete, sender=Playlist)
+def refresh_deleted_playlist_category_stats(sender, instance, **kwargs):
+    if instance.is_published:
+        playlist_stats.refresh_categories([instance.category_id])
+
+
+# === فهرس ترتيب عناصر القوائم ===
+
+def item_index_state(instance):
+    return tuple(instance.__dict__.get(field) for field in ('playlist_id', 'is_published', 'order'))
+
+
+@receiver(post_init, sender=PlaylistItem)
+def remember_item_index_state(sender, instance, **kwargs):
+    instance._index_state = item_index_state(instance)
+
+
+@receiver(post_save, sender=PlaylistItem)
+def invalidate_item_playlist_index(sender, instance, created, raw=False, **kwargs):
+    # الحفظ الذي لا يغير الترتيب أو النشر (مثل مزامنة الوسائط) لا يعيد بناء الفهرس
+    old_state = instance._index_state
+    instance._index_state = item_index_state(instance)
+    if created or old_state != instance._index_state:
+        playlist_index.invalidate(instance.playlist_id, old_state[0])
+
+
+@receiver(post_delete, sender=PlaylistItem)
+def invalidate_deleted_item_playlist_index(sender, instance, **kwargs):
+    playlist_index.invalidate(instance.playlist_id)
+
+
+# === بيان القوائم للمشغل ===
+
+@receiver(post_init, sender=PlaylistItem)
+def remember_item_manifest_playlist(sender, instance, **kwargs):
+    instance._manifest_playlist_id = instance.__dict__.get('playlist_id')
+
+
+@receiver(post_save, sender=PlaylistItem)
+@receiver(post_delete, sender=PlaylistItem)
+def invalidate_item_playlist_manifest(sender, instance, **kwargs):
+    # أي تغيير في العنصر (العنوان، الصورة، المدة...) يغير البيان
+    playlist_manifest.invalidate(instance.playlist_id, instance._manifest_playlist_id)
+    instance._manifest_playlist_id = instance.playlist_id
+
+
+@receiver(post_save, sender=Playlist)
+@receiver(post_delete, sender=Playlist)
+def invalidate_playlist_manifest(sender, instance, **kwargs):
+    playlist_manifest.invalidate(instance.pk)
+
+
+# === التوصيات ===
+
+@receiver(post_save, sender=PlaylistItemTag)
+@receiver(post_delete, sender=PlaylistItemTag)
+def touch_tagged_item(sender, instance, raw=False, **kwargs):
+    # تغيير العلامات يجعل العنصر "متغيراً" للتحديث التزايدي للتوصيات
+    if raw:
+        return
+    PlaylistItem.objects.filter(pk=instance.playlist_item_id).update(updated_at=timezone.now())
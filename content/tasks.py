@@ -11,13 +11,14 @@ logger = logging.getLogger(__name__)
 
 
 @shared_task(bind=True)
-def sync_media_info(self, batch_size=50, media_type='all'):
-    """مهمة مزامنة معلومات الوسائط في الخلفية"""
+def sync_media_info(self, batch_size=50, media_type='all', full=False):
+    """مهمة مزامنة معلومات الوسائط في الخلفية (العناصر المستحقة فقط ما لم يُطلب full)"""
     try:
         call_command(
             'sync_media_info',
             batch_size=batch_size,
             type=media_type,
+            full=full,
             verbosity=1
         )
         
@@ -47,6 +48,52 @@ def generate_thumbnails(self, regenerate=False):
         raise self.retry(exc=e, countdown=60, max_retries=3)
 
 
+@shared_task
+def flush_engagement_counters():
+    """مهمة كتابة عدادات التفاعل المعلقة في قاعدة البيانات"""
+    from content.utils.counters import engagement_counter
+    
+    try:
+        flushed = engagement_counter.flush()
+        return {'status': 'success', 'flushed': flushed}
+        
+    except Exception as e:
+        logger.error(f'خطأ في كتابة عدادات التفاعل: {e}')
+        return {'status': 'error', 'message': str(e)}
+
+
+@shared_task
+def refresh_recommendations(full=False):
+    """مهمة تحديث التوصيات (تزايدياً للعناصر المتغيرة، أو بناء كامل)"""
+    from content.utils.recommendations import recommender
+    
+    try:
+        stats = recommender.rebuild() if full else recommender.refresh()
+        return {'status': 'success', **stats}
+        
+    except Exception as e:
+        logger.error(f'خطأ في تحديث التوصيات: {e}')
+        return {'status': 'error', 'message': str(e)}
+
+
+@shared_task
+def reconcile_playlist_stats():
+    """مهمة تصحيح انحراف إحصائيات القوائم والتصنيفات المحسوبة مسبقاً"""
+    from content.utils.playlist_stats import playlist_stats
+    
+    try:
+        playlist_drift, category_drift = playlist_stats.reconcile()
+        return {
+            'status': 'success',
+            'playlists': len(playlist_drift),
+            'categories': len(category_drift)
+        }
+        
+    except Exception as e:
+        logger.error(f'خطأ في مطابقة إحصائيات القوائم: {e}')
+        return {'status': 'error', 'message': str(e)}
+
+
 @shared_task
 def cleanup_temp_files(older_than_hours=24):
     """مهمة تنظيف الملفات المؤقتة"""
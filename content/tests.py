@@ -1,3 +1,267 @@
-from django.test import TestCase
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import OperationalError, connection
+from django.http import Http404
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from unittest import mock
 
-# Create your tests here.
+from core.models import Category
+from core.rate_limit import rate_limiter
+from .models import MediaMetadata, Playlist, PlaylistItem
+from .utils.counters import counters_flushed, engagement_counter
+from .utils.media_sync import media_sync
+from .utils.media_utils import youtube_handler
+from .utils.youtube_stub import YouTubeStubServer
+from .views import PlaylistManifestView
+
+
+class YouTubeBatchSyncTests(TestCase):
+    """مزامنة دفعات YouTube على الخادم المحلي البديل"""
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create(username='sync')
+        category = Category.objects.create(name='sync', slug='sync')
+        cls.playlist = Playlist.objects.create(title='sync', slug='sync', category=category, created_by=user)
+
+    def setUp(self):
+        original = youtube_handler.api_key, youtube_handler.api_base_url, rate_limiter.limits
+        self.addCleanup(self.restore, original)
+        youtube_handler.api_key = 'stub'
+        rate_limiter.limits = {**rate_limiter.limits, 'youtube': 1000}
+        rate_limiter.reset('youtube')
+
+    def restore(self, original):
+        youtube_handler.api_key, youtube_handler.api_base_url, rate_limiter.limits = original
+        rate_limiter.reset('youtube')
+
+    def start_stub(self, **kwargs):
+        stub = YouTubeStubServer(latency=0, **kwargs).start()
+        self.addCleanup(stub.stop)
+        youtube_handler.api_base_url = stub.base_url
+        return stub
+
+    def create_items(self, count):
+        PlaylistItem.objects.bulk_create([
+            PlaylistItem(
+                playlist=self.playlist, title='', slug=f'item-{index}', content_type='youtube', order=index,
+                youtube_url=f'https://www.youtube.com/watch?v=vid{index:08d}', youtube_video_id=f'vid{index:08d}',
+            )
+            for index in range(count)
+        ])
+        return list(PlaylistItem.objects.filter(playlist=self.playlist).order_by('pk'))
+
+    def test_requests_are_chunked_by_fifty_ids(self):
+        stub = self.start_stub()
+        items = self.create_items(120)
+
+        result = media_sync.sync_youtube_batch(items)
+
+        self.assertEqual(stub.requests, 3)
+        self.assertEqual(result['requests'], 3)
+        self.assertEqual(result['updated'], 120)
+        self.assertEqual(PlaylistItem.objects.filter(playlist=self.playlist, duration__gt=0).count(), 120)
+
+    def test_missing_videos_are_partial_misses(self):
+        stub = self.start_stub(missing_ratio=0.3)
+        items = self.create_items(100)
+        missing = {item.pk for item in items if stub.is_missing(item.youtube_video_id)}
+        self.assertTrue(0 < len(missing) < len(items))
+
+        result = media_sync.sync_youtube_batch(items)
+
+        self.assertEqual(stub.requests, 2)
+        self.assertEqual(result['missing'], len(missing))
+        self.assertEqual(result['updated'], len(items) - len(missing))
+        self.assertEqual(result['failed'], 0)
+        self.assertFalse(PlaylistItem.objects.filter(pk__in=missing, duration__gt=0).exists())
+        self.assertEqual(MediaMetadata.objects.filter(provider='youtube', is_missing=True).count(), len(missing))
+
+    def test_failed_chunk_is_left_for_retry(self):
+        items = self.create_items(100)
+        stub = self.start_stub(fail_ids=[items[75].youtube_video_id])
+
+        result = media_sync.sync_youtube_batch(items)
+
+        self.assertEqual(stub.requests, 2)
+        self.assertEqual(result['failed'], 50)
+        self.assertEqual(result['updated'], 50)
+        synced = set(PlaylistItem.objects.filter(playlist=self.playlist, duration__gt=0).values_list('pk', flat=True))
+        self.assertEqual(synced, {item.pk for item in items[:50]})
+
+        # الدفعة الفاشلة تُعاد في التشغيل التالي
+        stub.fail_ids.clear()
+        result = media_sync.sync_youtube_batch(items[50:])
+        self.assertEqual(stub.requests, 3)
+        self.assertEqual(result['updated'], 50)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'counters'}})
+class EngagementCounterTests(TestCase):
+    """الكتابة المؤجلة لعدادات التفاعل عبر LocMemCache"""
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create(username='counter')
+        category = Category.objects.create(name='counter', slug='counter')
+        playlist = Playlist.objects.create(title='counter', slug='counter', category=category, created_by=user)
+        cls.items = [
+            PlaylistItem.objects.create(playlist=playlist, title=f'item {index}', slug=f'item-{index}', order=index)
+            for index in range(3)
+        ]
+
+    def setUp(self):
+        cache.clear()
+
+    def increment(self, item, field='views_count', delta=1):
+        return engagement_counter.increment_pk(PlaylistItem, item.pk, field, delta)
+
+    def counts(self, field='views_count'):
+        return list(PlaylistItem.objects.order_by('pk').values_list(field, flat=True))
+
+    def pending(self, item):
+        return engagement_counter.get_pending_many([item]).get(('content.playlistitem', item.pk), {})
+
+    def reserve_slot(self):
+        """حجز رقم خانة دون كتابتها (عملية توقفت بين incr وset)"""
+        return engagement_counter._incr(engagement_counter._seq_key, 1)
+
+    def test_increments_are_coalesced_into_one_update(self):
+        for _ in range(5):
+            self.increment(self.items[0])
+        self.increment(self.items[0], 'shares_count', 2)
+        self.increment(self.items[1])
+
+        self.assertEqual(self.counts(), [0, 0, 0])
+        self.assertEqual(self.pending(self.items[0]), {'views_count': 5, 'shares_count': 2})
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(engagement_counter.flush(), 8)
+
+        updates = [
+            query for query in queries.captured_queries
+            if query['sql'].startswith('UPDATE "content_playlistitem"')
+        ]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(self.counts(), [5, 1, 0])
+        self.assertEqual(self.counts('shares_count'), [2, 0, 0])
+        self.assertEqual(self.pending(self.items[0]), {})
+        self.assertEqual(engagement_counter.flush(), 0)
+
+    def test_failed_flush_is_recovered_by_the_next_one(self):
+        self.increment(self.items[0], delta=3)
+        self.increment(self.items[1], delta=2)
+
+        with mock.patch.object(
+            engagement_counter, '_update_chunk', side_effect=OperationalError('database is locked')
+        ):
+            with self.assertRaises(OperationalError):
+                engagement_counter.flush()
+
+        self.assertEqual(self.counts(), [0, 0, 0])
+        self.assertEqual(self.pending(self.items[0]), {'views_count': 3})
+
+        self.assertEqual(engagement_counter.flush(), 5)
+        self.assertEqual(self.counts(), [3, 2, 0])
+
+    def test_increments_during_flush_stay_pending(self):
+        self.increment(self.items[0], delta=4)
+
+        def increment_during_flush(**kwargs):
+            self.increment(self.items[0], delta=2)
+
+        counters_flushed.connect(increment_during_flush)
+        self.addCleanup(counters_flushed.disconnect, increment_during_flush)
+        self.assertEqual(engagement_counter.flush(), 4)
+        counters_flushed.disconnect(increment_during_flush)
+
+        # الباقي بعد الخصم يبقى معلقاً ومسجلاً للدورة التالية
+        self.assertEqual(self.counts()[0], 4)
+        self.assertEqual(self.pending(self.items[0]), {'views_count': 2})
+        self.assertEqual(engagement_counter.flush(), 2)
+        self.assertEqual(self.counts()[0], 6)
+
+    def test_missing_slot_is_waited_for_once(self):
+        self.increment(self.items[0])
+        late = self.reserve_slot()
+        self.increment(self.items[1])
+
+        self.assertEqual(engagement_counter.flush(), 2)
+        self.assertEqual(cache.get(engagement_counter._cursor_key), late - 1)
+
+        # الكاتب المتأخر يكمل خانته فتُقرأ في الدورة التالية
+        key = engagement_counter._counter_key('content.playlistitem', self.items[2].pk, 'views_count')
+        engagement_counter._incr(key, 7)
+        cache.set(engagement_counter._slot_key(late), key, timeout=None)
+
+        self.assertEqual(engagement_counter.flush(), 7)
+        self.assertEqual(self.counts(), [1, 1, 7])
+        self.assertEqual(cache.get(engagement_counter._cursor_key), late + 1)
+
+    def test_slot_missing_twice_is_skipped(self):
+        self.increment(self.items[0])
+        lost = self.reserve_slot()
+
+        engagement_counter.flush()
+        self.assertEqual(cache.get(engagement_counter._cursor_key), lost - 1)
+
+        self.increment(self.items[1])
+        self.assertEqual(engagement_counter.flush(), 1)
+        self.assertEqual(cache.get(engagement_counter._cursor_key), lost + 1)
+        self.assertEqual(self.counts(), [1, 1, 0])
+
+    def test_unwritable_row_is_dropped_without_blocking_others(self):
+        self.increment(self.items[0], delta=2)
+        self.increment(self.items[1], delta=3)
+        # زيادة خارج مدى INTEGER في SQLite ترفضها قاعدة البيانات لهذا الصف وحده
+        key = engagement_counter._counter_key('content.playlistitem', self.items[2].pk, 'views_count')
+        cache.set(key, 2 ** 64, timeout=None)
+        engagement_counter._mark_dirty(key)
+
+        self.assertEqual(engagement_counter.flush(), 5)
+        self.assertEqual(self.counts(), [2, 3, 0])
+        self.assertIsNone(cache.get(key))
+        self.assertEqual(engagement_counter.flush(), 0)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'manifest'}})
+class PlaylistManifestTests(TestCase):
+    """الطلبات الشرطية لبيان القائمة"""
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create(username='manifest')
+        category = Category.objects.create(name='manifest', slug='manifest')
+        cls.playlist = Playlist.objects.create(
+            title='manifest', slug='manifest', category=category, created_by=user, is_published=True
+        )
+        PlaylistItem.objects.create(playlist=cls.playlist, title='item', slug='item', is_published=True)
+
+    def setUp(self):
+        cache.clear()
+        self.url = reverse('content:playlist_manifest', args=[self.playlist.pk])
+
+    def test_matching_etag_returns_not_modified(self):
+        etag = self.client.get(self.url)['ETag']
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=f'"other", {etag}')
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_malformed_header_containing_the_etag_does_not_match(self):
+        etag = self.client.get(self.url)['ETag']
+
+        for header in (f'x{etag}', f'{etag}x', f'"x{etag[1:]}'):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=header)
+            self.assertEqual(response.status_code, 200, header)
+
+    def test_unpublished_playlist_is_not_found_even_with_a_matching_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        Playlist.objects.filter(pk=self.playlist.pk).update(is_published=False)
+
+        # يُستدعى العرض مباشرة لأن قالب 404 الخاص بالموقع غير موجود في بيئة الاختبار
+        request = RequestFactory().get(self.url, HTTP_IF_NONE_MATCH=etag)
+        with self.assertRaises(Http404):
+            PlaylistManifestView.as_view()(request, playlist_id=self.playlist.pk)
@@ -41,4 +41,8 @@ urlpatterns = [
          views.IncrementViewAjax.as_view(), name='increment_view_ajax'),
     path('ajax/toggle-like/<int:item_id>/', 
          views.ToggleLikeAjax.as_view(), name='toggle_like_ajax'),
+    path('ajax/shuffle/<int:playlist_id>/', 
+         views.PlaylistShuffleAjax.as_view(), name='playlist_shuffle_ajax'),
+    path('ajax/manifest/<int:playlist_id>/', 
+         views.PlaylistManifestView.as_view(), name='playlist_manifest'),
 ]
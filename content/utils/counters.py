@@ -0,0 +1,321 @@
+# content/utils/counters.py
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DataError, IntegrityError, transaction
+from django.db.models import Case, F, IntegerField, Value, When
+from django.dispatch import Signal
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+# إشارة تُرسل داخل معاملة الكتابة المجمعة بعد تحديث العدادات
+# deltas = {'content.playlistitem': {item_id: {'views_count': 3, ...}}, ...}
+counters_flushed = Signal()
+
+
+class EngagementCounterBuffer:
+    """مخزن مؤقت لعدادات التفاعل مع كتابة مؤجلة ومجمعة
+
+    كل زيادة تُسجل في الذاكرة المؤقتة المشتركة (Redis أو الذاكرة المحلية)
+    بدلاً من UPDATE متزامن، ثم تُكتب الزيادات المتراكمة دورياً في قاعدة
+    البيانات بعدد قليل من جمل UPDATE المجمعة.
+    """
+
+    # الحقول المسموح بعدّها لكل نموذج
+    COUNTER_FIELDS = {
+        'content.playlist': ('views_count',),
+        'content.playlistitem': (
+            'views_count', 'youtube_downloads', 'soundcloud_downloads',
+            'text_copies', 'shares_count'
+        ),
+        'blog.post': ('views_count',),
+        'projects.project': ('views_count',),
+        'core.advertisement': ('views_count', 'clicks_count'),
+    }
+
+    KEY_PREFIX = 'engagement'
+    LOCK_TIMEOUT = 120  # ثواني
+    MAX_SLOTS_PER_FLUSH = 5000
+    UPDATE_CHUNK_SIZE = 500
+    LOCAL_CHECK_INTERVAL = 5  # ثواني بين فحوصات الكتابة الدورية في نفس العملية
+    MAX_PK = 2 ** 63 - 1  # مدى BigAutoField
+    # أخطاء تخص قيم صف بعينه (لا قاعدة البيانات كلها) فيُعزل الصف ويُتجاوز
+    ROW_ERRORS = (DataError, IntegrityError, OverflowError, ValueError)
+
+    def __init__(self):
+        self.flush_interval = getattr(settings, 'ENGAGEMENT_COUNTER_FLUSH_INTERVAL', 60)
+        self._last_local_check = 0
+
+    # === المفاتيح ===
+
+    def _counter_key(self, label, pk, field):
+        return f'{self.KEY_PREFIX}:c:{label}:{pk}:{field}'
+
+    def _parse_counter_key(self, key):
+        _, _, label, pk, field = key.split(':')
+        return label, int(pk), field
+
+    def _slot_key(self, seq):
+        return f'{self.KEY_PREFIX}:slot:{seq}'
+
+    @property
+    def _seq_key(self):
+        return f'{self.KEY_PREFIX}:seq'
+
+    @property
+    def _cursor_key(self):
+        return f'{self.KEY_PREFIX}:cursor'
+
+    @property
+    def _missing_key(self):
+        return f'{self.KEY_PREFIX}:missing'
+
+    @property
+    def _last_flush_key(self):
+        return f'{self.KEY_PREFIX}:last-flush'
+
+    @property
+    def _lock_key(self):
+        return f'{self.KEY_PREFIX}:flush-lock'
+
+    def _check_field(self, label, field):
+        if field not in self.COUNTER_FIELDS.get(label, ()):
+            raise ValueError(f'عداد غير مدعوم: {label}.{field}')
+
+    def _check_pk(self, pk):
+        if isinstance(pk, bool) or not isinstance(pk, int) or not 0 < pk <= self.MAX_PK:
+            raise ValueError(f'معرف غير صالح للعداد: {pk!r}')
+
+    def _incr(self, key, delta):
+        """زيادة ذرية مع إنشاء المفتاح عند غيابه"""
+        try:
+            return cache.incr(key, delta)
+        except ValueError:
+            if cache.add(key, delta, timeout=None):
+                return delta
+            return cache.incr(key, delta)
+
+    # === الكتابة ===
+
+    def increment(self, instance, field='views_count', delta=1):
+        """زيادة عداد لكائن محمّل"""
+        return self.increment_pk(type(instance), instance.pk, field, delta)
+
+    def increment_pk(self, model, pk, field='views_count', delta=1):
+        """زيادة عداد باستخدام المعرف فقط (بدون قراءة الكائن)"""
+        label = model._meta.label_lower
+        self._check_field(label, field)
+        self._check_pk(pk)
+        key = self._counter_key(label, pk, field)
+
+        try:
+            pending = self._incr(key, delta)
+            if pending == delta:
+                # العداد كان فارغاً: نسجله في قائمة المفاتيح المعلقة
+                self._mark_dirty(key)
+        except Exception as e:
+            # عند تعطل الذاكرة المؤقتة نعود للتحديث المباشر
+            logger.warning(f'تعذر تخزين العداد مؤقتاً {key}: {e}')
+            model.objects.filter(pk=pk).update(**{field: F(field) + delta})
+            return 0
+
+        self.maybe_flush()
+        return pending
+
+    def _mark_dirty(self, key):
+        """إضافة مفتاح إلى سجل المفاتيح المعلقة (سجل متسلسل بالإضافة فقط)"""
+        seq = self._incr(self._seq_key, 1)
+        cache.set(self._slot_key(seq), key, timeout=None)
+
+    # === القراءة ===
+
+    def get_pending_many(self, instances, fields=None):
+        """الزيادات المعلقة لمجموعة كائنات بقراءة واحدة من الذاكرة المؤقتة"""
+        keys = {}
+        for instance in instances:
+            label = instance._meta.label_lower
+            for field in fields or self.COUNTER_FIELDS.get(label, ()):
+                keys[self._counter_key(label, instance.pk, field)] = (label, instance.pk, field)
+
+        if not keys:
+            return {}
+
+        try:
+            values = cache.get_many(list(keys))
+        except Exception as e:
+            logger.warning(f'تعذر قراءة العدادات المعلقة: {e}')
+            return {}
+
+        pending = {}
+        for key, value in values.items():
+            if value:
+                label, pk, field = keys[key]
+                pending.setdefault((label, pk), {})[field] = value
+        return pending
+
+    def apply_pending(self, instance, fields=None):
+        """دمج القيم المعلقة مع القيم المحفوظة في الكائن نفسه"""
+        self.apply_pending_many([instance], fields)
+        return instance
+
+    def apply_pending_many(self, instances, fields=None):
+        """دمج القيم المعلقة لمجموعة كائنات (للعرض في القوائم)"""
+        instances = list(instances)
+        pending = self.get_pending_many(instances, fields)
+
+        for instance in instances:
+            for field, value in pending.get((instance._meta.label_lower, instance.pk), {}).items():
+                setattr(instance, field, (getattr(instance, field) or 0) + value)
+
+        return instances
+
+    # === الكتابة المجمعة ===
+
+    def maybe_flush(self):
+        """كتابة دورية احتياطية عند عدم تشغيل مهام Celery"""
+        now = time.time()
+        if now - self._last_local_check < self.LOCAL_CHECK_INTERVAL:
+            return
+        self._last_local_check = now
+
+        try:
+            last_flush = cache.get(self._last_flush_key)
+            if last_flush is None:
+                cache.add(self._last_flush_key, now, timeout=None)
+            elif now - last_flush >= self.flush_interval:
+                self.flush()
+        except Exception as e:
+            logger.error(f'خطأ في الكتابة الدورية للعدادات: {e}')
+
+    def flush(self):
+        """كتابة جميع الزيادات المعلقة في قاعدة البيانات"""
+        if not cache.add(self._lock_key, 1, timeout=self.LOCK_TIMEOUT):
+            # عملية أخرى تقوم بالكتابة حالياً
+            return 0
+
+        try:
+            cache.set(self._last_flush_key, time.time(), timeout=None)
+            return self._flush_locked()
+        finally:
+            cache.delete(self._lock_key)
+
+    def _collect_dirty_keys(self):
+        """قراءة المفاتيح المعلقة من السجل المتسلسل وتقديم المؤشر"""
+        cursor = cache.get(self._cursor_key, 0)
+        seq = min(cache.get(self._seq_key, 0), cursor + self.MAX_SLOTS_PER_FLUSH)
+
+        if seq <= cursor:
+            return set()
+
+        seqs = range(cursor + 1, seq + 1)
+        slots = cache.get_many([self._slot_key(n) for n in seqs])
+
+        # الخانة المفقودة قد تكون قيد الكتابة الآن، لذا ننتظرها دورة واحدة قبل تجاوزها.
+        # إعادة قراءة خانة مكررة لا تضر لأن الكتابة تعتمد على القيمة المعلقة الحالية.
+        previously_missing = set(cache.get(self._missing_key, ()))
+        missing = [n for n in seqs if self._slot_key(n) not in slots]
+        waiting = [n for n in missing if n not in previously_missing]
+        new_cursor = min(waiting) - 1 if waiting else seq
+
+        cache.set(self._missing_key, waiting, timeout=None)
+        cache.set(self._cursor_key, new_cursor, timeout=None)
+        cache.delete_many([self._slot_key(n) for n in range(cursor + 1, new_cursor + 1)])
+
+        return set(slots.values())
+
+    def _flush_locked(self):
+        keys = self._collect_dirty_keys()
+        if not keys:
+            return 0
+
+        values = {key: value for key, value in cache.get_many(list(keys)).items() if value}
+        if not values:
+            return 0
+
+        # تجميع الزيادات حسب النموذج ثم الكائن
+        deltas = {}
+        for key, value in values.items():
+            label, pk, field = self._parse_counter_key(key)
+            deltas.setdefault(label, {}).setdefault(pk, {})[field] = value
+
+        # المؤشر تقدم والخانات حُذفت قبل الكتابة، فعند فشل المعاملة تُعاد
+        # المفاتيح إلى السجل حتى لا تضيع زياداتها
+        try:
+            with transaction.atomic():
+                for label, rows in deltas.items():
+                    for pk in self._apply_model_deltas(apps.get_model(label), rows):
+                        self._drop_row(label, pk, rows.pop(pk), values)
+
+                counters_flushed.send(sender=self.__class__, deltas=deltas)
+        except Exception:
+            for key in values:
+                self._mark_dirty(key)
+            raise
+
+        # خصم القيم المكتوبة فقط؛ ما أضيف أثناء الكتابة يبقى معلقاً للدورة التالية
+        for key, value in values.items():
+            try:
+                if cache.decr(key, value) > 0:
+                    self._mark_dirty(key)
+            except ValueError:
+                # حُذف المفتاح من الذاكرة المؤقتة بعد قراءته
+                pass
+
+        total = sum(values.values())
+        logger.info(f'تمت كتابة {total} زيادة في {len(values)} عداد')
+        return total
+
+    def _apply_model_deltas(self, model, rows):
+        """تحديث مجمع لكل نموذج: UPDATE واحد لكل دفعة من الصفوف
+
+        الدفعة التي ترفض قاعدة البيانات قيمها تُعاد صفاً صفاً لعزل الصف
+        المسبب؛ يعيد معرفات الصفوف التي تعذرت كتابتها.
+        """
+        pks = list(rows)
+        failed = []
+
+        for i in range(0, len(pks), self.UPDATE_CHUNK_SIZE):
+            chunk = pks[i:i + self.UPDATE_CHUNK_SIZE]
+            try:
+                with transaction.atomic():
+                    self._update_chunk(model, rows, chunk)
+            except self.ROW_ERRORS:
+                for pk in chunk:
+                    try:
+                        with transaction.atomic():
+                            self._update_chunk(model, rows, [pk])
+                    except self.ROW_ERRORS as e:
+                        logger.error(f'تعذرت كتابة عدادات {model._meta.label_lower}:{pk}: {e}')
+                        failed.append(pk)
+
+        return failed
+
+    def _update_chunk(self, model, rows, chunk):
+        fields = {field for pk in chunk for field in rows[pk]}
+
+        updates = {}
+        for field in fields:
+            whens = [
+                When(pk=pk, then=Value(rows[pk][field]))
+                for pk in chunk if rows[pk].get(field)
+            ]
+            updates[field] = F(field) + Case(
+                *whens, default=Value(0), output_field=IntegerField()
+            )
+
+        model.objects.filter(pk__in=chunk).update(**updates)
+
+    def _drop_row(self, label, pk, fields, values):
+        """إسقاط زيادات صف لا يمكن كتابته حتى لا يوقف الكتابة في كل دورة"""
+        keys = [self._counter_key(label, pk, field) for field in fields]
+        cache.delete_many(keys)
+        for key in keys:
+            values.pop(key, None)
+
+
+# إنشاء instance للاستخدام
+engagement_counter = EngagementCounterBuffer()
@@ -0,0 +1,75 @@
+# content/utils/freshness.py
+
+"""دوال الحداثة لصفحات المحتوى (تُستخدم مع core.conditional.conditional_page)
+
+كل دالة استعلام واحد على الحقول المحسوبة مسبقاً (عدد العناصر، المشاهدات،
+تاريخ التحديث) وتعيد (المفاتيح البديلة، أجزاء الحالة)، أو None إذا لم
+يوجد الكائن فيتولى العرض إرجاع 404.
+"""
+
+from django.db.models import Count, Max, Q, Sum
+
+from content.models import Playlist, PlaylistItem
+from core.models import Category
+
+
+def _list_state(queryset):
+    """حالة مجموعة قوائم: آخر تحديث لأي قائمة (منشورة أو لا) وإحصائيات المنشورة"""
+    published = Q(is_published=True)
+    return queryset.order_by().aggregate(
+        updated_at=Max('updated_at'),
+        count=Count('pk', filter=published),
+        items=Sum('published_items_count', filter=published),
+        views=Sum('views_count', filter=published),
+    )
+
+
+def playlist_list_freshness(request, *args, **kwargs):
+    state = _list_state(Playlist.objects.all())
+    return ('playlist-list',), tuple(state.values())
+
+
+def category_freshness(request, category_slug, *args, **kwargs):
+    category = Category.objects.filter(slug=category_slug, is_active=True).values_list(
+        'pk', 'updated_at'
+    ).first()
+    if category is None:
+        return None
+
+    category_id, category_updated_at = category
+    state = _list_state(Playlist.objects.filter(category_id=category_id))
+    return (
+        (f'category:{category_id}',),
+        (category_id, category_updated_at, *state.values()),
+    )
+
+
+def playlist_freshness(request, slug=None, playlist_slug=None, *args, **kwargs):
+    """القائمة وعناصرها: max(updated_at) للقائمة وعناصرها مع إحصائياتها المحسوبة"""
+    row = Playlist.objects.filter(
+        slug=slug or playlist_slug, is_published=True
+    ).values_list(
+        'pk', 'category_id', 'updated_at', 'views_count',
+        'published_items_count', 'total_item_views',
+    ).annotate(items_updated_at=Max('playlistitem__updated_at')).first()
+    if row is None:
+        return None
+
+    playlist_id, category_id = row[:2]
+    return (f'playlist:{playlist_id}', f'category:{category_id}'), row
+
+
+def item_freshness(request, playlist_slug, item_slug, *args, **kwargs):
+    """العنصر وقائمته وتعليقاته"""
+    row = PlaylistItem.objects.filter(
+        playlist__slug=playlist_slug, playlist__is_published=True,
+        slug=item_slug, is_published=True,
+    ).values_list(
+        'pk', 'playlist_id', 'playlist__category_id', 'updated_at', 'views_count',
+        'playlist__updated_at', 'playlist__published_items_count',
+    ).annotate(comments_updated_at=Max('comment__updated_at')).first()
+    if row is None:
+        return None
+
+    item_id, playlist_id, category_id = row[:3]
+    return (f'item:{item_id}', f'playlist:{playlist_id}', f'category:{category_id}'), row
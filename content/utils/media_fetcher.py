@@ -0,0 +1,83 @@
+# content/utils/media_fetcher.py
+
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+import logging
+import requests
+
+from core.http_client import http_client
+from core.rate_limit import rate_limiter
+
+logger = logging.getLogger(__name__)
+
+# حالات تعني أن المزود مثقل أو يحد المعدل فيُخفض المعدل ويُعاد الطلب
+THROTTLE_STATUSES = {429, 500, 502, 503, 504}
+
+
+class MediaFetcher:
+    """طلبات مزودي الوسائط عبر حد المعدل المشترك وجلب متزامن بخيوط محدودة
+
+    كل طلب يأخذ رمزاً من دلو المزود قبل الإرسال ويمر بعميل HTTP المشترك
+    (اتصالات دائمة وإعادة محاولة أخطاء الاتصال فقط)، ونتيجته تُغذي التكيف:
+    429/5xx تُخفض المعدل وتوقف المزود ثم يُعاد الطلب بعد الإيقاف. map()
+    يوزع العمل على مجموعة خيوط بحجم ثابت فتبقى الطلبات المتزامنة محدودة
+    والمعدل الفعلي يضبطه الدلو.
+    """
+
+    MAX_ATTEMPTS = 4
+    ACQUIRE_TIMEOUT = 120
+
+    def __init__(self):
+        self.workers = getattr(settings, 'MEDIA_FETCH_WORKERS', 8)
+
+    def get(self, provider, url, **kwargs):
+        """GET محدود المعدل مع إعادة المحاولة؛ يعيد الاستجابة الأخيرة أو يرفع الخطأ"""
+        for attempt in range(1, self.MAX_ATTEMPTS + 1):
+            if not rate_limiter.acquire(provider, timeout=self.ACQUIRE_TIMEOUT):
+                raise requests.Timeout(f'انتهت مهلة انتظار حد معدل {provider}')
+
+            # أخطاء الاتصال يعيد العميل المشترك محاولتها، وردود البوابة تُعاد هنا
+            # برمز جديد حتى لا يتجاوز المزود حد المعدل
+            response = http_client.get(url, retry_status=False, **kwargs)
+
+            if response.status_code not in THROTTLE_STATUSES:
+                rate_limiter.on_success(provider)
+                return response
+
+            rate_limiter.on_throttle(provider, self._retry_after(response))
+            if attempt == self.MAX_ATTEMPTS:
+                return response
+            logger.info(f'{provider}: {response.status_code}، إعادة المحاولة {attempt}')
+
+    def _retry_after(self, response):
+        value = response.headers.get('Retry-After')
+        try:
+            return float(value) if value is not None else None
+        except ValueError:
+            # Retry-After بصيغة التاريخ نادر لدى هذه المزودات
+            return None
+
+    def map(self, func, items, workers=None):
+        """func لكل عنصر بخيوط متزامنة؛ النتائج بترتيب العناصر
+
+        الاستثناء يُسجل ويصبح None حتى لا يوقف بقية الدفعة. func للشبكة
+        والملفات فقط، والكتابة في قاعدة البيانات تبقى في الخيط الرئيسي.
+        """
+        items = list(items)
+        workers = min(workers or self.workers, len(items))
+        if workers <= 1:
+            return [self._call(func, item) for item in items]
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(lambda item: self._call(func, item), items))
+
+    def _call(self, func, item):
+        try:
+            return func(item)
+        except Exception as e:
+            logger.error(f'خطأ في جلب الوسائط: {e}')
+            return None
+
+
+# إنشاء instance للاستخدام
+media_fetcher = MediaFetcher()
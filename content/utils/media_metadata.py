@@ -0,0 +1,210 @@
+# content/utils/media_metadata.py
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.utils import timezone
+import hashlib
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# نتائج جلب المزود
+FOUND = 'found'
+NOT_FOUND = 'not_found'
+NOT_MODIFIED = 'not_modified'
+
+
+class MediaMetadataStore:
+    """مخزن دائم لمعلومات الوسائط الخارجية مع تحديث شرطي
+
+    القراءة من جدول MediaMetadata:
+    - سجل صالح يُعاد مباشرة (والسجل السلبي يعني وسائط غير موجودة).
+    - سجل منتهي الصلاحية خلال فترة STALE_TTL يُعاد فوراً ويُحدث في الخلفية
+      (stale-while-revalidate).
+    - غياب السجل أو تجاوزه فترة STALE_TTL يعني جلباً متزامناً.
+
+    كل تحديث يمر بقفل في الذاكرة المؤقتة لكل (مزود، معرف) فتسبب موجة
+    طلبات للوسائط نفسها طلباً واحداً للمزود، وبقية الطلبات تنتظر نتيجته.
+    التحديث يرسل ETag المخزن فيكتفي المزود بـ 304 إذا لم يتغير شيء، وفشل
+    المزود لا يمحو البيانات المخزنة بل يؤجل المحاولة التالية تصاعدياً.
+    """
+
+    KEY_PREFIX = 'media-meta'
+    LOCK_TIMEOUT = 60
+    POLL_INTERVAL = 0.05
+    MAX_ERROR_BACKOFF = 60 * 60
+
+    def __init__(self):
+        self.ttl = timedelta(seconds=settings.MEDIA_METADATA_TTL)
+        self.stale_ttl = timedelta(seconds=settings.MEDIA_METADATA_STALE_TTL)
+        self.negative_ttl = timedelta(seconds=settings.MEDIA_METADATA_NEGATIVE_TTL)
+        self.wait_timeout = settings.MEDIA_METADATA_WAIT
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
+    # === المفاتيح ===
+
+    def external_id(self, provider, value):
+        """معرف التخزين: معرف الفيديو كما هو، وبصمة الرابط لـ SoundCloud"""
+        if provider == 'soundcloud':
+            return hashlib.sha1(value.strip().rstrip('/').encode('utf-8')).hexdigest()
+        return value
+
+    def _lock_key(self, provider, external_id):
+        return f'{self.KEY_PREFIX}:lock:{provider}:{external_id}'
+
+    def _fetcher(self, provider):
+        from .media_utils import youtube_handler, soundcloud_handler
+        return {
+            'youtube': youtube_handler.fetch_video,
+            'soundcloud': soundcloud_handler.fetch_track,
+        }[provider]
+
+    def _row(self, provider, external_id):
+        from content.models import MediaMetadata
+        return MediaMetadata.objects.filter(provider=provider, external_id=external_id).first()
+
+    # === القراءة ===
+
+    def get(self, provider, value, refresh=False):
+        """سجل MediaMetadata للوسائط أو None إذا تعذر الجلب ولا يوجد سجل
+
+        value معرف الفيديو أو رابط المقطع. refresh يتجاوز الصلاحية (للمزامنة).
+        """
+        external_id = self.external_id(provider, value)
+        row = self._row(provider, external_id)
+        now = timezone.now()
+
+        if row is not None and not refresh:
+            if row.expires_at > now:
+                return row
+            if row.fetched_at and row.fetched_at + self.stale_ttl > now:
+                self._refresh_in_background(provider, value, external_id)
+                return row
+
+        return self._refresh(provider, value, external_id, row)
+
+    def _refresh(self, provider, value, external_id, row):
+        """جلب متزامن؛ من لم يحصل على القفل ينتظر نتيجة من حصل عليه"""
+        lock_key = self._lock_key(provider, external_id)
+        if cache.add(lock_key, 1, self.LOCK_TIMEOUT):
+            try:
+                return self._fetch_and_store(provider, value, external_id, row)
+            finally:
+                cache.delete(lock_key)
+
+        previous = row.fetched_at if row is not None else None
+        deadline = time.monotonic() + self.wait_timeout
+        while time.monotonic() < deadline:
+            time.sleep(self.POLL_INTERVAL)
+            current = self._row(provider, external_id)
+            if current is not None and current.fetched_at != previous:
+                return current
+            if cache.get(lock_key) is None:
+                # انتهى الجلب الآخر دون نتيجة جديدة (خطأ من المزود)
+                return current
+        return row
+
+    def _refresh_in_background(self, provider, value, external_id):
+        lock_key = self._lock_key(provider, external_id)
+        if not cache.add(lock_key, 1, self.LOCK_TIMEOUT):
+            return
+
+        def task():
+            try:
+                self._fetch_and_store(provider, value, external_id, self._row(provider, external_id))
+            except Exception as e:
+                logger.error(f'خطأ في تحديث معلومات {provider}:{external_id} في الخلفية: {e}')
+            finally:
+                cache.delete(lock_key)
+                # الخيط خارج دورة الطلب فيُغلق اتصال قاعدة البيانات هنا
+                connection.close()
+
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='media-meta')
+        self._executor.submit(task)
+
+    # === الكتابة ===
+
+    def _fetch_and_store(self, provider, value, external_id, row):
+        from content.models import MediaMetadata
+
+        now = timezone.now()
+        etag = row.etag if row is not None and not row.is_missing else ''
+        try:
+            status, data, new_etag = self._fetcher(provider)(value, etag=etag or None)
+        except Exception as e:
+            logger.error(f'تعذر جلب معلومات {provider}:{value}: {e}')
+            if row is not None:
+                # الاحتفاظ بالبيانات المخزنة وتأجيل المحاولة التالية تصاعدياً
+                row.error_count = min(row.error_count + 1, 16)
+                row.last_error = str(e)[:255]
+                backoff = min(self.MAX_ERROR_BACKOFF, 30 * 2 ** row.error_count)
+                row.expires_at = now + timedelta(seconds=backoff)
+                row.save(update_fields=['error_count', 'last_error', 'expires_at'])
+            return row
+
+        if status == NOT_MODIFIED and row is not None:
+            row.fetched_at = now
+            row.expires_at = now + self.ttl
+            row.error_count = 0
+            row.last_error = ''
+            row.save(update_fields=['fetched_at', 'expires_at', 'error_count', 'last_error'])
+            return row
+
+        row, _ = MediaMetadata.objects.update_or_create(
+            provider=provider, external_id=external_id,
+            defaults=self._fields(provider, value, status == FOUND and data, new_etag, now)
+        )
+        return row
+
+    def _fields(self, provider, value, data, etag, now):
+        """حقول السجل لنتيجة جلب (data=None/False للسجل السلبي)"""
+        return {
+            'source_url': value if provider == 'soundcloud' else '',
+            'data': data or {},
+            'etag': (etag or '')[:255] if data else '',
+            'is_missing': not data,
+            'fetched_at': now,
+            'expires_at': now + (self.ttl if data else self.negative_ttl),
+            'error_count': 0,
+            'last_error': '',
+        }
+
+    def store_many(self, provider, results):
+        """حفظ نتائج جلب جماعي {المعرف: البيانات أو None} بعمليتين جماعيتين"""
+        from content.models import MediaMetadata
+
+        if not results:
+            return
+        now = timezone.now()
+        by_external_id = {self.external_id(provider, value): value for value in results}
+        existing = {
+            row.external_id: row for row in
+            MediaMetadata.objects.filter(provider=provider, external_id__in=list(by_external_id))
+        }
+
+        to_create, to_update = [], []
+        for external_id, value in by_external_id.items():
+            fields = self._fields(provider, value, results[value], '', now)
+            row = existing.get(external_id)
+            if row is None:
+                to_create.append(MediaMetadata(provider=provider, external_id=external_id, **fields))
+            else:
+                for name, field_value in fields.items():
+                    setattr(row, name, field_value)
+                to_update.append(row)
+
+        MediaMetadata.objects.bulk_create(to_create, batch_size=500, ignore_conflicts=True)
+        MediaMetadata.objects.bulk_update(to_update, list(self._fields(provider, '', None, '', now)), batch_size=500)
+
+
+# إنشاء instance للاستخدام
+media_metadata = MediaMetadataStore()
@@ -0,0 +1,233 @@
+# content/utils/media_sync.py
+
+from django.utils import timezone
+import logging
+
+from .media_fetcher import media_fetcher
+from .media_utils import youtube_handler, soundcloud_handler
+from .sync_scheduler import sync_scheduler
+
+logger = logging.getLogger(__name__)
+
+
+class MediaSync:
+    """تطبيق معلومات YouTube وSoundCloud على العناصر وحفظها على دفعات
+
+    في وضع الدفعات تُجلب معلومات حتى 50 فيديو بطلب videos.list واحد
+    (وحدة حصة واحدة بدلاً من 50)، والطلبات وتنزيل الصور تجري بالتوازي عبر
+    media_fetcher ضمن حد معدل كل مزود، وتُحفظ العناصر المتغيرة بـ bulk_update
+    واحد لكل دفعة. bulk_update لا يُطلق الإشارات، فتُطبق آثارها هنا:
+    فهرس البحث للعناصر التي تغير نصها، وإحصائيات القوائم وبيانها وصفحاتها.
+    نتيجة كل عنصر تُسجل في MediaSyncState عبر sync_scheduler لتحديد موعد
+    مزامنته التالية.
+    """
+
+    # الحقول التي تدخل في وثيقة البحث
+    SEARCH_FIELDS = {'title', 'content_text'}
+
+    # === تطبيق المعلومات ===
+
+    def apply_youtube_info(self, item, info):
+        """تحديث العنصر من معلومات YouTube وإرجاع أسماء الحقول المتغيرة"""
+        changed = set()
+
+        # تحديث المعلومات إذا كانت فارغة أو قديمة
+        if not item.title or item.title.startswith('فيديو YouTube'):
+            if info.get('title') and item.title != info['title']:
+                item.title = info['title']
+                changed.add('title')
+
+        if not item.content_text and info.get('description'):
+            item.content_text = info['description'][:1000]  # الحد الأقصى
+            changed.add('content_text')
+
+        # المدة بالثواني (تدخل في المدة الإجمالية للقائمة)
+        duration = info.get('duration') or 0
+        if duration and item.duration != duration:
+            item.duration = duration
+            changed.add('duration')
+
+        return changed
+
+    def apply_soundcloud_info(self, item, info):
+        """تحديث العنصر من معلومات SoundCloud وإرجاع أسماء الحقول المتغيرة"""
+        changed = set()
+
+        if not item.title or 'مقطع SoundCloud' in item.title:
+            if info.get('title') and item.title != info['title']:
+                item.title = info['title']
+                changed.add('title')
+
+        if not item.content_text and info.get('description'):
+            item.content_text = info['description'][:1000]
+            changed.add('content_text')
+
+        if not item.soundcloud_track_id and info.get('id'):
+            item.soundcloud_track_id = str(info['id'])
+            changed.add('soundcloud_track_id')
+
+        # مدة SoundCloud بالميلي ثانية، ولا تُستبدل مدة YouTube إن وُجدت
+        duration = (info.get('duration') or 0) // 1000
+        if duration and not item.youtube_url and item.duration != duration:
+            item.duration = duration
+            changed.add('duration')
+
+        return changed
+
+    # === الصور المصغرة ===
+
+    def needs_thumbnail(self, item):
+        return not item.thumbnail or not item.thumbnail.name
+
+    def youtube_thumbnail_job(self, item):
+        return lambda: youtube_handler.download_thumbnail(
+            item.youtube_video_id,
+            f'youtube_{item.youtube_video_id}'
+        )
+
+    def soundcloud_artwork_job(self, item, info):
+        if not info.get('artwork_url'):
+            return None
+        return lambda: soundcloud_handler.download_artwork(
+            info['artwork_url'],
+            f'soundcloud_{info.get("id", item.id)}'
+        )
+
+    def attach_thumbnails(self, jobs, changes):
+        """تنزيل الصور بالتوازي من [(عنصر، دالة تنزيل)] وتسجيل الحقل المتغير"""
+        jobs = [(item, job) for item, job in jobs if job is not None]
+        paths = media_fetcher.map(lambda pair: pair[1](), jobs)
+        for (item, _), path in zip(jobs, paths):
+            if path:
+                item.thumbnail = path
+                changes.setdefault(item, set()).add('thumbnail')
+
+    # === الحفظ ===
+
+    def save_items(self, changes):
+        """حفظ {عنصر: الحقول المتغيرة} بـ bulk_update واحد وتطبيق آثار الحفظ"""
+        from core.page_cache import page_cache
+        from core.search import search_index
+        from core.search.autocomplete import autocomplete
+        from content.models import PlaylistItem
+        from .playlist_manifest import playlist_manifest
+        from .playlist_stats import playlist_stats
+
+        changes = {item: fields for item, fields in changes.items() if fields}
+        if not changes:
+            return 0
+
+        now = timezone.now()
+        fields = set().union(*changes.values())
+        for item in changes:
+            item.updated_at = now
+        PlaylistItem.objects.bulk_update(list(changes), sorted(fields | {'updated_at'}))
+
+        for item, item_fields in changes.items():
+            if item_fields & self.SEARCH_FIELDS:
+                search_index.update(item)
+                autocomplete.update(item)
+
+        playlist_ids = {item.playlist_id for item in changes}
+        playlist_stats.refresh_playlists(playlist_ids)
+        playlist_manifest.invalidate(*playlist_ids)
+        page_cache.purge(
+            *(f'item:{item.pk}' for item in changes),
+            *(f'playlist:{pk}' for pk in playlist_ids)
+        )
+        return len(changes)
+
+    # === المزامنة ===
+
+    def sync_youtube_batch(self, items, update_thumbnails=False):
+        """مزامنة دفعة عناصر YouTube بطلب videos.list لكل 50 معرفاً (بالتوازي)
+
+        يعيد إحصائيات الدفعة: updated (المحفوظة)، missing (فيديوهات غير
+        موجودة)، failed (فشل طلب دفعتها)، requests (طلبات API).
+        """
+        changes = {}
+        by_video = {}
+        outcomes = []
+        for item in items:
+            if not item.youtube_video_id:
+                # استخراج معرف الفيديو إذا لم يكن موجوداً
+                video_id = youtube_handler.extract_video_id(item.youtube_url)
+                if not video_id:
+                    outcomes.append((item, 'missing', ''))
+                    continue
+                item.youtube_video_id = video_id
+                changes[item] = {'youtube_video_id'}
+            by_video.setdefault(item.youtube_video_id, []).append(item)
+
+        video_ids = list(by_video)
+        infos = youtube_handler.get_videos_info(video_ids) if video_ids else {}
+
+        missing = failed = 0
+        thumbnail_jobs = []
+        for video_id, video_items in by_video.items():
+            if video_id not in infos:
+                failed += len(video_items)
+                outcomes.extend((item, 'failed', '') for item in video_items)
+                continue
+            info = infos[video_id]
+            if info is None:
+                missing += len(video_items)
+                outcomes.extend((item, 'missing', '') for item in video_items)
+                logger.info(f'فيديو YouTube غير متاح: {video_id}')
+                continue
+            content_hash = sync_scheduler.content_hash('youtube', info)
+            for item in video_items:
+                outcomes.append((item, 'success', content_hash))
+                changes.setdefault(item, set()).update(self.apply_youtube_info(item, info))
+                if update_thumbnails and self.needs_thumbnail(item):
+                    thumbnail_jobs.append((item, self.youtube_thumbnail_job(item)))
+
+        self.attach_thumbnails(thumbnail_jobs, changes)
+        updated = self.save_items(changes)
+        sync_scheduler.record('youtube', outcomes)
+
+        return {
+            'items': len(items),
+            'updated': updated,
+            'missing': missing,
+            'failed': failed,
+            'requests': -(-len(video_ids) // youtube_handler.MAX_IDS_PER_REQUEST) if youtube_handler.api_key else 0,
+        }
+
+    def sync_soundcloud_batch(self, items, update_thumbnails=False):
+        """مزامنة دفعة عناصر SoundCloud (طلب resolve لكل عنصر بالتوازي)"""
+        infos = soundcloud_handler.get_tracks_info([item.soundcloud_url for item in items])
+
+        changes = {}
+        thumbnail_jobs = []
+        missing = failed = 0
+        outcomes = []
+        for item in items:
+            if item.soundcloud_url not in infos:
+                failed += 1
+                outcomes.append((item, 'failed', ''))
+                continue
+            info = infos[item.soundcloud_url]
+            if info is None:
+                missing += 1
+                outcomes.append((item, 'missing', ''))
+                continue
+            outcomes.append((item, 'success', sync_scheduler.content_hash('soundcloud', info)))
+            changes[item] = self.apply_soundcloud_info(item, info)
+            if update_thumbnails and self.needs_thumbnail(item):
+                thumbnail_jobs.append((item, self.soundcloud_artwork_job(item, info)))
+
+        self.attach_thumbnails(thumbnail_jobs, changes)
+        updated = self.save_items(changes)
+        sync_scheduler.record('soundcloud', outcomes)
+        return {
+            'items': len(items),
+            'updated': updated,
+            'missing': missing,
+            'failed': failed,
+            'requests': len(items) if soundcloud_handler.client_id else 0,
+        }
+
+
+# إنشاء instance للاستخدام
+media_sync = MediaSync()
@@ -13,15 +13,22 @@ from PIL import Image
 import subprocess
 import logging
 
+from .media_fetcher import media_fetcher
+from .media_metadata import media_metadata, FOUND, NOT_FOUND, NOT_MODIFIED
+
 logger = logging.getLogger(__name__)
 
 
 class YouTubeHandler:
     """معالج YouTube المتقدم"""
     
+    # أقصى عدد معرفات في طلب videos.list واحد (وحدة حصة واحدة للطلب)
+    MAX_IDS_PER_REQUEST = 50
+    VIDEO_PARTS = 'snippet,statistics,contentDetails'
+    
     def __init__(self):
         self.api_key = getattr(settings, 'YOUTUBE_API_KEY', '')
-        self.api_base_url = 'https://www.googleapis.com/youtube/v3'
+        self.api_base_url = getattr(settings, 'YOUTUBE_API_BASE_URL', 'https://www.googleapis.com/youtube/v3')
     
     def extract_video_id(self, url):
         """استخراج معرف الفيديو من رابط YouTube"""
@@ -38,49 +45,105 @@ class YouTubeHandler:
                 return match.group(1)
         return None
     
-    def get_video_info(self, video_id):
-        """الحصول على معلومات الفيديو من YouTube API"""
+    def get_video_info(self, video_id, refresh=False):
+        """الحصول على معلومات الفيديو من مخزن MediaMetadata
+        
+        المخزن يجلب من YouTube API عند الحاجة فقط (انتهاء الصلاحية أو
+        refresh). يعيد None إذا كان الفيديو غير موجود، ومعلومات أساسية
+        عليها 'placeholder': True إذا تعذر الجلب ولا توجد نسخة مخزنة.
+        """
         if not self.api_key:
             return self._get_basic_video_info(video_id)
         
-        try:
-            url = f"{self.api_base_url}/videos"
-            params = {
-                'part': 'snippet,statistics,contentDetails',
-                'id': video_id,
-                'key': self.api_key
-            }
-            
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            if not data.get('items'):
-                return None
-            
-            item = data['items'][0]
-            snippet = item.get('snippet', {})
-            statistics = item.get('statistics', {})
-            content_details = item.get('contentDetails', {})
-            
-            return {
-                'id': video_id,
-                'title': snippet.get('title', ''),
-                'description': snippet.get('description', ''),
-                'thumbnail_url': self._get_best_thumbnail(snippet.get('thumbnails', {})),
-                'channel_title': snippet.get('channelTitle', ''),
-                'duration': self._parse_duration(content_details.get('duration', '')),
-                'view_count': int(statistics.get('viewCount', 0)),
-                'like_count': int(statistics.get('likeCount', 0)),
-                'published_at': snippet.get('publishedAt', ''),
-                'embed_url': f"https://www.youtube.com/embed/{video_id}",
-                'watch_url': f"https://www.youtube.com/watch?v={video_id}"
-            }
+        row = media_metadata.get('youtube', video_id, refresh=refresh)
+        if row is None:
+            return dict(self._get_basic_video_info(video_id), placeholder=True)
+        if row.is_missing:
+            return None
+        return row.data
+    
+    def fetch_video(self, video_id, etag=None):
+        """طلب شرطي لفيديو واحد: (الحالة، المعلومات، ETag)
+        
+        الحالة found أو not_found أو not_modified (304 لـ If-None-Match)،
+        وأخطاء الطلب تُرفع ليحتفظ المخزن بنسخته.
+        """
+        headers = {'If-None-Match': etag} if etag else {}
+        response = self._request_videos([video_id], headers=headers)
+        if response.status_code == 304:
+            return NOT_MODIFIED, None, etag
+        response.raise_for_status()
+        
+        data = response.json()
+        new_etag = data.get('etag') or response.headers.get('ETag', '')
+        if not data.get('items'):
+            return NOT_FOUND, None, new_etag
+        return FOUND, self._parse_video(data['items'][0], video_id), new_etag
+    
+    def get_videos_info(self, video_ids):
+        """معلومات عدة فيديوهات بطلب videos.list واحد لكل 50 معرفاً
+        
+        يعيد {معرف: معلومات أو None}؛ None يعني أن الفيديو غير موجود أو
+        محذوف أو خاص (إخفاق جزئي)، والمعرفات التي فشل طلب دفعتها لا تظهر
+        في النتيجة لتُعاد محاولتها لاحقاً.
+        """
+        video_ids = list(dict.fromkeys(video_id for video_id in video_ids if video_id))
+        if not self.api_key:
+            return {video_id: self._get_basic_video_info(video_id) for video_id in video_ids}
+        
+        chunks = [
+            video_ids[start:start + self.MAX_IDS_PER_REQUEST]
+            for start in range(0, len(video_ids), self.MAX_IDS_PER_REQUEST)
+        ]
+        
+        # الدفعات تُطلب بالتوازي وحد معدل youtube يضبط الإرسال
+        results = {}
+        for chunk, data in zip(chunks, media_fetcher.map(self._fetch_videos, chunks)):
+            if data is None:
+                continue
             
-        except Exception as e:
-            logger.error(f"خطأ في الحصول على معلومات YouTube: {e}")
-            return self._get_basic_video_info(video_id)
+            results.update(dict.fromkeys(chunk))
+            for item in data.get('items', []):
+                if item.get('id') in results:
+                    results[item['id']] = self._parse_video(item, item['id'])
+        
+        # النتائج تُحفظ في المخزن فتخدم الصفحات دون طلبات إضافية
+        media_metadata.store_many('youtube', results)
+        return results
+    
+    def _fetch_videos(self, video_ids):
+        """طلب videos.list لمعرفات (حتى 50)"""
+        response = self._request_videos(video_ids)
+        response.raise_for_status()
+        return response.json()
+    
+    def _request_videos(self, video_ids, **kwargs):
+        return media_fetcher.get('youtube', f"{self.api_base_url}/videos", params={
+            'part': self.VIDEO_PARTS,
+            'id': ','.join(video_ids),
+            'maxResults': len(video_ids),
+            'key': self.api_key
+        }, **kwargs)
+    
+    def _parse_video(self, item, video_id):
+        """تحويل عنصر videos.list إلى قاموس المعلومات"""
+        snippet = item.get('snippet', {})
+        statistics = item.get('statistics', {})
+        content_details = item.get('contentDetails', {})
+        
+        return {
+            'id': video_id,
+            'title': snippet.get('title', ''),
+            'description': snippet.get('description', ''),
+            'thumbnail_url': self._get_best_thumbnail(snippet.get('thumbnails', {})),
+            'channel_title': snippet.get('channelTitle', ''),
+            'duration': self._parse_duration(content_details.get('duration', '')),
+            'view_count': int(statistics.get('viewCount', 0)),
+            'like_count': int(statistics.get('likeCount', 0)),
+            'published_at': snippet.get('publishedAt', ''),
+            'embed_url': f"https://www.youtube.com/embed/{video_id}",
+            'watch_url': f"https://www.youtube.com/watch?v={video_id}"
+        }
     
     def _get_basic_video_info(self, video_id):
         """معلومات أساسية بدون API"""
@@ -124,13 +187,13 @@ class YouTubeHandler:
         try:
             thumbnail_url = f"https://img.youtube.com/vi/{video_id}/maxresdefault.jpg"
             
-            response = requests.get(thumbnail_url, timeout=10)
+            response = media_fetcher.get('media-download', thumbnail_url)
             response.raise_for_status()
             
             # التحقق من أن الصورة موجودة (ليست الصورة الافتراضية للأخطاء)
             if len(response.content) < 1000:  # الصور الافتراضية صغيرة جداً
                 thumbnail_url = f"https://img.youtube.com/vi/{video_id}/hqdefault.jpg"
-                response = requests.get(thumbnail_url, timeout=10)
+                response = media_fetcher.get('media-download', thumbnail_url)
                 response.raise_for_status()
             
             # حفظ الصورة
@@ -152,42 +215,72 @@ class SoundCloudHandler:
         self.client_id = getattr(settings, 'SOUNDCLOUD_CLIENT_ID', '')
         self.api_base_url = 'https://api.soundcloud.com'
     
-    def extract_track_info(self, url):
-        """استخراج معلومات المقطع من رابط SoundCloud"""
-        try:
-            # استخدام resolve API للحصول على معلومات من الرابط
-            if not self.client_id:
-                return self._get_basic_soundcloud_info(url)
-            
-            resolve_url = f"{self.api_base_url}/resolve"
-            params = {
-                'url': url,
-                'client_id': self.client_id
-            }
-            
-            response = requests.get(resolve_url, params=params, timeout=10)
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            return {
-                'id': data.get('id'),
-                'title': data.get('title', ''),
-                'description': data.get('description', ''),
-                'artwork_url': data.get('artwork_url', '').replace('large', 't500x500') if data.get('artwork_url') else '',
-                'user_name': data.get('user', {}).get('username', ''),
-                'duration': data.get('duration', 0),  # بالميلي ثانية
-                'play_count': data.get('playback_count', 0),
-                'like_count': data.get('favoritings_count', 0),
-                'permalink_url': data.get('permalink_url', url),
-                'stream_url': data.get('stream_url', ''),
-                'waveform_url': data.get('waveform_url', ''),
-                'created_at': data.get('created_at', '')
-            }
-            
-        except Exception as e:
-            logger.error(f"خطأ في الحصول على معلومات SoundCloud: {e}")
+    def extract_track_info(self, url, refresh=False):
+        """استخراج معلومات المقطع من رابط SoundCloud عبر مخزن MediaMetadata
+        
+        مثل YouTubeHandler.get_video_info: None للمقطع غير الموجود، ومعلومات
+        أساسية عليها 'placeholder': True إذا تعذر الجلب ولا توجد نسخة مخزنة.
+        """
+        if not self.client_id:
             return self._get_basic_soundcloud_info(url)
+        
+        row = media_metadata.get('soundcloud', url, refresh=refresh)
+        if row is None:
+            return dict(self._get_basic_soundcloud_info(url), placeholder=True)
+        if row.is_missing:
+            return None
+        return row.data
+    
+    def get_tracks_info(self, urls):
+        """معلومات عدة مقاطع (طلب resolve لكل رابط بالتوازي)
+        
+        مثل YouTubeHandler.get_videos_info: {رابط: معلومات أو None}، والروابط
+        التي فشل طلبها لا تظهر في النتيجة، والنتائج تُحفظ في المخزن.
+        """
+        urls = list(dict.fromkeys(url for url in urls if url))
+        if not self.client_id:
+            return {url: self._get_basic_soundcloud_info(url) for url in urls}
+        
+        results = {}
+        for url, fetched in zip(urls, media_fetcher.map(self.fetch_track, urls)):
+            if fetched is not None:
+                results[url] = fetched[1]
+        media_metadata.store_many('soundcloud', results)
+        return results
+    
+    def fetch_track(self, url, etag=None):
+        """طلب resolve شرطي لرابط: (الحالة، المعلومات، ETag)"""
+        headers = {'If-None-Match': etag} if etag else {}
+        # استخدام resolve API للحصول على معلومات من الرابط
+        response = media_fetcher.get('soundcloud', f"{self.api_base_url}/resolve", params={
+            'url': url,
+            'client_id': self.client_id
+        }, headers=headers)
+        if response.status_code == 304:
+            return NOT_MODIFIED, None, etag
+        if response.status_code == 404:
+            return NOT_FOUND, None, ''
+        response.raise_for_status()
+        
+        data = response.json()
+        return FOUND, self._parse_track(data, url), response.headers.get('ETag', '')
+    
+    def _parse_track(self, data, url):
+        """تحويل رد resolve إلى قاموس المعلومات"""
+        return {
+            'id': data.get('id'),
+            'title': data.get('title', ''),
+            'description': data.get('description', ''),
+            'artwork_url': data.get('artwork_url', '').replace('large', 't500x500') if data.get('artwork_url') else '',
+            'user_name': data.get('user', {}).get('username', ''),
+            'duration': data.get('duration', 0),  # بالميلي ثانية
+            'play_count': data.get('playback_count', 0),
+            'like_count': data.get('favoritings_count', 0),
+            'permalink_url': data.get('permalink_url', url),
+            'stream_url': data.get('stream_url', ''),
+            'waveform_url': data.get('waveform_url', ''),
+            'created_at': data.get('created_at', '')
+        }
     
     def _get_basic_soundcloud_info(self, url):
         """معلومات أساسية بدون API"""
@@ -219,7 +312,7 @@ class SoundCloudHandler:
             if not artwork_url:
                 return None
             
-            response = requests.get(artwork_url, timeout=10)
+            response = media_fetcher.get('media-download', artwork_url)
             response.raise_for_status()
             
             image_content = ContentFile(response.content)
@@ -399,40 +492,47 @@ class PlaylistManager:
         return '\n'.join(content)
     
     @staticmethod
-    def get_next_item(current_item, shuffle=False):
-        """الحصول على العنصر التالي في القائمة"""
-        playlist = current_item.playlist
-        items = playlist.playlistitem_set.filter(is_published=True).order_by('order', 'created_at')
+    def get_next_item(current_item, shuffle=False, shuffle_token=None, cycle=0, position=None):
+        """الحصول على العنصر التالي في القائمة (أو في جلسة التشغيل العشوائي)"""
+        from .playlist_index import playlist_index
         
         if shuffle:
-            import random
-            items_list = list(items.exclude(id=current_item.id))
-            return random.choice(items_list) if items_list else None
+            _, next_item = PlaylistManager.get_shuffle_step(current_item, shuffle_token, cycle, position)
+            return next_item
         
-        try:
-            current_index = list(items).index(current_item)
-            next_index = current_index + 1
-            if next_index < len(items):
-                return items[next_index]
-        except (ValueError, IndexError):
-            pass
+        _, next_item = playlist_index.neighbours(current_item)
+        return next_item
+    
+    @staticmethod
+    def get_shuffle_step(current_item, shuffle_token=None, cycle=0, position=None, direction='next'):
+        """(الخطوة، العنصر) في جلسة التشغيل العشوائي
         
-        return None
+        الخطوة تحمل الرمز والدورة والموضع ليرسلها العميل مع الطلب التالي،
+        فيكون التنقل قراءة خانة واحدة وتستمر الدورات بالترتيب نفسه.
+        الرمز الغائب أو التابع لقائمة أخرى يبدأ جلسة جديدة.
+        """
+        from .playlist_shuffle import shuffle_sessions
+        
+        parsed = shuffle_sessions.parse_token(shuffle_token)
+        if parsed is None or parsed[0] != current_item.playlist_id:
+            shuffle_token = shuffle_sessions.create_token(current_item.playlist_id)
+            cycle, position = 0, None
+        step = shuffle_sessions.step(
+            shuffle_token, item_id=current_item.id, position=position, cycle=cycle, direction=direction
+        )
+        if not step:
+            return None, None
+        return step, current_item.playlist.playlistitem_set.select_related('playlist').filter(
+            pk=step['item_id'], is_published=True
+        ).first()
     
     @staticmethod
     def get_previous_item(current_item):
         """الحصول على العنصر السابق في القائمة"""
-        playlist = current_item.playlist
-        items = playlist.playlistitem_set.filter(is_published=True).order_by('order', 'created_at')
-        
-        try:
-            current_index = list(items).index(current_item)
-            if current_index > 0:
-                return items[current_index - 1]
-        except (ValueError, IndexError):
-            pass
+        from .playlist_index import playlist_index
         
-        return None
+        previous_item, _ = playlist_index.neighbours(current_item)
+        return previous_item
 
 
 # إنشاء instances للاستخدام
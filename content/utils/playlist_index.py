@@ -0,0 +1,165 @@
+# content/utils/playlist_index.py
+
+from collections import OrderedDict
+from django.core.cache import cache
+from django.db.models import Q
+import threading
+
+# ترتيب العناصر داخل القائمة (id يفصل بين العناصر المتساوية في الترتيب والتاريخ)
+ITEM_ORDERING = ('order', 'created_at', 'id')
+
+
+class OrderedIds:
+    """معرفات العناصر المنشورة بالترتيب مع خريطة موضع كل معرف"""
+
+    __slots__ = ('ids', 'positions')
+
+    def __init__(self, ids):
+        self.ids = tuple(ids)
+        self.positions = {pk: position for position, pk in enumerate(self.ids)}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def neighbours(self, pk):
+        """(المعرف السابق، المعرف التالي)، أو None إذا لم يكن المعرف في الفهرس"""
+        position = self.positions.get(pk)
+        if position is None:
+            return None
+        previous_id = self.ids[position - 1] if position > 0 else None
+        next_id = self.ids[position + 1] if position + 1 < len(self.ids) else None
+        return previous_id, next_id
+
+
+class PlaylistIndex:
+    """فهرس مرتب لمعرفات عناصر كل قائمة للتنقل السابق/التالي دون مسح القائمة
+
+    المصفوفة تُبنى باستعلام معرفات واحد وتُخزن في الذاكرة المؤقتة المشتركة
+    تحت إصدار القائمة، وتُحفظ نسخة مع خريطة المواضع في ذاكرة العملية.
+    حفظ عنصر أو إعادة ترتيبه أو نشره يرفع الإصدار. إذا لم يوجد العنصر في
+    الفهرس (فهرس قديم أثناء التحديث) يُستخدم استعلام keyset على
+    (order, created_at, id).
+    """
+
+    KEY_PREFIX = 'playlist-index'
+    TIMEOUT = 24 * 60 * 60
+    MAX_LOCAL_PLAYLISTS = 256
+
+    def __init__(self):
+        # {معرف القائمة: (الإصدار، OrderedIds)} بترتيب آخر استخدام
+        self._local = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _version_key(self, playlist_id):
+        return f'{self.KEY_PREFIX}:version:{playlist_id}'
+
+    def _ids_key(self, playlist_id, version):
+        return f'{self.KEY_PREFIX}:ids:{playlist_id}:{version}'
+
+    def get_version(self, playlist_id):
+        version_key = self._version_key(playlist_id)
+        version = cache.get(version_key)
+        if version is None:
+            cache.add(version_key, 1, timeout=None)
+            version = cache.get(version_key, 1)
+        return version
+
+    def invalidate(self, *playlist_ids):
+        for playlist_id in set(playlist_ids):
+            if not playlist_id:
+                continue
+            version_key = self._version_key(playlist_id)
+            try:
+                cache.incr(version_key)
+            except ValueError:
+                cache.add(version_key, 2, timeout=None)
+            with self._lock:
+                self._local.pop(playlist_id, None)
+
+    # === البناء والقراءة ===
+
+    def load(self, playlist_id):
+        from content.models import PlaylistItem
+
+        return list(
+            PlaylistItem.objects.filter(
+                playlist_id=playlist_id, is_published=True
+            ).order_by(*ITEM_ORDERING).values_list('id', flat=True)
+        )
+
+    def get(self, playlist_id):
+        """OrderedIds لعناصر القائمة المنشورة"""
+        version = self.get_version(playlist_id)
+
+        with self._lock:
+            local = self._local.get(playlist_id)
+            if local is not None and local[0] == version:
+                self._local.move_to_end(playlist_id)
+                return local[1]
+
+        ids_key = self._ids_key(playlist_id, version)
+        ids = cache.get(ids_key)
+        if ids is None:
+            ids = self.load(playlist_id)
+            cache.set(ids_key, ids, self.TIMEOUT)
+
+        ordered = OrderedIds(ids)
+        with self._lock:
+            self._local[playlist_id] = (version, ordered)
+            self._local.move_to_end(playlist_id)
+            while len(self._local) > self.MAX_LOCAL_PLAYLISTS:
+                self._local.popitem(last=False)
+        return ordered
+
+    # === التنقل ===
+
+    def neighbour_ids(self, item):
+        """(معرف العنصر السابق، معرف العنصر التالي) في قائمة العنصر"""
+        neighbours = self.get(item.playlist_id).neighbours(item.pk)
+        if neighbours is None:
+            neighbours = (
+                self._keyset_neighbour_id(item, previous=True),
+                self._keyset_neighbour_id(item, previous=False),
+            )
+        return neighbours
+
+    def _keyset_neighbour_id(self, item, previous):
+        from content.models import PlaylistItem
+
+        if previous:
+            after = (
+                Q(order__lt=item.order)
+                | Q(order=item.order, created_at__lt=item.created_at)
+                | Q(order=item.order, created_at=item.created_at, id__lt=item.pk)
+            )
+            ordering = [f'-{field}' for field in ITEM_ORDERING]
+        else:
+            after = (
+                Q(order__gt=item.order)
+                | Q(order=item.order, created_at__gt=item.created_at)
+                | Q(order=item.order, created_at=item.created_at, id__gt=item.pk)
+            )
+            ordering = list(ITEM_ORDERING)
+
+        return PlaylistItem.objects.filter(
+            after, playlist_id=item.playlist_id, is_published=True
+        ).order_by(*ordering).values_list('id', flat=True).first()
+
+    def neighbours(self, item, queryset=None):
+        """(العنصر السابق، العنصر التالي) باستعلام واحد لكليهما"""
+        from content.models import PlaylistItem
+
+        previous_id, next_id = self.neighbour_ids(item)
+        wanted = [pk for pk in (previous_id, next_id) if pk]
+        if not wanted:
+            return None, None
+
+        if queryset is None:
+            # get_absolute_url يحتاج slug القائمة
+            queryset = PlaylistItem.objects.select_related('playlist')
+        items = queryset.in_bulk(wanted)
+        return items.get(previous_id), items.get(next_id)
+
+
+# إنشاء instance للاستخدام
+playlist_index = PlaylistIndex()
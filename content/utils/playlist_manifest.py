@@ -0,0 +1,115 @@
+# content/utils/playlist_manifest.py
+
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.urls import reverse
+from django.utils import translation
+import json
+
+from .playlist_index import ITEM_ORDERING
+
+# الأعمدة بالترتيب الذي يُرسل به البيان
+MANIFEST_COLUMNS = (
+    'id', 'title', 'slug', 'youtube_video_id', 'soundcloud_url', 'thumbnail', 'duration'
+)
+
+
+class PlaylistManifest:
+    """بيان مضغوط لعناصر القائمة المنشورة لتشغيلها من المتصفح
+
+    العناصر تُرسل كأعمدة (قائمة لكل حقل) بدلاً من كائن لكل عنصر، مع قالب
+    رابط واحد للعناصر، فيتنقل المشغل ويجلب مسبقاً ويخلط الترتيب دون
+    أي طلب إضافي. البيان مخزن كنص JSON جاهز تحت إصدار القائمة، والإصدار
+    نفسه هو ETag فيُجاب على الطلب الشرطي دون استعلام.
+    """
+
+    KEY_PREFIX = 'playlist-manifest'
+    TIMEOUT = 24 * 60 * 60
+    URL_SLUG_PLACEHOLDER = '__slug__'
+
+    def _version_key(self, playlist_id):
+        return f'{self.KEY_PREFIX}:version:{playlist_id}'
+
+    def _manifest_key(self, playlist_id, version, language):
+        return f'{self.KEY_PREFIX}:{playlist_id}:{version}:{language}'
+
+    def get_version(self, playlist_id):
+        version_key = self._version_key(playlist_id)
+        version = cache.get(version_key)
+        if version is None:
+            cache.add(version_key, 1, timeout=None)
+            version = cache.get(version_key, 1)
+        return version
+
+    def invalidate(self, *playlist_ids):
+        for playlist_id in set(playlist_ids):
+            if not playlist_id:
+                continue
+            version_key = self._version_key(playlist_id)
+            try:
+                cache.incr(version_key)
+            except ValueError:
+                cache.add(version_key, 2, timeout=None)
+
+    def etag(self, playlist_id, version=None):
+        """ETag البيان (يتضمن اللغة لأن الروابط تختلف حسبها)"""
+        if version is None:
+            version = self.get_version(playlist_id)
+        language = translation.get_language() or ''
+        return f'"{playlist_id}-{version}-{language}"'
+
+    # === البناء ===
+
+    def build(self, playlist):
+        """البيان كقاموس"""
+        from content.models import PlaylistItem
+
+        rows = PlaylistItem.objects.filter(
+            playlist=playlist, is_published=True
+        ).order_by(*ITEM_ORDERING).values_list(
+            'id', 'title', 'slug', 'youtube_video_id', 'soundcloud_url', 'thumbnail', 'duration'
+        )
+
+        columns = {column: [] for column in MANIFEST_COLUMNS}
+        thumbnail_field = PlaylistItem._meta.get_field('thumbnail')
+        for row in rows:
+            values = dict(zip(MANIFEST_COLUMNS, row))
+            if values['thumbnail']:
+                values['thumbnail'] = thumbnail_field.storage.url(values['thumbnail'])
+            for column in MANIFEST_COLUMNS:
+                columns[column].append(values[column] or (0 if column == 'duration' else ''))
+
+        item_url = reverse('content:item_detail', kwargs={
+            'playlist_slug': playlist.slug,
+            'item_slug': self.URL_SLUG_PLACEHOLDER,
+        }).replace(self.URL_SLUG_PLACEHOLDER, '{slug}')
+
+        return {
+            'playlist': {
+                'id': playlist.pk,
+                'title': playlist.title,
+                'url': playlist.get_absolute_url(),
+            },
+            'item_url': item_url,
+            'count': len(columns['id']),
+            'items': columns,
+        }
+
+    def get(self, playlist):
+        """(نص JSON، ETag) للبيان الحالي"""
+        version = self.get_version(playlist.pk)
+        language = translation.get_language() or ''
+        manifest_key = self._manifest_key(playlist.pk, version, language)
+
+        content = cache.get(manifest_key)
+        if content is None:
+            content = json.dumps(
+                self.build(playlist), cls=DjangoJSONEncoder,
+                ensure_ascii=False, separators=(',', ':')
+            )
+            cache.set(manifest_key, content, self.TIMEOUT)
+        return content, self.etag(playlist.pk, version)
+
+
+# إنشاء instance للاستخدام
+playlist_manifest = PlaylistManifest()
@@ -0,0 +1,139 @@
+# content/utils/playlist_shuffle.py
+
+from array import array
+from collections import OrderedDict
+from django.core.cache import cache
+import hashlib
+import re
+import secrets
+import threading
+
+from .playlist_index import playlist_index
+
+TOKEN_RE = re.compile(r'^(\d+)-([0-9a-f]{16})$')
+
+
+class ShuffleSessions:
+    """جلسات تشغيل عشوائي بتبديلة ثابتة لكل رمز عميل
+
+    الرمز يحمل معرف القائمة وبذرة عشوائية، والتبديلة هي عناصر القائمة
+    المنشورة مرتبة حسب بصمة (البذرة، الدورة، المعرف). لذلك يمكن إعادة
+    توليدها من الرمز وحده بعد إعادة تحميل الصفحة أو فقدان الذاكرة المؤقتة،
+    وإضافة عنصر أو حذفه لا يغير الترتيب النسبي لبقية العناصر. كل عنصر
+    يُشغل مرة واحدة في كل دورة، وبعد آخر عنصر تبدأ دورة بتبديلة جديدة.
+
+    التبديلة تُخزن كمصفوفة معرفات مضغوطة (array('q')) لكل إصدار من فهرس
+    القائمة، والعميل يرسل موضعه الحالي فيكون التالي/السابق قراءة خانة واحدة.
+    """
+
+    KEY_PREFIX = 'playlist-shuffle'
+    TIMEOUT = 24 * 60 * 60
+    MAX_LOCAL_PERMUTATIONS = 128
+
+    def __init__(self):
+        # {(الرمز، الدورة، إصدار الفهرس): array} بترتيب آخر استخدام
+        self._local = OrderedDict()
+        self._lock = threading.Lock()
+
+    # === الرموز ===
+
+    def create_token(self, playlist_id):
+        return f'{playlist_id}-{secrets.randbits(64):016x}'
+
+    def parse_token(self, token):
+        """(معرف القائمة، البذرة) أو None للرمز غير الصالح"""
+        match = TOKEN_RE.match(token or '')
+        if not match:
+            return None
+        return int(match.group(1)), match.group(2)
+
+    # === التبديلة ===
+
+    def _permutation_key(self, token, cycle, version):
+        return f'{self.KEY_PREFIX}:{token}:{cycle}:{version}'
+
+    def build(self, ids, seed, cycle):
+        """ترتيب المعرفات حسب بصمة ثابتة للبذرة والدورة"""
+        salt = f'{seed}:{cycle}:'.encode()
+
+        def sort_key(pk):
+            return hashlib.blake2b(salt + str(pk).encode(), digest_size=8).digest()
+
+        return array('q', sorted(ids, key=sort_key))
+
+    def permutation(self, token, cycle=0):
+        """تبديلة عناصر القائمة للرمز والدورة (array من المعرفات)"""
+        playlist_id, seed = self.parse_token(token)
+        version = playlist_index.get_version(playlist_id)
+        local_key = (token, cycle, version)
+
+        with self._lock:
+            ids = self._local.get(local_key)
+            if ids is not None:
+                self._local.move_to_end(local_key)
+                return ids
+
+        cache_key = self._permutation_key(token, cycle, version)
+        data = cache.get(cache_key)
+        if data is not None:
+            ids = array('q')
+            ids.frombytes(data)
+        else:
+            ids = self.build(playlist_index.get(playlist_id).ids, seed, cycle)
+            cache.set(cache_key, ids.tobytes(), self.TIMEOUT)
+
+        with self._lock:
+            self._local[local_key] = ids
+            while len(self._local) > self.MAX_LOCAL_PERMUTATIONS:
+                self._local.popitem(last=False)
+        return ids
+
+    # === التنقل ===
+
+    def step(self, token, item_id=None, position=None, cycle=0, direction='next'):
+        """الخطوة التالية أو السابقة في جلسة التشغيل العشوائي
+
+        يعيد {'token', 'cycle', 'position', 'item_id'} أو None عند بداية
+        الجلسة (لا سابق) أو إذا كانت القائمة فارغة.
+        """
+        cycle = max(0, cycle or 0)
+        ids = self.permutation(token, cycle)
+        if not ids:
+            return None
+
+        # الموضع المرسل من العميل يُتحقق منه بقراءة خانة واحدة
+        if position is None or not 0 <= position < len(ids) or ids[position] != item_id:
+            try:
+                position = ids.index(item_id) if item_id is not None else -1
+            except ValueError:
+                position = -1
+
+        if direction == 'next':
+            position += 1
+            if position >= len(ids):
+                cycle += 1
+                position = 0
+                ids = self.permutation(token, cycle)
+        else:
+            if position < 0:
+                return None
+            position -= 1
+            if position < 0:
+                if cycle == 0:
+                    return None
+                cycle -= 1
+                ids = self.permutation(token, cycle)
+                position = len(ids) - 1
+
+        if not ids:
+            return None
+        return {
+            'token': token,
+            'cycle': cycle,
+            'position': position,
+            'item_id': ids[position],
+        }
+
+
+# إنشاء instance للاستخدام
+shuffle_sessions = ShuffleSessions()
@@ -0,0 +1,169 @@
+# content/utils/playlist_stats.py
+
+from django.db.models import Case, Count, F, IntegerField, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class PlaylistStats:
+    """إحصائيات محسوبة مسبقاً لقوائم التشغيل والتصنيفات
+
+    عدد العناصر المنشورة ومدتها ومشاهداتها مخزنة في صف القائمة، وعدد
+    القوائم المنشورة مخزن في صف التصنيف، فتُعرض صفحات القوائم دون
+    استعلام COUNT لكل بطاقة. الإشارات تعيد الحساب عند تغير العناصر،
+    وكاتب العدادات يضيف زيادات المشاهدات مباشرة، وأمر المطابقة يصحح
+    أي انحراف.
+    """
+
+    PLAYLIST_FIELDS = ('published_items_count', 'total_duration', 'total_item_views')
+
+    # === قوائم التشغيل ===
+
+    def playlist_aggregates(self, playlist_ids=None):
+        """{معرف القائمة: {الحقل: القيمة المحسوبة}} من العناصر المنشورة"""
+        from content.models import PlaylistItem
+
+        items = PlaylistItem.objects.filter(is_published=True)
+        if playlist_ids is not None:
+            items = items.filter(playlist_id__in=playlist_ids)
+
+        rows = items.order_by().values('playlist_id').annotate(
+            count=Count('id'),
+            duration=Sum('duration'),
+            views=Sum('views_count'),
+        )
+        return {
+            row['playlist_id']: {
+                'published_items_count': row['count'],
+                'total_duration': row['duration'] or 0,
+                'total_item_views': row['views'] or 0,
+            }
+            for row in rows
+        }
+
+    def refresh_playlists(self, playlist_ids):
+        """إعادة حساب إحصائيات القوائم المحددة (استعلام تجميع + تحديث لكل قائمة)
+
+        تعيد معرفات القوائم التي تغير عدد عناصرها المنشورة.
+        """
+        from content.models import Playlist
+
+        playlist_ids = {pk for pk in playlist_ids if pk}
+        if not playlist_ids:
+            return set()
+
+        aggregates = self.playlist_aggregates(playlist_ids)
+        current = Playlist.objects.filter(pk__in=playlist_ids).values('pk', *self.PLAYLIST_FIELDS)
+
+        changed_counts = set()
+        for row in current:
+            values = aggregates.get(row['pk'], dict.fromkeys(self.PLAYLIST_FIELDS, 0))
+            if all(row[field] == values[field] for field in self.PLAYLIST_FIELDS):
+                continue
+            if row['published_items_count'] != values['published_items_count']:
+                changed_counts.add(row['pk'])
+            # update() لا يُطلق إشارات الحفظ (لا إعادة فهرسة ولا تعديل updated_at)
+            Playlist.objects.filter(pk=row['pk']).update(**values)
+        return changed_counts
+
+    def add_item_views(self, item_deltas):
+        """إضافة زيادات مشاهدات العناصر المنشورة إلى قوائمها بجملة UPDATE واحدة
+
+        item_deltas = {item_id: {'views_count': 3, ...}} كما يرسلها كاتب العدادات.
+        """
+        from content.models import Playlist, PlaylistItem
+
+        views = {
+            item_id: fields['views_count']
+            for item_id, fields in item_deltas.items()
+            if fields.get('views_count')
+        }
+        if not views:
+            return
+
+        totals = {}
+        items = PlaylistItem.objects.filter(pk__in=views, is_published=True).values_list('pk', 'playlist_id')
+        for item_id, playlist_id in items:
+            totals[playlist_id] = totals.get(playlist_id, 0) + views[item_id]
+        if not totals:
+            return
+
+        Playlist.objects.filter(pk__in=totals).update(
+            total_item_views=F('total_item_views') + Case(
+                *(When(pk=pk, then=Value(delta)) for pk, delta in totals.items()),
+                default=Value(0),
+                output_field=IntegerField(),
+            )
+        )
+
+    # === التصنيفات ===
+
+    def refresh_categories(self, category_ids=None):
+        """إعادة حساب عدد القوائم المنشورة للتصنيفات بجملة UPDATE واحدة"""
+        from content.models import Playlist
+        from core.models import Category
+
+        categories = Category.objects.all()
+        if category_ids is not None:
+            category_ids = {pk for pk in category_ids if pk}
+            if not category_ids:
+                return
+            categories = categories.filter(pk__in=category_ids)
+
+        published = Playlist.objects.filter(
+            category=OuterRef('pk'), is_published=True
+        ).order_by().values('category').annotate(count=Count('id')).values('count')
+        categories.update(published_playlists_count=Coalesce(Subquery(published), 0))
+
+    # === المطابقة ===
+
+    def reconcile(self, fix=True):
+        """مقارنة كل القيم المخزنة بالقيم الفعلية وتصحيح المنحرف منها
+
+        تعيد (قائمة القوائم المنحرفة، قائمة التصنيفات المنحرفة) كأزواج
+        (الكائن المخزن، القيم الصحيحة).
+        """
+        from content.models import Playlist
+        from core.models import Category
+
+        aggregates = self.playlist_aggregates()
+        empty = dict.fromkeys(self.PLAYLIST_FIELDS, 0)
+
+        playlist_drift = []
+        for row in Playlist.objects.values('pk', 'title', *self.PLAYLIST_FIELDS).iterator():
+            values = aggregates.get(row['pk'], empty)
+            if any(row[field] != values[field] for field in self.PLAYLIST_FIELDS):
+                playlist_drift.append((row, values))
+
+        category_counts = dict(
+            Playlist.objects.filter(is_published=True).order_by().values('category_id').annotate(
+                count=Count('id')
+            ).values_list('category_id', 'count')
+        )
+        category_drift = []
+        for row in Category.objects.values('pk', 'name', 'published_playlists_count'):
+            count = category_counts.get(row['pk'], 0)
+            if row['published_playlists_count'] != count:
+                category_drift.append((row, {'published_playlists_count': count}))
+
+        if fix:
+            for row, values in playlist_drift:
+                Playlist.objects.filter(pk=row['pk']).update(**values)
+            for row, values in category_drift:
+                Category.objects.filter(pk=row['pk']).update(**values)
+
+            if playlist_drift or category_drift:
+                from core.page_cache import page_cache
+                page_cache.purge(
+                    'playlist-list', 'nav',
+                    *(f"playlist:{row['pk']}" for row, _ in playlist_drift),
+                    *(f"category:{row['pk']}" for row, _ in category_drift),
+                )
+
+        return playlist_drift, category_drift
+
+
+# إنشاء instance للاستخدام
+playlist_stats = PlaylistStats()
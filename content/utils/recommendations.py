@@ -0,0 +1,340 @@
+# content/utils/recommendations.py
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Min, Q
+from django.utils import timezone
+import logging
+import numpy as np
+
+try:
+    from scipy import sparse
+except ImportError:
+    # بدون SciPy تُستخدم مصفوفة NumPy كثيفة (float32) بنفس العمليات
+    sparse = None
+
+logger = logging.getLogger(__name__)
+
+
+def build_matrix(rows, cols, data, shape):
+    if sparse is not None:
+        return sparse.csr_matrix((data, (rows, cols)), shape=shape, dtype=np.float32)
+    matrix = np.zeros(shape, dtype=np.float32)
+    np.add.at(matrix, (rows, cols), data)
+    return matrix
+
+
+def dot_rows(block, matrix):
+    """تشابه جيب التمام بين صفوف block وكل صفوف matrix (الصفوف مطبعة مسبقاً)"""
+    product = block @ matrix.T
+    if sparse is not None and sparse.issparse(product):
+        product = product.toarray()
+    return np.asarray(product, dtype=np.float32)
+
+
+def normalize_rows(matrix):
+    if sparse is not None and sparse.issparse(matrix):
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+        norms[norms == 0] = 1
+        return sparse.diags(1 / norms).dot(matrix).tocsr()
+    norms = np.linalg.norm(matrix, axis=1)
+    norms[norms == 0] = 1
+    return matrix / norms[:, None]
+
+
+def popularity_scores(views):
+    """الشعبية في [0, 1] على مقياس لوغاريتمي حتى لا تطغى العناصر الأكثر مشاهدة"""
+    scores = np.log1p(np.asarray(views, dtype=np.float64))
+    top = scores.max() if len(scores) else 0
+    return (scores / top if top > 0 else scores).astype(np.float32)
+
+
+def top_k(similarity, popularity, k, weight, self_columns):
+    """(أعمدة أفضل k، درجاتها) لكل صف؛ الدرجة -inf تعني لا توصية
+
+    الدرجة = (1 - weight) * التشابه + weight * الشعبية، ولا يُقترح عنصر
+    لا يشترك في أي علامة مع المصدر.
+    """
+    scores = (1 - weight) * similarity + weight * popularity[None, :]
+    scores[similarity <= 0] = -np.inf
+    scores[np.arange(len(self_columns)), self_columns] = -np.inf
+
+    k = min(k, scores.shape[1])
+    if k <= 0:
+        empty = np.empty((len(self_columns), 0))
+        return empty.astype(np.int64), empty
+    columns = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    values = np.take_along_axis(scores, columns, axis=1)
+    order = np.argsort(-values, axis=1, kind='stable')
+    return np.take_along_axis(columns, order, axis=1), np.take_along_axis(values, order, axis=1)
+
+
+class TagMatrix:
+    """مصفوفة متفرقة العناصر × العلامات بأوزان IDF وصفوف مطبعة
+
+    العلامة النادرة المشتركة بين عنصرين أقوى دلالة على تشابههما من علامة
+    عامة موجودة على نصف المحتوى.
+    """
+
+    def __init__(self, item_ids, tag_pairs):
+        self.item_ids = np.asarray(item_ids, dtype=np.int64)
+        self.positions = {int(pk): position for position, pk in enumerate(self.item_ids)}
+
+        rows, cols = [], []
+        tag_positions = {}
+        for item_id, tag_id in tag_pairs:
+            row = self.positions.get(item_id)
+            if row is not None:
+                rows.append(row)
+                cols.append(tag_positions.setdefault(tag_id, len(tag_positions)))
+
+        rows = np.asarray(rows, dtype=np.int64)
+        cols = np.asarray(cols, dtype=np.int64)
+        shape = (len(self.item_ids), len(tag_positions))
+
+        document_frequency = np.bincount(cols, minlength=shape[1])
+        idf = np.log((1 + shape[0]) / (1 + document_frequency)) + 1
+        data = idf[cols]
+        norms = np.sqrt(np.bincount(rows, weights=data ** 2, minlength=shape[0]))
+        if len(rows):
+            data = data / norms[rows]
+
+        self.matrix = build_matrix(rows, cols, data.astype(np.float32), shape)
+
+    def __len__(self):
+        return len(self.item_ids)
+
+    def group(self, groups, group_count):
+        """مصفوفة المجموعات × العلامات (مجموع صفوف كل مجموعة) مطبعة الصفوف
+
+        الصف ذو المجموعة -1 لا يدخل أي مجموعة.
+        """
+        groups = np.asarray(groups, dtype=np.int64)
+        rows = np.flatnonzero(groups >= 0)
+        if sparse is None:
+            grouped = np.zeros((group_count, self.matrix.shape[1]), dtype=np.float32)
+            np.add.at(grouped, groups[rows], self.matrix[rows])
+            return normalize_rows(grouped)
+
+        membership = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.float32), (groups[rows], rows)),
+            shape=(group_count, len(groups))
+        )
+        return normalize_rows(membership @ self.matrix)
+
+
+class Recommender:
+    """بناء وقراءة توصيات العناصر والقوائم من تشارك العلامات
+
+    التشابه يُحسب بضرب مصفوفات على دفعات من الصفوف (بدون حلقات Python
+    على الأزواج)، وأفضل k جيران لكل مصدر تُحفظ في جدول صغير تقرؤه صفحات
+    التفاصيل باستعلام واحد على الفهرس (المصدر، الترتيب). التحديث
+    التزايدي يعيد حساب العناصر التي تغيرت منذ آخر تشغيل والعناصر التي
+    قد تدخل هذه العناصر أو تخرج من قوائم جيرانها فقط. أوزان IDF تتغير
+    قليلاً مع كل تغيير في العلامات فتبقى درجات بقية العناصر تقريبية حتى
+    البناء الكامل اليومي.
+    """
+
+    BLOCK_SIZE = 512
+    LAST_REFRESH_KEY = 'recommendations:last-refresh'
+
+    def __init__(self):
+        self.top_k = settings.RECOMMENDATIONS_TOP_K
+        self.popularity_weight = settings.RECOMMENDATIONS_POPULARITY_WEIGHT
+
+    # === التحميل ===
+
+    def load_items(self):
+        """(TagMatrix، شعبية العناصر، معرف قائمة كل عنصر) للعناصر المنشورة"""
+        from content.models import PlaylistItem, PlaylistItemTag
+
+        published = {'is_published': True, 'playlist__is_published': True}
+        items = list(
+            PlaylistItem.objects.filter(**published).order_by('pk').values_list(
+                'pk', 'playlist_id', 'views_count'
+            )
+        )
+        pairs = PlaylistItemTag.objects.filter(
+            **{f'playlist_item__{key}': value for key, value in published.items()}
+        ).values_list('playlist_item_id', 'tag_id')
+
+        matrix = TagMatrix([row[0] for row in items], pairs.iterator(chunk_size=5000))
+        popularity = popularity_scores([row[2] for row in items])
+        playlist_ids = np.asarray([row[1] for row in items], dtype=np.int64)
+        return matrix, popularity, playlist_ids
+
+    # === الحساب ===
+
+    def neighbours(self, matrix, popularity, positions):
+        """[(موضع المصدر، [(موضع الجار، الدرجة), ...]), ...] لمواضع المصادر"""
+        positions = np.asarray(sorted(positions), dtype=np.int64)
+        for start in range(0, len(positions), self.BLOCK_SIZE):
+            block = positions[start:start + self.BLOCK_SIZE]
+            similarity = dot_rows(matrix[block], matrix)
+            columns, scores = top_k(similarity, popularity, self.top_k, self.popularity_weight, block)
+            for source, row_columns, row_scores in zip(block, columns, scores):
+                kept = [
+                    (int(column), float(score))
+                    for column, score in zip(row_columns, row_scores) if score > -np.inf
+                ]
+                yield int(source), kept
+
+    def _item_rows(self, matrix, popularity, positions):
+        from content.models import ItemRecommendation
+
+        rows = []
+        for source, neighbours in self.neighbours(matrix.matrix, popularity, positions):
+            for rank, (column, score) in enumerate(neighbours):
+                rows.append(ItemRecommendation(
+                    playlist_item_id=int(matrix.item_ids[source]),
+                    recommended_id=int(matrix.item_ids[column]),
+                    rank=rank,
+                    score=score,
+                ))
+        return rows
+
+    def _store_items(self, source_ids, rows):
+        from content.models import ItemRecommendation
+
+        with transaction.atomic():
+            queryset = ItemRecommendation.objects.all()
+            if source_ids is not None:
+                queryset = queryset.filter(playlist_item_id__in=source_ids)
+            queryset.delete()
+            ItemRecommendation.objects.bulk_create(rows, batch_size=1000)
+
+    def build_playlists(self, matrix, item_playlists):
+        """إعادة حساب توصيات كل القوائم (عددها صغير مقارنة بالعناصر)"""
+        from content.models import Playlist, PlaylistRecommendation
+
+        playlists = list(
+            Playlist.objects.filter(is_published=True).order_by('pk').values_list(
+                'pk', 'views_count', 'total_item_views'
+            )
+        )
+        playlist_ids = np.asarray([row[0] for row in playlists], dtype=np.int64)
+        positions = {int(pk): position for position, pk in enumerate(playlist_ids)}
+
+        # عناصر القوائم غير المنشورة مستبعدة من المصفوفة أصلاً؛ والقائمة التي
+        # نُشرت بين الاستعلامين لا موضع لها فتُتجاوز عناصرها حتى التشغيل التالي
+        groups = [positions.get(int(pk), -1) for pk in item_playlists]
+        playlist_matrix = matrix.group(groups, len(playlists))
+        popularity = popularity_scores([row[1] + row[2] for row in playlists])
+
+        rows = []
+        for source, neighbours in self.neighbours(playlist_matrix, popularity, range(len(playlists))):
+            for rank, (column, score) in enumerate(neighbours):
+                rows.append(PlaylistRecommendation(
+                    playlist_id=int(playlist_ids[source]),
+                    recommended_id=int(playlist_ids[column]),
+                    rank=rank,
+                    score=score,
+                ))
+
+        with transaction.atomic():
+            PlaylistRecommendation.objects.all().delete()
+            PlaylistRecommendation.objects.bulk_create(rows, batch_size=1000)
+        return len(rows)
+
+    # === البناء الكامل والتزايدي ===
+
+    def rebuild(self):
+        """إعادة بناء كل التوصيات"""
+        started = timezone.now()
+        matrix, popularity, item_playlists = self.load_items()
+
+        rows = self._item_rows(matrix, popularity, range(len(matrix)))
+        self._store_items(None, rows)
+        playlist_rows = self.build_playlists(matrix, item_playlists)
+
+        cache.set(self.LAST_REFRESH_KEY, started, timeout=None)
+        return {'items': len(matrix), 'refreshed': len(matrix), 'item_rows': len(rows), 'playlist_rows': playlist_rows}
+
+    def refresh(self, since=None):
+        """تحديث توصيات العناصر المتغيرة منذ آخر تشغيل (أو منذ since)
+
+        القائمة المتغيرة (إلغاء نشر، تغيير تصنيف) تُعد كل عناصرها متغيرة،
+        لأن إلغاء نشرها يخرج عناصرها من المصفوفة ومن توصيات غيرها.
+        """
+        from content.models import ItemRecommendation, Playlist, PlaylistItem
+
+        since = since or cache.get(self.LAST_REFRESH_KEY)
+        if since is None:
+            return self.rebuild()
+
+        started = timezone.now()
+        changed_playlists = set(Playlist.objects.filter(updated_at__gte=since).values_list('pk', flat=True))
+        changed = set(
+            PlaylistItem.objects.filter(
+                Q(updated_at__gte=since) | Q(playlist_id__in=changed_playlists)
+            ).values_list('pk', flat=True)
+        )
+        if not changed and not changed_playlists:
+            cache.set(self.LAST_REFRESH_KEY, started, timeout=None)
+            return {'items': None, 'refreshed': 0, 'item_rows': 0, 'playlist_rows': 0}
+
+        matrix, popularity, item_playlists = self.load_items()
+
+        # المصادر التي تحتوي قوائمها عنصراً متغيراً (قد ينخفض أو يُلغى نشره)
+        affected = set(
+            ItemRecommendation.objects.filter(recommended_id__in=changed).values_list('playlist_item_id', flat=True)
+        )
+
+        # والمصادر التي قد يدخل عنصر متغير قائمتها: درجته أعلى من أضعف جار محفوظ
+        changed_positions = np.asarray(
+            sorted(matrix.positions[pk] for pk in changed if pk in matrix.positions), dtype=np.int64
+        )
+        if len(changed_positions):
+            threshold = np.full(len(matrix), -np.inf, dtype=np.float32)
+            lists = ItemRecommendation.objects.values('playlist_item_id').annotate(
+                low=Min('score'), size=Count('id')
+            )
+            for row in lists:
+                position = matrix.positions.get(row['playlist_item_id'])
+                if position is not None and row['size'] >= self.top_k:
+                    threshold[position] = row['low']
+
+            w = self.popularity_weight
+            for start in range(0, len(changed_positions), self.BLOCK_SIZE):
+                block = changed_positions[start:start + self.BLOCK_SIZE]
+                similarity = dot_rows(matrix.matrix[block], matrix.matrix)
+                scores = (1 - w) * similarity + w * popularity[block][:, None]
+                beats = ((similarity > 0) & (scores > threshold[None, :])).any(axis=0)
+                affected.update(int(pk) for pk in matrix.item_ids[beats])
+
+        sources = changed | affected
+        positions = [matrix.positions[pk] for pk in sources if pk in matrix.positions]
+        rows = self._item_rows(matrix, popularity, positions)
+        self._store_items(sources, rows)
+        playlist_rows = self.build_playlists(matrix, item_playlists)
+
+        cache.set(self.LAST_REFRESH_KEY, started, timeout=None)
+        return {'items': len(matrix), 'refreshed': len(positions), 'item_rows': len(rows), 'playlist_rows': playlist_rows}
+
+    # === القراءة ===
+
+    def similar_items(self, item, k=4):
+        """العناصر المقترحة لعنصر (استعلام واحد)"""
+        from content.models import ItemRecommendation
+
+        recommendations = ItemRecommendation.objects.filter(
+            playlist_item=item,
+            recommended__is_published=True,
+            recommended__playlist__is_published=True,
+        ).select_related('recommended__playlist')[:k]
+        return [recommendation.recommended for recommendation in recommendations]
+
+    def similar_playlists(self, playlist, k=4):
+        """القوائم المقترحة لقائمة (استعلام واحد)"""
+        from content.models import PlaylistRecommendation
+
+        recommendations = PlaylistRecommendation.objects.filter(
+            playlist=playlist,
+            recommended__is_published=True,
+        ).select_related('recommended__category')[:k]
+        return [recommendation.recommended for recommendation in recommendations]
+
+
+# إنشاء instance للاستخدام
+recommender = Recommender()
@@ -0,0 +1,106 @@
+# content/utils/sampling.py
+
+from django.core.cache import cache
+from django.db.models import Count, Max, Min
+import random
+
+from .playlist_index import playlist_index
+
+
+class RandomSampler:
+    """اختيار عناصر عشوائية دون ORDER BY RANDOM()
+
+    الترتيب العشوائي في قاعدة البيانات يفرز المجموعة كاملة في كل طلب.
+    هنا تُختار k مواضع عشوائية من قائمة معرفات مخزنة (فهرس القائمة
+    المرتب، أو معرفات المجموعة إذا كانت صغيرة)، أو معرفات عشوائية من
+    مدى المعرفات المحسوب مسبقاً للمجموعات الكبيرة، ثم تُجلب الصفوف
+    المختارة فقط. زمن الاختيار لا يتغير بحجم المجموعة.
+    """
+
+    KEY_PREFIX = 'sample'
+    TIMEOUT = 10 * 60
+    MAX_CACHED_IDS = 2000  # أكبر مجموعة تُخزن معرفاتها كاملة
+    MAX_PROBES = 500  # أقصى عدد معرفات عشوائية تُجرب في الاستعلام الواحد
+    ATTEMPTS = 3
+
+    def pick(self, ids, k, exclude=()):
+        """k معرفات عشوائية مختلفة من تسلسل معرفات (باستثناء exclude)"""
+        exclude = set(exclude)
+        wanted = min(len(ids), k + len(exclude))
+        picked = [ids[position] for position in random.sample(range(len(ids)), wanted)]
+        return [pk for pk in picked if pk not in exclude][:k]
+
+    def fetch(self, queryset, ids):
+        """الصفوف بترتيب المعرفات المختارة (المحذوف أو غير المطابق يُتجاهل)"""
+        objects = queryset.in_bulk(ids)
+        return [objects[pk] for pk in ids if pk in objects]
+
+    # === عناصر القائمة ===
+
+    def playlist_items(self, playlist_id, k, exclude=(), queryset=None):
+        """عناصر منشورة عشوائية من قائمة عبر فهرسها المرتب"""
+        from content.models import PlaylistItem
+
+        ids = self.pick(playlist_index.get(playlist_id).ids, k, exclude)
+        if queryset is None:
+            queryset = PlaylistItem.objects.select_related('playlist')
+        return self.fetch(queryset, ids)
+
+    # === مجموعات عامة ===
+
+    def _stats(self, queryset, key):
+        """(المعرفات إذا كانت المجموعة صغيرة، أصغر معرف، أكبر معرف، العدد)"""
+        cache_key = f'{self.KEY_PREFIX}:{key}'
+        stats = cache.get(cache_key)
+        if stats is None:
+            queryset = queryset.order_by()
+            aggregate = queryset.aggregate(low=Min('pk'), high=Max('pk'), count=Count('pk'))
+            ids = None
+            if aggregate['count'] <= self.MAX_CACHED_IDS:
+                ids = list(queryset.values_list('pk', flat=True))
+            stats = (ids, aggregate['low'], aggregate['high'], aggregate['count'])
+            cache.set(cache_key, stats, self.TIMEOUT)
+        return stats
+
+    def sample(self, queryset, k, key, exclude=()):
+        """k صفوف عشوائية من queryset
+
+        key يميز المجموعة في الذاكرة المؤقتة (مثل 'category:3') ويجب أن
+        يتغير بتغير شروط الفلترة.
+        """
+        ids, low, high, count = self._stats(queryset, key)
+        if not count:
+            return []
+
+        if ids is not None:
+            return self.fetch(queryset, self.pick(ids, k, exclude))
+
+        # مجموعة كبيرة: معرفات عشوائية من المدى مع تعويض الفجوات
+        exclude = set(exclude)
+        density = count / (high - low + 1)
+        results = {}
+        for _ in range(self.ATTEMPTS):
+            missing = k - len(results)
+            probes = min(self.MAX_PROBES, int(missing / density * 1.5) + 1)
+            candidates = {random.randint(low, high) for _ in range(probes)}
+            candidates -= exclude
+            candidates -= results.keys()
+            for obj in queryset.filter(pk__in=candidates):
+                if len(results) < k:
+                    results[obj.pk] = obj
+            if len(results) >= k:
+                break
+
+        if len(results) < k:
+            # مدى متفرق جداً: إكمال العدد بأي صفوف متبقية
+            remaining = queryset.exclude(pk__in=exclude | results.keys())[:k - len(results)]
+            for obj in remaining:
+                results[obj.pk] = obj
+
+        objects = list(results.values())
+        random.shuffle(objects)
+        return objects
+
+
+# إنشاء instance للاستخدام
+random_sampler = RandomSampler()
@@ -0,0 +1,155 @@
+# content/utils/sync_scheduler.py
+
+from datetime import timedelta
+from django.conf import settings
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+import hashlib
+import json
+import random
+
+# الحقول التي تُبنى منها بصمة المحتوى لكل مزود (الإحصائيات تتغير دائماً فلا تدخل)
+HASH_FIELDS = {
+    'youtube': ('title', 'description', 'duration', 'thumbnail_url'),
+    'soundcloud': ('title', 'description', 'duration', 'artwork_url'),
+}
+
+# حقل رابط العنصر لكل مزود
+URL_FIELDS = {
+    'youtube': 'youtube_url',
+    'soundcloud': 'soundcloud_url',
+}
+
+# عدد العناصر التي تغطيها وحدة واحدة من الميزانية
+ITEMS_PER_UNIT = {
+    'youtube': 50,
+    'soundcloud': 1,
+}
+
+
+class SyncScheduler:
+    """جدولة مزامنة معلومات الوسائط حسب حالة كل عنصر
+
+    العنصر مستحق إذا لم يُزامن من قبل، أو حان next_sync_at، أو تغير رابطه
+    منذ آخر مزامنة. المستحقون يُرتبون: من لم يُزامن أولاً، ثم الأكثر
+    مشاهدة، ثم الأحدث، ويُؤخذ منهم ما تسمح به ميزانية التشغيل.
+
+    الفترة حتى المزامنة التالية تتبع النتيجة:
+    - محتوى لم تتغير بصمته: تتضاعف الفترة حتى MEDIA_SYNC_MAX_INTERVAL.
+    - محتوى تغير: تعود الفترة إلى MEDIA_SYNC_INTERVAL.
+    - عنصر حديث: لا تزيد الفترة عن MEDIA_SYNC_RECENT_INTERVAL.
+    - فشل: إعادة محاولة بعد MEDIA_SYNC_RETRY تتضاعف مع تكرار الفشل.
+    - وسائط غير موجودة: أقصى فترة.
+    فتتناسب كلفة المزامنة مع ما يتغير لا مع حجم المحتوى.
+    """
+
+    JITTER = 0.1  # توزيع عشوائي للفترات حتى لا تستحق العناصر معاً
+
+    def __init__(self):
+        self.interval = timedelta(seconds=settings.MEDIA_SYNC_INTERVAL)
+        self.max_interval = timedelta(seconds=settings.MEDIA_SYNC_MAX_INTERVAL)
+        self.recent_interval = timedelta(seconds=settings.MEDIA_SYNC_RECENT_INTERVAL)
+        self.recent_age = timedelta(days=settings.MEDIA_SYNC_RECENT_DAYS)
+        self.retry = timedelta(seconds=settings.MEDIA_SYNC_RETRY)
+        self.budgets = settings.MEDIA_SYNC_BUDGET
+
+    def content_hash(self, provider, info):
+        """بصمة الحقول المستخدمة من معلومات المزود"""
+        if not info:
+            return ''
+        values = [info.get(field) for field in HASH_FIELDS[provider]]
+        return hashlib.sha1(json.dumps(values, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+    # === الاختيار ===
+
+    def due(self, queryset, provider, now=None):
+        """عناصر queryset المستحقة للمزامنة مع المزود مرتبة حسب الأولوية"""
+        from content.models import MediaSyncState
+
+        now = now or timezone.now()
+        states = MediaSyncState.objects.filter(playlist_item=OuterRef('pk'), provider=provider)
+        return queryset.exclude(**{URL_FIELDS[provider]: ''}).annotate(
+            never_synced=~Exists(states),
+        ).exclude(
+            Exists(states.filter(next_sync_at__gt=now, source_url=OuterRef(URL_FIELDS[provider])))
+        ).order_by('-never_synced', '-views_count', '-created_at', 'pk')
+
+    def batches(self, queryset, provider, batch_size, budget=None):
+        """دفعات من المستحقين حتى نفاد الميزانية (بوحدات طلبات المزود)
+
+        كل دفعة تُسجل حالتها قبل طلب التالية فتخرج من المستحقين، لذلك
+        تُؤخذ الدفعة التالية دائماً من رأس الترتيب.
+        """
+        if budget is None:
+            budget = self.budgets.get(provider, 0)
+        remaining = budget * ITEMS_PER_UNIT[provider]
+        while remaining > 0:
+            batch = list(self.due(queryset, provider)[:min(batch_size, remaining)])
+            if not batch:
+                return
+            yield batch
+            remaining -= len(batch)
+
+    # === التسجيل ===
+
+    def record(self, provider, outcomes, now=None):
+        """حفظ نتائج المزامنة [(العنصر، الحالة، البصمة)] وتحديد المزامنة التالية"""
+        from content.models import MediaSyncState
+
+        if not outcomes:
+            return
+        now = now or timezone.now()
+        url_field = URL_FIELDS[provider]
+        existing = {
+            state.playlist_item_id: state for state in
+            MediaSyncState.objects.filter(
+                provider=provider, playlist_item_id__in=[item.pk for item, _, _ in outcomes]
+            )
+        }
+
+        to_create, to_update = {}, {}
+        for item, status, content_hash in outcomes:
+            state = existing.get(item.pk)
+            if state is None:
+                state = MediaSyncState(playlist_item=item, provider=provider)
+            previous = (state.last_status, state.content_hash, state.last_synced_at, state.next_sync_at)
+
+            state.source_url = getattr(item, url_field)
+            state.last_status = status
+            state.last_synced_at = now
+            if status == 'failed':
+                state.failure_count = min(state.failure_count + 1, 16)
+            else:
+                state.failure_count = 0
+                state.content_hash = content_hash
+            state.next_sync_at = now + self._next_interval(item, state, previous, now)
+            (to_update if state.pk else to_create)[item.pk] = state
+
+        MediaSyncState.objects.bulk_create(list(to_create.values()), batch_size=500)
+        MediaSyncState.objects.bulk_update(
+            list(to_update.values()),
+            ['source_url', 'last_status', 'last_synced_at', 'failure_count', 'content_hash', 'next_sync_at'],
+            batch_size=500
+        )
+
+    def _next_interval(self, item, state, previous, now):
+        last_status, last_hash, last_synced_at, last_next_sync_at = previous
+
+        if state.last_status == 'failed':
+            interval = min(self.interval, self.retry * 2 ** (state.failure_count - 1))
+            return interval * random.uniform(1 - self.JITTER, 1 + self.JITTER)
+
+        if state.last_status == 'missing':
+            interval = self.max_interval
+        elif last_status == 'success' and last_hash == state.content_hash and last_synced_at:
+            interval = min(self.max_interval, max(self.interval, (last_next_sync_at - last_synced_at) * 2))
+        else:
+            interval = self.interval
+
+        if item.created_at and now - item.created_at < self.recent_age:
+            interval = min(interval, self.recent_interval)
+        return interval * random.uniform(1 - self.JITTER, 1 + self.JITTER)
+
+
+# إنشاء instance للاستخدام
+sync_scheduler = SyncScheduler()
@@ -0,0 +1,149 @@
+# content/utils/youtube_stub.py
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import hashlib
+import json
+import threading
+import time
+
+
+class YouTubeStubServer:
+    """خادم محلي يحاكي videos.list من YouTube Data API لقياس المزامنة
+
+    يعيد عنصراً لكل معرف مطلوب بعد تأخير ثابت يحاكي زمن الشبكة، ويُسقط
+    نسبة ثابتة من المعرفات (حسب بصمتها) لمحاكاة الفيديوهات المحذوفة.
+    max_rate (طلب/ثانية) يحاكي حد المعدل: الطلبات الزائدة في الثانية نفسها
+    تُرفض بـ 429 مع Retry-After. الرد يحمل ETag لمحتواه، وIf-None-Match
+    المطابق يُجاب بـ 304 دون محتوى كما يفعل YouTube. الطلب الذي يضم معرفاً
+    من fail_ids يُرفض بـ 403 لمحاكاة فشل دفعة كاملة.
+    يُستخدم كسياق: with YouTubeStubServer() as stub: ... stub.base_url
+    """
+
+    def __init__(self, latency=0.05, missing_ratio=0.0, max_rate=0, fail_ids=()):
+        self.latency = latency
+        self.missing_ratio = missing_ratio
+        self.max_rate = max_rate
+        self.fail_ids = set(fail_ids)
+        self.requests = 0
+        self.quota_units = 0
+        self.throttled = 0
+        self.not_modified = 0
+        self._second = None
+        self._second_requests = 0
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def is_missing(self, video_id):
+        digest = hashlib.md5(video_id.encode('utf-8')).digest()
+        return digest[0] / 256 < self.missing_ratio
+
+    def video(self, video_id):
+        number = int(hashlib.md5(video_id.encode('utf-8')).hexdigest()[:6], 16)
+        return {
+            'kind': 'youtube#video',
+            'id': video_id,
+            'snippet': {
+                'title': f'Video {video_id}',
+                'description': f'Description of {video_id}',
+                'channelTitle': 'Stub channel',
+                'publishedAt': '2024-01-01T00:00:00Z',
+                'thumbnails': {'high': {'url': f'https://img.youtube.com/vi/{video_id}/hqdefault.jpg'}},
+            },
+            'statistics': {'viewCount': str(number), 'likeCount': str(number // 10)},
+            'contentDetails': {'duration': f'PT{number % 60}M{number % 59 + 1}S'},
+        }
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # اتصالات دائمة ليظهر أثر مجمع الاتصالات في القياس، ودون تأخير
+            # Nagle بين إرسال الرؤوس والمحتوى على الاتصال نفسه
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                if url.path.rstrip('/').split('/')[-1] != 'videos':
+                    self.send_error(404)
+                    return
+
+                ids = [video_id for video_id in parse_qs(url.query).get('id', [''])[0].split(',') if video_id]
+                if len(ids) > 50:
+                    self.send_error(400, 'Too many ids')
+                    return
+
+                with stub._lock:
+                    stub.requests += 1
+                    second = int(time.time())
+                    if second != stub._second:
+                        stub._second, stub._second_requests = second, 0
+                    stub._second_requests += 1
+                    throttled = stub.max_rate and stub._second_requests > stub.max_rate
+                    if throttled:
+                        stub.throttled += 1
+                    else:
+                        stub.quota_units += 1
+                if not throttled and stub.fail_ids.intersection(ids):
+                    self.send_response(403)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                if throttled:
+                    self.send_response(429)
+                    self.send_header('Retry-After', '1')
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                if stub.latency:
+                    time.sleep(stub.latency)
+
+                body = json.dumps({
+                    'kind': 'youtube#videoListResponse',
+                    'items': [stub.video(video_id) for video_id in ids if not stub.is_missing(video_id)],
+                    'pageInfo': {'totalResults': len(ids), 'resultsPerPage': len(ids)},
+                }).encode('utf-8')
+                etag = f'"{hashlib.md5(body).hexdigest()}"'
+                if self.headers.get('If-None-Match') == etag:
+                    with stub._lock:
+                        stub.not_modified += 1
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header('ETag', etag)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
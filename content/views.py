@@ -8,8 +8,9 @@ from django.contrib import messages
 from django.utils.translation import gettext_lazy as _
 from django.http import JsonResponse, Http404, HttpResponse
 from django.core.paginator import Paginator
-from django.db.models import Q, F
+from django.db.models import Q
 from django.utils import timezone
+from django.utils.cache import get_conditional_response
 from django.views.decorators.http import require_POST
 from django.contrib.auth.decorators import login_required
 from django.utils.decorators import method_decorator
@@ -20,9 +21,22 @@ from .models import (
     Playlist, PlaylistItem, Tag, Comment,
     PlaylistItemTag
 )
+from .utils.counters import engagement_counter
 from core.models import Category
+from core.conditional import conditional_page
+from core.page_cache import cache_anonymous_page, page_cache
+from .utils.freshness import (
+    category_freshness, item_freshness, playlist_freshness, playlist_list_freshness
+)
+from .utils.playlist_index import playlist_index
+from .utils.playlist_manifest import playlist_manifest
+from .utils.playlist_shuffle import shuffle_sessions
+from .utils.recommendations import recommender
+from .utils.sampling import random_sampler
 
 
+@method_decorator(conditional_page(playlist_list_freshness), name='dispatch')
+@method_decorator(cache_anonymous_page, name='dispatch')
 class PlaylistListView(ListView):
     """عرض قوائم التشغيل"""
     model = Playlist
@@ -33,9 +47,7 @@ class PlaylistListView(ListView):
     def get_queryset(self):
         queryset = Playlist.objects.filter(
             is_published=True
-        ).select_related('category', 'created_by').prefetch_related(
-            'playlistitem_set'
-        ).order_by('-is_featured', '-created_at')
+        ).select_related('category', 'created_by').order_by('-is_featured', '-created_at')
         
         # فلترة بالتصنيف
         category_slug = self.request.GET.get('category')
@@ -74,9 +86,16 @@ class PlaylistListView(ListView):
             {'title': _('قوائم التشغيل'), 'url': None}
         ]
         
+        page_cache.add_keys(
+            self.request, 'playlist-list',
+            *(f'playlist:{playlist.pk}' for playlist in context['playlists'])
+        )
+        
         return context
 
 
+@method_decorator(conditional_page(category_freshness), name='dispatch')
+@method_decorator(cache_anonymous_page, name='dispatch')
 class CategoryPlaylistsView(ListView):
     """عرض قوائم التشغيل حسب التصنيف"""
     model = Playlist
@@ -94,9 +113,7 @@ class CategoryPlaylistsView(ListView):
         return Playlist.objects.filter(
             category=self.category,
             is_published=True
-        ).select_related('created_by').prefetch_related(
-            'playlistitem_set'
-        ).order_by('-is_featured', '-created_at')
+        ).select_related('created_by').order_by('-is_featured', '-created_at')
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -110,9 +127,16 @@ class CategoryPlaylistsView(ListView):
             {'title': self.category.name, 'url': None}
         ]
         
+        page_cache.add_keys(
+            self.request, f'category:{self.category.pk}',
+            *(f'playlist:{playlist.pk}' for playlist in context['playlists'])
+        )
+        
         return context
 
 
+@method_decorator(conditional_page(playlist_freshness), name='dispatch')
+@method_decorator(cache_anonymous_page, name='dispatch')
 class PlaylistDetailView(DetailView):
     """عرض تفاصيل قائمة التشغيل"""
     model = Playlist
@@ -128,10 +152,8 @@ class PlaylistDetailView(DetailView):
             is_published=True
         )
         
-        # زيادة عدد المشاهدات
-        Playlist.objects.filter(pk=obj.pk).update(
-            views_count=F('views_count') + 1
-        )
+        # المشاهدات تُسجل من المتصفح عبر ajax/hit/ لتعمل مع الصفحات المخزنة
+        engagement_counter.apply_pending(obj)
         
         return obj
     
@@ -147,18 +169,24 @@ class PlaylistDetailView(DetailView):
         # الصفحات
         paginator = Paginator(playlist_items, 10)
         page_number = self.request.GET.get('page', 1)
-        context['playlist_items'] = paginator.get_page(page_number)
+        page = paginator.get_page(page_number)
+        page.object_list = engagement_counter.apply_pending_many(page.object_list)
+        context['playlist_items'] = page
         
         # التصنيفات والعلامات
         context['tags'] = Tag.objects.filter(
             playlistitemtag__playlist_item__playlist=self.object
         ).distinct()
         
-        # قوائم تشغيل مقترحة
-        context['related_playlists'] = Playlist.objects.filter(
-            category=self.object.category,
-            is_published=True
-        ).exclude(pk=self.object.pk)[:4]
+        # قوائم تشغيل مقترحة: التوصيات المحسوبة ثم قوائم عشوائية من نفس التصنيف
+        related_playlists = recommender.similar_playlists(self.object, 4)
+        if len(related_playlists) < 4:
+            related_playlists += random_sampler.sample(
+                Playlist.objects.filter(category_id=self.object.category_id, is_published=True),
+                4 - len(related_playlists), f'published-playlists:category:{self.object.category_id}',
+                exclude=[self.object.pk, *(playlist.pk for playlist in related_playlists)]
+            )
+        context['related_playlists'] = related_playlists
         
         # البيانات الوصفية
         context['page_title'] = self.object.title
@@ -172,9 +200,17 @@ class PlaylistDetailView(DetailView):
             {'title': self.object.title, 'url': None}
         ]
         
+        context['page_hit'] = {'type': 'playlist', 'id': self.object.pk}
+        page_cache.add_keys(
+            self.request, f'playlist:{self.object.pk}', f'category:{self.object.category_id}',
+            *(f'playlist:{playlist.pk}' for playlist in context['related_playlists'])
+        )
+        
         return context
 
 
+@method_decorator(conditional_page(item_freshness), name='dispatch')
+@method_decorator(cache_anonymous_page, name='dispatch')
 class PlaylistItemDetailView(DetailView):
     """عرض تفاصيل عنصر قائمة التشغيل"""
     model = PlaylistItem
@@ -195,26 +231,16 @@ class PlaylistItemDetailView(DetailView):
             is_published=True
         )
         
-        # زيادة عدد المشاهدات
-        PlaylistItem.objects.filter(pk=obj.pk).update(
-            views_count=F('views_count') + 1
-        )
+        # المشاهدات تُسجل من المتصفح عبر ajax/hit/ لتعمل مع الصفحات المخزنة
+        engagement_counter.apply_pending(obj)
         
         return obj
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         
-        # العناصر السابقة واللاحقة
-        playlist_items = PlaylistItem.objects.filter(
-            playlist=self.object.playlist,
-            is_published=True
-        ).order_by('order', 'created_at')
-        
-        current_index = list(playlist_items).index(self.object)
-        
-        context['previous_item'] = playlist_items[current_index - 1] if current_index > 0 else None
-        context['next_item'] = playlist_items[current_index + 1] if current_index < len(playlist_items) - 1 else None
+        # العناصر السابقة واللاحقة من فهرس القائمة المرتب
+        context['previous_item'], context['next_item'] = playlist_index.neighbours(self.object)
         
         # التعليقات
         if self.object.allow_comments:
@@ -232,11 +258,14 @@ class PlaylistItemDetailView(DetailView):
             playlistitemtag__playlist_item=self.object
         )
         
-        # عناصر مقترحة من نفس القائمة
-        context['related_items'] = PlaylistItem.objects.filter(
-            playlist=self.object.playlist,
-            is_published=True
-        ).exclude(pk=self.object.pk).order_by('?')[:4]
+        # عناصر مقترحة: التوصيات المحسوبة ثم عناصر عشوائية من نفس القائمة
+        related_items = recommender.similar_items(self.object, 4)
+        if len(related_items) < 4:
+            related_items += random_sampler.playlist_items(
+                self.object.playlist_id, 4 - len(related_items),
+                exclude=[self.object.pk, *(item.pk for item in related_items)]
+            )
+        context['related_items'] = related_items
         
         # البيانات الوصفية
         context['page_title'] = f"{self.object.title} - {self.object.playlist.title}"
@@ -250,9 +279,20 @@ class PlaylistItemDetailView(DetailView):
             {'title': self.object.title, 'url': None}
         ]
         
+        # العناصر المجاورة والمقترحة من نفس القائمة: أي تغيير فيها يُبطل الصفحة
+        context['page_hit'] = {'type': 'playlist_item', 'id': self.object.pk}
+        page_cache.add_keys(
+            self.request, f'item:{self.object.pk}', f'playlist:{self.object.playlist_id}',
+            f'category:{self.object.playlist.category_id}',
+            *(f'tag:{tag.pk}' for tag in context['tags']),
+            # التوصيات قد تكون من قوائم أخرى
+            *(f'item:{item.pk}' for item in related_items)
+        )
+        
         return context
 
 
+@method_decorator(cache_anonymous_page, name='dispatch')
 class TagView(ListView):
     """عرض العناصر حسب العلامة"""
     model = PlaylistItem
@@ -280,9 +320,15 @@ class TagView(ListView):
             {'title': self.tag.name, 'url': None}
         ]
         
+        page_cache.add_keys(
+            self.request, f'tag:{self.tag.pk}',
+            *(f'item:{item.pk}' for item in context['items'])
+        )
+        
         return context
 
 
+@method_decorator(cache_anonymous_page, name='dispatch')
 class TagListView(ListView):
     """عرض جميع العلامات"""
     model = Tag
@@ -304,6 +350,8 @@ class TagListView(ListView):
             {'title': _('العلامات'), 'url': None}
         ]
         
+        page_cache.add_keys(self.request, 'tags')
+        
         return context
 
 
@@ -314,13 +362,12 @@ class IncrementViewAjax(TemplateView):
     def post(self, request, item_id):
         try:
             item = get_object_or_404(PlaylistItem, pk=item_id)
-            PlaylistItem.objects.filter(pk=item_id).update(
-                views_count=F('views_count') + 1
-            )
+            engagement_counter.increment(item, 'views_count')
+            engagement_counter.apply_pending(item, ['views_count'])
             
             return JsonResponse({
                 'success': True,
-                'views_count': item.views_count + 1
+                'views_count': item.views_count
             })
         except Exception as e:
             return JsonResponse({
@@ -329,6 +376,82 @@ class IncrementViewAjax(TemplateView):
             }, status=400)
 
 
+class PlaylistShuffleAjax(TemplateView):
+    """التنقل في جلسة تشغيل عشوائي عبر AJAX
+
+    العميل يحفظ الرمز والدورة والموضع ويرسلها مع كل خطوة؛ الرمز الغائب
+    أو التابع لقائمة أخرى يبدأ جلسة جديدة.
+    """
+    
+    def get(self, request, playlist_id):
+        playlist = get_object_or_404(Playlist, pk=playlist_id, is_published=True)
+        
+        token = request.GET.get('token')
+        parsed = shuffle_sessions.parse_token(token)
+        if parsed is None or parsed[0] != playlist.pk:
+            token = shuffle_sessions.create_token(playlist.pk)
+        
+        def int_param(name):
+            try:
+                return int(request.GET[name])
+            except (KeyError, ValueError):
+                return None
+        
+        direction = 'previous' if request.GET.get('direction') == 'previous' else 'next'
+        step = shuffle_sessions.step(
+            token,
+            item_id=int_param('item'),
+            position=int_param('position'),
+            cycle=int_param('cycle') or 0,
+            direction=direction
+        )
+        
+        item = None
+        if step:
+            item = PlaylistItem.objects.select_related('playlist').filter(
+                pk=step['item_id'], is_published=True
+            ).first()
+        
+        if item is None:
+            return JsonResponse({
+                'success': False,
+                'token': token,
+                'is_start': direction == 'previous'
+            })
+        
+        return JsonResponse({
+            'success': True,
+            'token': token,
+            'cycle': step['cycle'],
+            'position': step['position'],
+            'item': {
+                'id': item.id,
+                'title': item.title,
+                'url': item.get_absolute_url(),
+                'youtube_video_id': item.youtube_video_id,
+                'soundcloud_url': item.soundcloud_url,
+                'thumbnail': item.thumbnail.url if item.thumbnail else None
+            }
+        })
+
+
+class PlaylistManifestView(TemplateView):
+    """بيان عناصر القائمة للتشغيل من المتصفح (JSON بأعمدة مع ETag)"""
+    
+    def get(self, request, playlist_id):
+        # التحقق من النشر أولاً، ثم يُجاب الطلب الشرطي من إصدار البيان دون بنائه
+        playlist = get_object_or_404(Playlist, pk=playlist_id, is_published=True)
+        etag = playlist_manifest.etag(playlist.pk)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            content, etag = playlist_manifest.get(playlist)
+            response = HttpResponse(content, content_type='application/json; charset=utf-8')
+        
+        response['ETag'] = etag
+        response['Cache-Control'] = 'public, max-age=60'
+        return response
+
+
 class YoutubeDownloadView(TemplateView):
     """تسجيل تحميل من يوتيوب"""
     
@@ -343,9 +466,7 @@ class YoutubeDownloadView(TemplateView):
                 }, status=400)
             
             # تسجيل التحميل
-            PlaylistItem.objects.filter(pk=item_id).update(
-                youtube_downloads=F('youtube_downloads') + 1
-            )
+            engagement_counter.increment(item, 'youtube_downloads')
             
             # إنشاء رابط التحميل (يمكن تطويره لاحقاً باستخدام مكتبة youtube-dl)
             download_url = f"https://youtube.com/watch?v={item.youtube_video_id}"
@@ -377,9 +498,7 @@ class SoundcloudDownloadView(TemplateView):
                 }, status=400)
             
             # تسجيل التحميل
-            PlaylistItem.objects.filter(pk=item_id).update(
-                soundcloud_downloads=F('soundcloud_downloads') + 1
-            )
+            engagement_counter.increment(item, 'soundcloud_downloads')
             
             return JsonResponse({
                 'success': True,
@@ -408,9 +527,7 @@ class CopyTextView(TemplateView):
                 }, status=400)
             
             # تسجيل النسخ
-            PlaylistItem.objects.filter(pk=item_id).update(
-                text_copies=F('text_copies') + 1
-            )
+            engagement_counter.increment(item, 'text_copies')
             
             return JsonResponse({
                 'success': True,
@@ -433,9 +550,7 @@ class ShareView(TemplateView):
             item = get_object_or_404(PlaylistItem, pk=item_id)
             
             # تسجيل المشاركة
-            PlaylistItem.objects.filter(pk=item_id).update(
-                shares_count=F('shares_count') + 1
-            )
+            engagement_counter.increment(item, 'shares_count')
             
             share_data = {
                 'title': item.title,
@@ -8,17 +8,20 @@ from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_exempt
 from django.conf import settings
 from django.core.files.storage import default_storage
-from django.db.models import F
 import json
 import logging
 import os
 import mimetypes
 
+from core.conditional import conditional_page
+from core.http_client import http_client
 from ..models import PlaylistItem, Playlist
 from ..utils.media_utils import (
     youtube_handler, soundcloud_handler, media_downloader,
     media_processor, playlist_manager
 )
+from ..utils.counters import engagement_counter
+from ..utils.freshness import playlist_freshness
 
 logger = logging.getLogger(__name__)
 
@@ -107,9 +110,7 @@ class MediaDownloadView(LoginRequiredMixin, View):
                 
                 if result['success']:
                     # تحديث إحصائيات التحميل
-                    PlaylistItem.objects.filter(pk=item_id).update(
-                        youtube_downloads=F('youtube_downloads') + 1
-                    )
+                    engagement_counter.increment(item, 'youtube_downloads')
                     
                     return JsonResponse({
                         'success': True,
@@ -130,9 +131,7 @@ class MediaDownloadView(LoginRequiredMixin, View):
                 result = media_downloader.download_soundcloud_track(item.soundcloud_url)
                 
                 if result['success']:
-                    PlaylistItem.objects.filter(pk=item_id).update(
-                        soundcloud_downloads=F('soundcloud_downloads') + 1
-                    )
+                    engagement_counter.increment(item, 'soundcloud_downloads')
                     
                     return JsonResponse({
                         'success': True,
@@ -166,17 +165,39 @@ class MediaDownloadView(LoginRequiredMixin, View):
 class PlaylistNavigationView(View):
     """التنقل في قائمة التشغيل"""
     
+    @staticmethod
+    def int_param(request, name):
+        try:
+            return int(request.GET[name])
+        except (KeyError, ValueError):
+            return None
+    
     def get(self, request, item_id, direction):
         try:
             current_item = get_object_or_404(PlaylistItem, pk=item_id)
             
             if direction == 'next':
                 shuffle = request.GET.get('shuffle', 'false').lower() == 'true'
-                next_item = playlist_manager.get_next_item(current_item, shuffle)
+                step = None
+                if shuffle:
+                    # العميل يعيد الرمز والدورة والموضع من الاستجابة السابقة
+                    step, next_item = playlist_manager.get_shuffle_step(
+                        current_item,
+                        request.GET.get('shuffle_token'),
+                        cycle=self.int_param(request, 'cycle') or 0,
+                        position=self.int_param(request, 'position')
+                    )
+                else:
+                    next_item = playlist_manager.get_next_item(current_item)
                 
                 if next_item:
                     return JsonResponse({
                         'success': True,
+                        **({
+                            'shuffle_token': step['token'],
+                            'cycle': step['cycle'],
+                            'position': step['position'],
+                        } if step else {}),
                         'item': {
                             'id': next_item.id,
                             'title': next_item.title,
@@ -233,8 +254,13 @@ class PlaylistNavigationView(View):
             }, status=500)
 
 
+@method_decorator(conditional_page(playlist_freshness, global_keys=()), name='dispatch')
 class PlaylistExportView(View):
-    """تصدير قائمة التشغيل بصيغ مختلفة"""
+    """تصدير قائمة التشغيل بصيغ مختلفة
+
+    قارئات الخلاصات تعيد الطلب دورياً بـ If-None-Match
+    فتحصل على 304 دون بناء الملف ما دامت القائمة وعناصرها لم تتغير.
+    """
     
     def get(self, request, playlist_slug, format_type):
         try:
@@ -302,12 +328,15 @@ class PlaylistExportView(View):
     
     def _generate_rss_feed(self, playlist, items, request):
         """إنشاء RSS feed للقائمة"""
-        from django.utils import timezone
         from django.urls import reverse
         
         base_url = request.build_absolute_uri('/').rstrip('/')
         playlist_url = base_url + playlist.get_absolute_url()
         
+        # تاريخ البناء هو آخر تعديل (لا وقت الطلب) ليبقى الملف ثابتاً بين الطلبات
+        items = list(items)
+        last_build = max([playlist.updated_at, *(item.updated_at for item in items)])
+        
         rss_content = f"""<?xml version="1.0" encoding="UTF-8"?>
 <rss version="2.0" xmlns:itunes="http://www.itunes.com/dtds/podcast-1.0.dtd">
 <channel>
@@ -315,7 +344,7 @@ class PlaylistExportView(View):
     <description><![CDATA[{playlist.description or 'قائمة تشغيل من منصة المحتوى'}]]></description>
     <link>{playlist_url}</link>
     <language>ar</language>
-    <lastBuildDate>{timezone.now().strftime('%a, %d %b %Y %H:%M:%S +0000')}</lastBuildDate>
+    <lastBuildDate>{last_build.strftime('%a, %d %b %Y %H:%M:%S +0000')}</lastBuildDate>
     <generator>منصة المحتوى المتعدد الوسائط</generator>
     <itunes:author>د. علي بشير أحمد</itunes:author>
     <itunes:category text="Education" />
@@ -366,8 +395,7 @@ class MediaProxyView(View):
                 if item.youtube_video_id:
                     thumbnail_url = f"https://img.youtube.com/vi/{item.youtube_video_id}/maxresdefault.jpg"
                     try:
-                        import requests
-                        response = requests.get(thumbnail_url, timeout=5)
+                        response = http_client.get(thumbnail_url, timeout=5)
                         if response.status_code == 200:
                             http_response = HttpResponse(response.content, content_type='image/jpeg')
                             http_response['Cache-Control'] = 'max-age=3600'
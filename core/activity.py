@@ -0,0 +1,297 @@
+# core/activity.py
+
+from django.conf import settings
+from django.core.cache import cache
+import hashlib
+import logging
+import math
+import os
+import socket
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class HyperLogLog:
+    """عداد تقريبي للقيم المميزة (HyperLogLog) بذاكرة ثابتة
+
+    بدقة p=10 يستخدم 1024 بايت ويعطي خطأً معيارياً قرابة 3%،
+    ويمكن دمج عدادين بأخذ القيمة العظمى لكل خانة.
+    """
+
+    def __init__(self, precision=10, registers=None):
+        self.p = precision
+        self.m = 1 << precision
+        self.registers = bytearray(registers) if registers else bytearray(self.m)
+
+    def add(self, value):
+        x = int.from_bytes(
+            hashlib.blake2b(str(value).encode('utf-8'), digest_size=8).digest(), 'big'
+        )
+        index = x >> (64 - self.p)
+        rest = x & ((1 << (64 - self.p)) - 1)
+        rank = (64 - self.p) - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other):
+        """دمج عداد آخر (أو بايتاته) في هذا العداد"""
+        other_registers = other.registers if isinstance(other, HyperLogLog) else other
+        self.registers = bytearray(map(max, self.registers, other_registers))
+        return self
+
+    def count(self):
+        alpha = 0.7213 / (1 + 1.079 / self.m)
+        estimate = alpha * self.m * self.m / sum(2.0 ** -r for r in self.registers)
+
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * self.m and zeros:
+            # تصحيح النطاق الصغير (Linear Counting)
+            estimate = self.m * math.log(self.m / zeros)
+
+        return int(round(estimate))
+
+    def to_bytes(self):
+        return bytes(self.registers)
+
+    def __len__(self):
+        return self.count()
+
+
+class _MinuteBucket:
+    """بيانات دقيقة واحدة داخل العملية الحالية"""
+
+    __slots__ = ('visitors', 'sessions', 'unsynced_views', 'dirty')
+
+    def __init__(self):
+        self.visitors = HyperLogLog()
+        self.sessions = HyperLogLog()
+        self.unsynced_views = 0
+        self.dirty = False
+
+
+class ActivityTracker:
+    """متتبع النشاط المباشر بنوافذ زمنية منزلقة مقسمة بالدقائق
+
+    كل عملية تجمع الزوار في دلاء دقيقة محلية ثم تنسخها كل بضع ثوانٍ
+    إلى الذاكرة المؤقتة المشتركة في مفتاح خاص بها، وعند القراءة تُدمج
+    دلاء جميع العمليات للنافذة المطلوبة. لا تُقرأ جداول المحتوى إطلاقاً.
+    """
+
+    KEY_PREFIX = 'activity'
+    SYNC_INTERVAL = 5  # ثواني
+    REGISTRATION_INTERVAL = 60  # ثواني بين تجديد تسجيل العملية
+
+    def __init__(self):
+        self.online_window = getattr(settings, 'ACTIVITY_ONLINE_WINDOW', 5)  # دقائق
+        self.session_window = getattr(settings, 'ACTIVITY_SESSION_WINDOW', 30)  # دقائق
+        self.process_token = f'{socket.gethostname()}-{os.getpid()}'
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self._last_sync = 0
+        self._last_registration = 0
+
+    # === المفاتيح ===
+
+    def _bucket_key(self, minute, token):
+        return f'{self.KEY_PREFIX}:m:{minute}:{token}'
+
+    def _views_key(self, minute):
+        return f'{self.KEY_PREFIX}:views:{minute}'
+
+    def _daily_key(self, metric, day=None):
+        day = day or time.strftime('%Y-%m-%d', time.gmtime())
+        return f'{self.KEY_PREFIX}:day:{metric}:{day}'
+
+    @property
+    def _processes_key(self):
+        return f'{self.KEY_PREFIX}:processes'
+
+    @staticmethod
+    def _current_minute():
+        return int(time.time() // 60)
+
+    # === التسجيل ===
+
+    def get_visitor_id(self, request):
+        """معرف الزائر: المستخدم، ثم الجلسة، ثم بصمة العنوان والمتصفح"""
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated:
+            return f'u:{user.pk}'
+
+        session = getattr(request, 'session', None)
+        if session is not None and session.session_key:
+            return f's:{session.session_key}'
+
+        forwarded = request.META.get('HTTP_X_FORWARDED_FOR')
+        ip = forwarded.split(',')[0].strip() if forwarded else request.META.get('REMOTE_ADDR', '')
+        agent = request.META.get('HTTP_USER_AGENT', '')
+        return 'a:' + hashlib.md5(f'{ip}|{agent}'.encode('utf-8')).hexdigest()
+
+    def record(self, request):
+        """تسجيل مشاهدة صفحة للزائر الحالي"""
+        visitor_id = self.get_visitor_id(request)
+        session = getattr(request, 'session', None)
+        session_id = session.session_key if session is not None and session.session_key else visitor_id
+        self.record_visit(visitor_id, session_id)
+
+    def record_visit(self, visitor_id, session_id=None, views=1):
+        minute = self._current_minute()
+
+        with self._lock:
+            bucket = self._buckets.get(minute)
+            if bucket is None:
+                bucket = self._buckets[minute] = _MinuteBucket()
+            bucket.visitors.add(visitor_id)
+            bucket.sessions.add(session_id or visitor_id)
+            bucket.unsynced_views += views
+            bucket.dirty = True
+
+        self.maybe_sync()
+
+    # === المزامنة ===
+
+    def maybe_sync(self):
+        if time.time() - self._last_sync >= self.SYNC_INTERVAL:
+            self.sync()
+
+    def sync(self):
+        """نسخ الدلاء المحلية المعدلة إلى الذاكرة المؤقتة المشتركة"""
+        now = time.time()
+        minute = self._current_minute()
+        ttl = (self.session_window + 2) * 60
+
+        with self._lock:
+            self._last_sync = now
+
+            # حذف الدلاء الخارجة عن أكبر نافذة
+            for old_minute in [m for m in self._buckets if m <= minute - self.session_window]:
+                del self._buckets[old_minute]
+
+            pending = []
+            for bucket_minute, bucket in self._buckets.items():
+                if bucket.dirty:
+                    pending.append((
+                        bucket_minute,
+                        bucket.visitors.to_bytes() + bucket.sessions.to_bytes(),
+                        bucket.unsynced_views
+                    ))
+                    bucket.dirty = False
+                    bucket.unsynced_views = 0
+
+        if not pending:
+            return
+
+        try:
+            cache.set_many({
+                self._bucket_key(bucket_minute, self.process_token): data
+                for bucket_minute, data, _ in pending
+            }, timeout=ttl)
+
+            for bucket_minute, _, views in pending:
+                if views:
+                    self._incr(self._views_key(bucket_minute), views, ttl)
+                    self._incr(self._daily_key('views'), views, 2 * 86400)
+
+            if now - self._last_registration >= self.REGISTRATION_INTERVAL:
+                self._register_process(now)
+        except Exception as e:
+            logger.warning(f'تعذر مزامنة بيانات النشاط: {e}')
+
+    def _register_process(self, now):
+        processes = cache.get(self._processes_key) or {}
+        processes = {
+            token: seen for token, seen in processes.items()
+            if now - seen < self.session_window * 60
+        }
+        processes[self.process_token] = now
+        cache.set(self._processes_key, processes, timeout=None)
+        self._last_registration = now
+
+    def _incr(self, key, delta, timeout):
+        try:
+            return cache.incr(key, delta)
+        except ValueError:
+            if cache.add(key, delta, timeout=timeout):
+                return delta
+            return cache.incr(key, delta)
+
+    # === القراءة ===
+
+    def incr_daily(self, metric, delta=1):
+        """زيادة عداد يومي عام (مثل التحميلات)"""
+        try:
+            self._incr(self._daily_key(metric), delta, 2 * 86400)
+        except Exception as e:
+            logger.warning(f'تعذر تحديث العداد اليومي {metric}: {e}')
+
+    def get_daily(self, *metrics):
+        keys = {self._daily_key(metric): metric for metric in metrics}
+        values = cache.get_many(list(keys))
+        return {metric: values.get(key, 0) for key, metric in keys.items()}
+
+    def get_window_stats(self, *windows):
+        """الزوار والجلسات والمشاهدات خلال آخر N دقيقة لكل نافذة مطلوبة
+
+        تُقرأ دلاء أكبر نافذة بطلب get_many واحد ثم تُحسب النوافذ الأصغر منها.
+        """
+        self.sync()
+
+        minute = self._current_minute()
+        first_minute = minute - max(windows) + 1
+        processes = cache.get(self._processes_key) or {self.process_token: time.time()}
+
+        keys = {}
+        for m in range(first_minute, minute + 1):
+            keys[self._views_key(m)] = (m, None)
+            for token in processes:
+                keys[self._bucket_key(m, token)] = (m, token)
+        values = cache.get_many(list(keys))
+
+        results = []
+        for window in windows:
+            start = minute - window + 1
+            visitors = HyperLogLog()
+            sessions = HyperLogLog()
+            views = 0
+            for key, value in values.items():
+                m, token = keys[key]
+                if m < start:
+                    continue
+                if token is None:
+                    views += value
+                else:
+                    visitors.merge(value[:visitors.m])
+                    sessions.merge(value[visitors.m:])
+
+            results.append({
+                'visitors': visitors.count(),
+                'sessions': sessions.count(),
+                'views': views,
+            })
+
+        return results[0] if len(results) == 1 else results
+
+    def real_time_stats(self):
+        online, active = self.get_window_stats(self.online_window, self.session_window)
+
+        return {
+            'online_users': online['visitors'],
+            'active_sessions': active['sessions'],
+            'current_views': online['views'],
+            'server_load': self.get_server_load(),
+        }
+
+    @staticmethod
+    def get_server_load():
+        """حمل الخادم كنسبة مئوية من عدد المعالجات (آخر دقيقة)"""
+        try:
+            load = os.getloadavg()[0]
+        except (AttributeError, OSError):
+            return 0
+        return min(100, int(round(load / (os.cpu_count() or 1) * 100)))
+
+
+# إنشاء instance للاستخدام
+activity_tracker = ActivityTracker()
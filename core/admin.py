@@ -81,7 +81,7 @@ class CategoryAdmin(admin.ModelAdmin):
     
     def playlist_count(self, obj):
         """عدد قوائم التشغيل في التصنيف"""
-        count = obj.playlist_set.filter(is_published=True).count()
+        count = obj.published_playlists_count
         return format_html(
             '<span class="badge badge-primary">{}</span>',
             count
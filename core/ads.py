@@ -0,0 +1,161 @@
+# core/ads.py
+
+from django.core.cache import cache
+from django.db.models import Q
+from django.utils import timezone
+import logging
+import math
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class AdResolver:
+    """تحديد الإعلانات النشطة لكل موضع باستعلام واحد
+
+    كل الإعلانات المفعلة تُحمّل مرة واحدة وتُقسم حسب الموضع في الذاكرة،
+    وتبقى النتيجة صالحة حتى أقرب تاريخ بداية أو نهاية لأي إعلان (أي
+    اللحظة التي قد تتغير فيها المجموعة النشطة). تعديل أي إعلان يرفع
+    الإصدار فتُعيد كل العمليات التحميل.
+    """
+
+    KEY_PREFIX = 'ads'
+    MAX_TIMEOUT = 24 * 60 * 60  # حد أقصى للتخزين عند عدم وجود حدود زمنية
+
+    def __init__(self):
+        # (الإصدار، وقت الانتهاء، الإعلانات حسب الموضع) في ذاكرة العملية
+        self._local = (None, None, None)
+        self._lock = threading.Lock()
+
+    @property
+    def _version_key(self):
+        return f'{self.KEY_PREFIX}:version'
+
+    def _active_key(self, version):
+        return f'{self.KEY_PREFIX}:active:{version}'
+
+    def get_version(self):
+        version = cache.get(self._version_key)
+        if version is None:
+            cache.add(self._version_key, 1, timeout=None)
+            version = cache.get(self._version_key, 1)
+        return version
+
+    def invalidate(self):
+        try:
+            cache.incr(self._version_key)
+        except ValueError:
+            cache.add(self._version_key, 2, timeout=None)
+        self._local = (None, None, None)
+
+        from .page_cache import page_cache
+        page_cache.purge('ads')
+
+    # === التحميل ===
+
+    def load(self, now=None):
+        """(الإعلانات النشطة حسب الموضع، وقت أقرب حد زمني أو None)"""
+        from .models import Advertisement
+
+        now = now or timezone.now()
+        ads = Advertisement.objects.filter(is_active=True).filter(
+            Q(end_date__isnull=True) | Q(end_date__gt=now)
+        ).order_by('order', 'pk')
+
+        placements = {}
+        boundaries = []
+        for ad in ads:
+            if ad.start_date and ad.start_date > now:
+                # إعلان لم يبدأ بعد: بدايته حد زمني
+                boundaries.append(ad.start_date)
+                continue
+            if ad.end_date:
+                boundaries.append(ad.end_date)
+            placements.setdefault(ad.placement, []).append(ad)
+
+        return placements, min(boundaries) if boundaries else None
+
+    def get_all(self):
+        """الإعلانات النشطة مقسمة حسب الموضع"""
+        now = timezone.now()
+        version = self.get_version()
+
+        local_version, expires_at, placements = self._local
+        if local_version == version and now < expires_at:
+            return placements
+
+        with self._lock:
+            cached = cache.get(self._active_key(version))
+            if cached is not None and now < cached[0]:
+                expires_at, placements = cached
+            else:
+                placements, boundary = self.load(now)
+                timeout = self.MAX_TIMEOUT
+                if boundary is not None:
+                    timeout = min(timeout, max(1, math.ceil((boundary - now).total_seconds())))
+                expires_at = now + timezone.timedelta(seconds=timeout)
+                cache.set(self._active_key(version), (expires_at, placements), timeout)
+
+            self._local = (version, expires_at, placements)
+        return placements
+
+    def get(self, placement):
+        return self.get_all().get(placement, [])
+
+    def seconds_until_change(self):
+        """الثواني المتبقية حتى أقرب حد زمني للإعلانات المحملة"""
+        _, expires_at, _ = self._local
+        if expires_at is None:
+            return self.MAX_TIMEOUT
+        return max(1, math.ceil((expires_at - timezone.now()).total_seconds()))
+
+    # === الإحصائيات ===
+
+    def record_impression_ids(self, ad_ids):
+        """تسجيل ظهور الإعلانات في عدادات التفاعل المجمعة"""
+        from content.utils.counters import engagement_counter
+        from .models import Advertisement
+
+        for ad_id in ad_ids:
+            try:
+                engagement_counter.increment_pk(Advertisement, ad_id, 'views_count')
+            except Exception as e:
+                logger.warning(f'تعذر تسجيل ظهور الإعلان {ad_id}: {e}')
+
+
+class PlacementAds:
+    """وصول سريع لإعلانات الطلب الحالي حسب الموضع
+
+    القراءة من المحلل تتم مرة واحدة لكل طلب، ويُسجل ظهور إعلانات
+    الموضع عند أول استخدام له في القالب فقط. الصفحة التي تستخدم الإعلانات
+    توسم بالمفتاح "ads" وتحفظ معرفات ما عرضته لتسجيل ظهوره عند عرضها من
+    ذاكرة الصفحات.
+    """
+
+    def __init__(self, resolver, request=None):
+        self.resolver = resolver
+        self.request = request
+        self._placements = None
+        self._recorded = set()
+
+    def __getitem__(self, placement):
+        if self._placements is None:
+            self._placements = self.resolver.get_all()
+            # حتى الموضع الفارغ يعتمد على الإعلانات: إعلان جديد يجب أن يظهر فيه
+            from .page_cache import page_cache
+            page_cache.add_keys(self.request, 'ads')
+
+        ads = self._placements.get(placement, [])
+        if ads and placement not in self._recorded:
+            self._recorded.add(placement)
+            ad_ids = [ad.pk for ad in ads]
+            self.resolver.record_impression_ids(ad_ids)
+
+            cached_ads = getattr(self.request, '_page_cache_ads', None)
+            if cached_ads is not None:
+                cached_ads.extend(ad_ids)
+        return ads
+
+
+# إنشاء instance للاستخدام
+ad_resolver = AdResolver()
@@ -0,0 +1,551 @@
+# core/analytics.py
+
+from django.conf import settings
+from django.utils import timezone
+import hashlib
+import json
+import logging
+import math
+import os
+import queue
+import re
+import socket
+import threading
+import time
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
+from pathlib import Path
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+# أنواع الأحداث المقبولة ورموزها في التخزين العمودي
+EVENT_TYPES = ('page_view', 'play', 'pause', 'progress', 'exit')
+EVENT_CODES = {name: code for code, name in enumerate(EVENT_TYPES)}
+
+# أنواع الأجهزة
+DEVICE_TYPES = ('desktop', 'mobile', 'tablet')
+DEVICE_LABELS = {
+    'desktop': 'سطح المكتب',
+    'mobile': 'الجوال',
+    'tablet': 'التابلت',
+}
+
+TABLET_RE = re.compile(r'ipad|tablet|kindle|silk|playbook|android(?!.*mobile)', re.I)
+MOBILE_RE = re.compile(r'mobi|iphone|ipod|android|blackberry|opera mini|iemobile', re.I)
+BOT_RE = re.compile(r'bot|crawl|spider|slurp|preview|headless', re.I)
+
+# حدود استقبال الأحداث من المتصفح
+MAX_BODY_SIZE = 64 * 1024
+MAX_EVENTS_PER_BATCH = 100
+
+# حدود القيم الرقمية في الأحداث (حسب أنواع الأعمدة ونطاقات معقولة)
+MAX_ITEM_ID = 2 ** 63 - 1
+MAX_POSITION = 7 * 24 * 3600  # موضع التشغيل بالثواني
+MAX_VALUE = 1e7
+MAX_TIMESTAMP_MS = 253402300799999  # نهاية سنة 9999، أقصى ما يقبله datetime
+
+# أعمدة الجدول اليومي وأنواعها
+COLUMNS = {
+    'ts': np.int64,          # ميلي ثانية منذ 1970 (UTC)
+    'event': np.uint8,
+    'visitor': np.uint64,
+    'session': np.uint64,
+    'path': np.int32,        # رمز في قاموس المسارات
+    'item': np.int64,        # -1 عند عدم وجود عنصر
+    'position': np.float32,  # موضع التشغيل بالثواني
+    'value': np.float32,     # نسبة التقدم أو مدة البقاء
+    'device': np.uint8,
+}
+
+
+def detect_device(user_agent):
+    """تحديد نوع الجهاز من User-Agent"""
+    if TABLET_RE.search(user_agent):
+        return 'tablet'
+    if MOBILE_RE.search(user_agent):
+        return 'mobile'
+    return 'desktop'
+
+
+def hash_id(value):
+    """تحويل معرف نصي إلى رقم 64 بت ثابت"""
+    return int.from_bytes(
+        hashlib.blake2b(str(value).encode('utf-8'), digest_size=8).digest(), 'big'
+    )
+
+
+def get_analytics_root():
+    return Path(getattr(settings, 'ANALYTICS_ROOT', settings.BASE_DIR / 'analytics_data'))
+
+
+class EventSpool:
+    """مخزن إضافة فقط للأحداث الواردة
+
+    الطلب يضع الدفعة في طابور غير حاجب ويعود فوراً، وخيط خلفي يكتبها
+    كسطور JSON في ملف مقطع زمني خاص بالعملية. عند امتلاء الطابور تُسقط
+    الدفعات بدلاً من إبطاء الاستجابة.
+    """
+
+    SEGMENT_SECONDS = 300
+    MAX_QUEUE_SIZE = 10000
+
+    def __init__(self):
+        self.dropped = 0
+        self._queue = None
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    @property
+    def spool_dir(self):
+        return get_analytics_root() / 'spool'
+
+    def submit(self, records):
+        """إضافة دفعة أحداث دون انتظار الكتابة"""
+        if not records:
+            return True
+
+        self._ensure_writer()
+        try:
+            self._queue.put_nowait(records)
+            return True
+        except queue.Full:
+            self.dropped += len(records)
+            return False
+
+    def _ensure_writer(self):
+        # إعادة تشغيل الخيط بعد fork في خوادم متعددة العمليات
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self._queue = queue.Queue(maxsize=self.MAX_QUEUE_SIZE)
+            self._thread = threading.Thread(
+                target=self._writer_loop, name='analytics-spool', daemon=True
+            )
+            self._thread.start()
+
+    def _writer_loop(self):
+        while True:
+            batches = [self._queue.get()]
+            # تجميع ما تراكم في الطابور لكتابة واحدة
+            while len(batches) < 500:
+                try:
+                    batches.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            try:
+                self._write(batches)
+            except Exception as e:
+                logger.error(f'خطأ في كتابة أحداث التحليلات: {e}')
+
+    def _write(self, batches):
+        segment = int(time.time() // self.SEGMENT_SECONDS)
+        token = f'{socket.gethostname()}-{os.getpid()}'
+        path = self.spool_dir / f'{segment}-{token}.jsonl'
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        lines = ''.join(
+            json.dumps(record, separators=(',', ':')) + '\n'
+            for batch in batches for record in batch
+        )
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(lines)
+
+    def flush(self, timeout=5):
+        """انتظار كتابة ما في الطابور (للأوامر والاختبارات)"""
+        deadline = time.time() + timeout
+        while self._queue is not None and not self._queue.empty() and time.time() < deadline:
+            time.sleep(0.05)
+        time.sleep(0.05)
+
+
+def build_records(payload, request, server_now_ms=None):
+    """تحويل دفعة sendBeacon إلى سجلات جاهزة للتخزين"""
+    from .activity import activity_tracker
+
+    user_agent = request.META.get('HTTP_USER_AGENT', '')
+    if BOT_RE.search(user_agent):
+        return []
+
+    server_now_ms = server_now_ms or int(time.time() * 1000)
+    try:
+        client_now = int(payload.get('now') or server_now_ms)
+    except (TypeError, ValueError, OverflowError):
+        client_now = server_now_ms
+    # تصحيح فرق الساعة بين المتصفح والخادم
+    offset = server_now_ms - client_now
+
+    visitor = hash_id(activity_tracker.get_visitor_id(request))
+    session = hash_id(payload.get('sid') or visitor)
+    device = detect_device(user_agent)
+
+    events = payload.get('events')
+    if not isinstance(events, list):
+        return []
+
+    records = []
+    for event in events[:MAX_EVENTS_PER_BATCH]:
+        if not isinstance(event, dict) or event.get('e') not in EVENT_CODES:
+            continue
+        try:
+            ts = int(event.get('t') or client_now) + offset
+            item = int(event['i']) if event.get('i') else -1
+            position = float(event.get('pos') or 0)
+            value = float(event.get('v') or 0)
+        except (TypeError, ValueError, OverflowError):
+            continue
+
+        records.append({
+            'ts': min(max(ts, server_now_ms - 86400000), server_now_ms),
+            'e': event['e'],
+            'vis': visitor,
+            'ses': session,
+            'p': str(event.get('p') or '')[:200],
+            'i': item if 0 < item <= MAX_ITEM_ID else -1,
+            'pos': _clamp(position, MAX_POSITION),
+            'v': _clamp(value, MAX_VALUE),
+            'd': device,
+        })
+
+    return records
+
+
+def _clamp(value, upper):
+    """قيمة ضمن [0, upper]؛ القيم غير المنتهية تصبح 0"""
+    if not math.isfinite(value):
+        return 0.0
+    return min(max(value, 0.0), upper)
+
+
+def clean_record(record):
+    """التحقق من سجل مقروء من ملف المقاطع؛ None للسجل التالف
+
+    الملفات قد تحتوي سجلات كُتبت قبل تقييد القيم أو سطوراً تالفة، فلا
+    يُسمح لسجل واحد بإيقاف ضغط الملف كله.
+    """
+    try:
+        if record['e'] not in EVENT_CODES or record['d'] not in DEVICE_TYPES:
+            return None
+        ts = int(record['ts'])
+        item = int(record['i'])
+        if not 0 <= ts <= MAX_TIMESTAMP_MS or not (item == -1 or 0 < item <= MAX_ITEM_ID):
+            return None
+        if not (0 <= record['vis'] < 2 ** 64 and 0 <= record['ses'] < 2 ** 64):
+            return None
+        return dict(
+            record, ts=ts, i=item, p=str(record['p'])[:200],
+            pos=_clamp(float(record['pos']), MAX_POSITION),
+            v=_clamp(float(record['v']), MAX_VALUE),
+        )
+    except (KeyError, TypeError, ValueError, OverflowError):
+        return None
+
+
+class EventStore:
+    """تخزين عمودي مقسم بالأيام لأحداث التحليلات
+
+    كل ملف npz يحتوي أعمدة numpy مضغوطة مع قاموس للمسارات.
+    الضغط يحول ملفات المقاطع المكتملة إلى أجزاء يومية، ثم يدمج
+    أجزاء الأيام المنتهية في ملف واحد لكل يوم.
+    """
+
+    def __init__(self, root=None):
+        self.root = Path(root) if root else get_analytics_root()
+
+    @property
+    def events_dir(self):
+        return self.root / 'events'
+
+    @property
+    def spool_dir(self):
+        return self.root / 'spool'
+
+    @property
+    def quarantine_dir(self):
+        return self.root / 'quarantine'
+
+    # === الضغط ===
+
+    def compact(self, include_current=False):
+        """تحويل ملفات المقاطع المكتملة إلى أجزاء عمودية"""
+        if not self.spool_dir.exists():
+            return {'files': 0, 'events': 0}
+
+        current_segment = int(time.time() // EventSpool.SEGMENT_SECONDS)
+        files = 0
+        events = 0
+
+        for path in sorted(self.spool_dir.glob('*.jsonl')):
+            segment = int(path.name.split('-', 1)[0])
+            # المقطع الحالي والسابق قد يكونان قيد الكتابة
+            if not include_current and segment >= current_segment - 1:
+                continue
+
+            try:
+                records = self._read_segment(path)
+                by_day = {}
+                for record in records:
+                    day = datetime.fromtimestamp(record['ts'] / 1000, tz=dt_timezone.utc).date()
+                    by_day.setdefault(day, []).append(record)
+
+                for day, day_records in by_day.items():
+                    self._write_part(day, f'part-{path.stem}', self._to_columns(day_records))
+            except Exception as e:
+                # ملف لا يمكن ضغطه يُنقل جانباً حتى لا يوقف ضغط ما بعده في كل تشغيل
+                logger.error(f'تعذر ضغط ملف التحليلات {path.name}، نُقل إلى quarantine: {e}')
+                self.quarantine_dir.mkdir(parents=True, exist_ok=True)
+                os.replace(path, self.quarantine_dir / path.name)
+                continue
+
+            path.unlink()
+            files += 1
+            events += len(records)
+
+        self.merge_past_days()
+        return {'files': files, 'events': events}
+
+    def _read_segment(self, path):
+        records = []
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = clean_record(json.loads(line))
+                except ValueError:
+                    continue
+                if record is not None:
+                    records.append(record)
+        return records
+
+    def merge_past_days(self):
+        """دمج أجزاء الأيام المنتهية في ملف واحد لكل يوم"""
+        if not self.events_dir.exists():
+            return
+
+        today = timezone.now().date()
+        for day_dir in self.events_dir.iterdir():
+            parts = sorted(day_dir.glob('part-*.npz'))
+            if not parts or day_dir.name >= today.isoformat():
+                continue
+
+            files = parts + [day_dir / 'day.npz'] if (day_dir / 'day.npz').exists() else parts
+            merged = self._concat([self._read(path) for path in files])
+            self._write_part(day_dir.name, 'day', merged)
+            for path in parts:
+                path.unlink()
+
+    def _to_columns(self, records):
+        paths, path_codes = np.unique(
+            np.array([r['p'] for r in records], dtype=str), return_inverse=True
+        )
+        return {
+            'ts': np.array([r['ts'] for r in records], dtype=COLUMNS['ts']),
+            'event': np.array([EVENT_CODES[r['e']] for r in records], dtype=COLUMNS['event']),
+            'visitor': np.array([r['vis'] for r in records], dtype=COLUMNS['visitor']),
+            'session': np.array([r['ses'] for r in records], dtype=COLUMNS['session']),
+            'path': path_codes.astype(COLUMNS['path']),
+            'item': np.array([r['i'] for r in records], dtype=COLUMNS['item']),
+            'position': np.array([r['pos'] for r in records], dtype=COLUMNS['position']),
+            'value': np.array([r['v'] for r in records], dtype=COLUMNS['value']),
+            'device': np.array([DEVICE_TYPES.index(r['d']) for r in records], dtype=COLUMNS['device']),
+            'paths': paths,
+        }
+
+    def _write_part(self, day, name, columns):
+        day_dir = self.events_dir / str(day)
+        day_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = day_dir / f'{name}.tmp.npz'
+        np.savez_compressed(tmp_path, **columns)
+        os.replace(tmp_path, day_dir / f'{name}.npz')
+
+    def _read(self, path):
+        with np.load(path, allow_pickle=False) as data:
+            return {key: data[key] for key in data.files}
+
+    def _concat(self, parts):
+        """دمج أجزاء مع توحيد قواميس المسارات"""
+        parts = [part for part in parts if len(part['ts'])]
+        if not parts:
+            return self._empty()
+
+        paths, inverse = np.unique(
+            np.concatenate([part['paths'] for part in parts]), return_inverse=True
+        )
+
+        merged = {}
+        offset = 0
+        remapped = []
+        for part in parts:
+            size = len(part['paths'])
+            remapped.append(inverse[offset:offset + size][part['path']].astype(COLUMNS['path']))
+            offset += size
+
+        for column in COLUMNS:
+            if column == 'path':
+                merged[column] = np.concatenate(remapped)
+            else:
+                merged[column] = np.concatenate([part[column] for part in parts])
+        merged['paths'] = paths
+        return merged
+
+    def _empty(self):
+        columns = {column: np.array([], dtype=dtype) for column, dtype in COLUMNS.items()}
+        columns['paths'] = np.array([], dtype=str)
+        return columns
+
+    # === القراءة ===
+
+    def load(self, start_date, end_date=None):
+        """تحميل أعمدة الأحداث لفترة زمنية"""
+        end_date = end_date or timezone.now()
+        if not self.events_dir.exists():
+            return self._empty()
+
+        start_day = start_date.astimezone(dt_timezone.utc).date().isoformat()
+        end_day = end_date.astimezone(dt_timezone.utc).date().isoformat()
+
+        parts = [
+            self._read(path)
+            for day_dir in sorted(self.events_dir.iterdir())
+            if start_day <= day_dir.name <= end_day
+            for path in sorted(day_dir.glob('*.npz'))
+            if not path.name.endswith('.tmp.npz')
+        ]
+        columns = self._concat(parts)
+
+        mask = (
+            (columns['ts'] >= int(start_date.timestamp() * 1000)) &
+            (columns['ts'] <= int(end_date.timestamp() * 1000))
+        )
+        if mask.all():
+            return columns
+        return {
+            key: (value if key == 'paths' else value[mask])
+            for key, value in columns.items()
+        }
+
+
+class AnalyticsReport:
+    """حساب مقاييس التحليلات بعمليات numpy متجهة"""
+
+    def __init__(self, columns):
+        self.columns = columns
+        self._sessions = None
+
+    @classmethod
+    def for_period(cls, start_date, end_date=None):
+        return cls(EventStore().load(start_date, end_date))
+
+    @property
+    def is_empty(self):
+        return len(self.columns['ts']) == 0
+
+    def _session_summary(self):
+        """ملخص الجلسات: بداية كل جلسة ومدتها وعدد الصفحات والتشغيلات"""
+        if self._sessions is not None:
+            return self._sessions
+
+        c = self.columns
+        order = np.lexsort((c['ts'], c['session']))
+        session = c['session'][order]
+        ts = c['ts'][order]
+        event = c['event'][order]
+
+        starts = np.flatnonzero(np.r_[True, session[1:] != session[:-1]])
+        self._sessions = {
+            'order': order,
+            'starts': starts,
+            'duration': np.maximum.reduceat(ts, starts) - np.minimum.reduceat(ts, starts),
+            'page_views': np.add.reduceat((event == EVENT_CODES['page_view']).astype(np.int64), starts),
+            'plays': np.add.reduceat((event == EVENT_CODES['play']).astype(np.int64), starts),
+        }
+        return self._sessions
+
+    def unique_visitors(self):
+        return int(np.unique(self.columns['visitor']).size)
+
+    def bounce_rate(self):
+        """نسبة الجلسات ذات صفحة واحدة دون تشغيل أي محتوى"""
+        if self.is_empty:
+            return 0
+        s = self._session_summary()
+        with_pages = s['page_views'] > 0
+        if not with_pages.any():
+            return 0
+        bounced = with_pages & (s['page_views'] == 1) & (s['plays'] == 0)
+        return round(float(bounced.sum()) / float(with_pages.sum()) * 100, 1)
+
+    def average_session_duration(self):
+        """متوسط مدة الجلسة بصيغة دقائق:ثواني"""
+        if self.is_empty:
+            return '0:00'
+        seconds = int(self._session_summary()['duration'].mean() / 1000)
+        return f'{seconds // 60}:{seconds % 60:02d}'
+
+    def active_hours(self):
+        """توزيع الأحداث على ساعات اليوم بالتوقيت المحلي"""
+        offset = timezone.localtime().utcoffset() or timedelta(0)
+        hours = ((self.columns['ts'] + int(offset.total_seconds() * 1000)) // 3600000) % 24
+        counts = np.bincount(hours.astype(np.int64), minlength=24)
+        return [{'hour': hour, 'activity': int(count)} for hour, count in enumerate(counts)]
+
+    def user_flow(self, limit=3):
+        """صفحات الدخول والخروج الأكثر تكراراً"""
+        c = self.columns
+        if self.is_empty:
+            return {'entry_pages': [], 'exit_pages': []}
+
+        views = c['event'] == EVENT_CODES['page_view']
+        order = np.lexsort((c['ts'][views], c['session'][views]))
+        session = c['session'][views][order]
+        path = c['path'][views][order]
+        if not len(session):
+            return {'entry_pages': [], 'exit_pages': []}
+
+        boundaries = session[1:] != session[:-1]
+        entries = path[np.r_[True, boundaries]]
+        exits = path[np.r_[boundaries, True]]
+
+        return {
+            'entry_pages': self._top_paths(entries, limit),
+            'exit_pages': self._top_paths(exits, limit),
+        }
+
+    def _top_paths(self, codes, limit):
+        counts = np.bincount(codes, minlength=len(self.columns['paths']))
+        top = np.argsort(counts)[::-1][:limit]
+        total = codes.size
+        return [
+            {
+                'page': str(self.columns['paths'][code]) or '/',
+                'percentage': round(float(counts[code]) / total * 100, 1)
+            }
+            for code in top if counts[code]
+        ]
+
+    def device_breakdown(self):
+        """تقسيم الجلسات حسب نوع الجهاز"""
+        if self.is_empty:
+            return []
+        s = self._session_summary()
+        devices = self.columns['device'][s['order']][s['starts']]
+        counts = np.bincount(devices, minlength=len(DEVICE_TYPES))
+        total = counts.sum()
+        return [
+            {
+                'device': DEVICE_LABELS[DEVICE_TYPES[code]],
+                'percentage': round(float(counts[code]) / total * 100, 1)
+            }
+            for code in np.argsort(counts)[::-1] if counts[code]
+        ]
+
+
+# إنشاء instance للاستخدام
+analytics_spool = EventSpool()
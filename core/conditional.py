@@ -0,0 +1,84 @@
+# core/conditional.py
+
+from django.utils import translation
+from django.utils.cache import get_conditional_response, patch_cache_control
+from functools import wraps
+import hashlib
+import logging
+
+from .page_cache import page_cache
+
+logger = logging.getLogger(__name__)
+
+# مفاتيح تعتمد عليها كل صفحات الموقع (التنقل والإعلانات)
+GLOBAL_KEYS = ('nav', 'ads')
+
+
+def build_etag(request, keys, parts):
+    """ETag ضعيف من حالة البيانات واللغة والمستخدم وأجيال المفاتيح البديلة
+
+    أجيال المفاتيح (playlist:ID، item:ID ...) ترتفع مع كل إبطال لصفحاتها
+    فتغطي ما لا يظهر في حقول الحداثة (تعليق جديد، علامة، تصنيف). ضعيف
+    لأن بايتات الصفحة تختلف بين العروض (رمز CSRF، المحتوى العشوائي) مع
+    أن البيانات نفسها لم تتغير.
+    """
+    user_id = request.user.pk if request.user.is_authenticated else 0
+    generations = page_cache.generations(keys) if keys else {}
+    state = repr((
+        parts,
+        translation.get_language(),
+        user_id,
+        sorted(generations.items()),
+    ))
+    return f'W/"{hashlib.md5(state.encode("utf-8")).hexdigest()}"'
+
+
+def conditional_page(freshness, global_keys=GLOBAL_KEYS):
+    """إجابة If-None-Match بـ 304 قبل بناء الصفحة
+
+    freshness(request, *args, **kwargs) دالة رخيصة (استعلام واحد صغير
+    على الحقول المحسوبة مسبقاً) تعيد (المفاتيح البديلة، أجزاء الحالة)،
+    أو None عندما لا يمكن التحقق (مثل كائن غير موجود) فيُترك الطلب
+    للعرض. global_keys تُضاف لمفاتيح كل طلب (فارغة للتصديرات التي لا
+    تعرض التنقل أو الإعلانات).
+
+    لا يُرسل Last-Modified: حذف عنصر أو تفريغ العدادات أو إعادة تسمية
+    تصنيف لا يغير updated_at، فعميل يرسل If-Modified-Since وحده كان
+    سيحصل على 304 لنسخة قديمة. التحقق بالـ ETag وحده.
+    يُستخدم مع method_decorator على dispatch فوق cache_anonymous_page.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            # رسالة معلقة تجعل الصفحة مختلفة عن النسخة المحفوظة لدى المتصفح
+            if request.method not in ('GET', 'HEAD') or 'messages' in request.COOKIES:
+                return view_func(request, *args, **kwargs)
+
+            try:
+                state = freshness(request, *args, **kwargs)
+            except Exception as e:
+                logger.warning(f'تعذر حساب حداثة الصفحة: {e}')
+                state = None
+            if state is None:
+                return view_func(request, *args, **kwargs)
+
+            keys, parts = state
+            etag = build_etag(request, (*global_keys, *keys), parts)
+
+            response = get_conditional_response(request, etag=etag)
+            if response is None:
+                response = view_func(request, *args, **kwargs)
+                if response.status_code != 200:
+                    return response
+            elif response.status_code != 304:
+                return response
+
+            if not response.has_header('ETag'):
+                response['ETag'] = etag
+            # المتصفح يعيد التحقق في كل زيارة بدلاً من التخزين الاستدلالي
+            patch_cache_control(response, no_cache=True)
+            return response
+
+        return wrapper
+
+    return decorator
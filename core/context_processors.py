@@ -19,26 +19,16 @@ def navigation_data(request):
     }
 
 def ads_context(request):
-    """إضافة الإعلانات إلى السياق"""
-    from django.utils import timezone
-    from django.db.models import Q
-    
-    now = timezone.now()
-    
-    # إعلانات مفعلة وضمن الفترة الزمنية المحددة
-    ads_query = Advertisement.objects.filter(
-        is_active=True
-    ).filter(
-        Q(start_date__isnull=True) | Q(start_date__lte=now)
-    ).filter(
-        Q(end_date__isnull=True) | Q(end_date__gte=now)
-    )
-    
+    """إضافة الإعلانات إلى السياق
+
+    كل المواضع تُقرأ من نتيجة واحدة مخزنة، ولا يُقرأ أي شيء إذا لم
+    يستخدم القالب الإعلانات.
+    """
+    from django.utils.functional import SimpleLazyObject
+    from .ads import ad_resolver, PlacementAds
+
+    ads = PlacementAds(ad_resolver, request)
     return {
-        'header_ads': ads_query.filter(placement='header').order_by('order'),
-        'sidebar_ads': ads_query.filter(placement='sidebar').order_by('order'),
-        'footer_ads': ads_query.filter(placement='footer').order_by('order'),
-        'content_top_ads': ads_query.filter(placement='content_top').order_by('order'),
-        'content_bottom_ads': ads_query.filter(placement='content_bottom').order_by('order'),
-        'between_posts_ads': ads_query.filter(placement='between_posts').order_by('order'),
+        f'{placement}_ads': SimpleLazyObject(lambda placement=placement: ads[placement])
+        for placement, _ in Advertisement.PLACEMENT_CHOICES
     }
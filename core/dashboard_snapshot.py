@@ -0,0 +1,483 @@
+# core/dashboard_snapshot.py
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+from datetime import timedelta
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class DashboardSnapshot:
+    """لقطة مخزنة مؤقتاً لإحصائيات لوحة التحكم
+
+    الوثيقة الأساسية تُحسب كاملة دورياً، وبين كل حسابين تُسجل تغييرات
+    النماذج كزيادات ذرية في مفاتيح منفصلة. العرض يقرأ الوثيقة والزيادات
+    بطلب get_many واحد ويدمجها في الذاكرة.
+    """
+
+    KEY_PREFIX = 'dashboard'
+    RECENT_ACTIVITY_LIMIT = 15
+    CATEGORIES_LIMIT = 10
+
+    # العدادات القابلة للتحديث بالزيادات
+    COUNTERS = (
+        'playlists_total', 'playlists_published',
+        'items_total', 'items_published',
+        'total_views', 'youtube_downloads', 'soundcloud_downloads',
+        'users_total', 'subscribers_active',
+        'comments_total', 'comments_pending',
+        'messages_unread',
+    )
+
+    DAILY_FIELDS = ('views', 'youtube_downloads', 'soundcloud_downloads', 'text_copies', 'shares')
+
+    CATEGORY_COLORS = [
+        '#007bff', '#28a745', '#dc3545', '#ffc107', '#17a2b8',
+        '#6f42c1', '#e83e8c', '#fd7e14', '#20c997', '#6c757d'
+    ]
+
+    def __init__(self):
+        self.refresh_interval = getattr(settings, 'DASHBOARD_SNAPSHOT_REFRESH_INTERVAL', 600)
+
+    # === المفاتيح ===
+
+    @property
+    def _doc_key(self):
+        return f'{self.KEY_PREFIX}:snapshot'
+
+    @property
+    def _recent_key(self):
+        return f'{self.KEY_PREFIX}:recent'
+
+    @property
+    def _categories_key(self):
+        return f'{self.KEY_PREFIX}:categories'
+
+    def _counter_key(self, name):
+        return f'{self.KEY_PREFIX}:delta:{name}'
+
+    def _month_key(self, month, name):
+        return f'{self.KEY_PREFIX}:delta:month:{month}:{name}'
+
+    def _day_key(self, day, field):
+        return f'{self.KEY_PREFIX}:delta:day:{day}:{field}'
+
+    @staticmethod
+    def _month_of(value):
+        return timezone.localtime(value).strftime('%Y-%m')
+
+    def _current_months(self):
+        current_month = timezone.localtime().replace(day=1)
+        last_month = current_month - timedelta(days=1)
+        return current_month.strftime('%Y-%m'), last_month.strftime('%Y-%m')
+
+    def _content_types(self):
+        from content.models import PlaylistItem
+        return PlaylistItem.CONTENT_TYPE_CHOICES
+
+    def _counter_names(self):
+        return self.COUNTERS + tuple(f'type:{value}' for value, _ in self._content_types())
+
+    def _delta_keys(self):
+        today = timezone.localdate()
+        keys = [self._counter_key(name) for name in self._counter_names()]
+        for month in self._current_months():
+            keys += [self._month_key(month, 'items'), self._month_key(month, 'subscribers')]
+        for day in (today - timedelta(days=1), today):
+            keys += [self._day_key(day.isoformat(), field) for field in self.DAILY_FIELDS]
+        return keys
+
+    # === الزيادات ===
+
+    def add(self, **deltas):
+        """زيادة ذرية لعدادات اللقطة"""
+        for name, delta in deltas.items():
+            if delta:
+                self._incr(self._counter_key(name), delta)
+
+    def add_month(self, created_at, name, delta=1):
+        self._incr(self._month_key(self._month_of(created_at), name), delta)
+
+    def add_daily(self, field, delta):
+        self._incr(self._day_key(timezone.localdate().isoformat(), field), delta)
+
+    def _incr(self, key, delta):
+        try:
+            try:
+                cache.incr(key, delta)
+            except ValueError:
+                if not cache.add(key, delta, timeout=None):
+                    cache.incr(key, delta)
+        except Exception as e:
+            logger.warning(f'تعذر تحديث لقطة لوحة التحكم {key}: {e}')
+
+    def push_activity(self, activity):
+        """إضافة نشاط جديد إلى بداية قائمة النشاط الأخير"""
+        activities = cache.get(self._recent_key)
+        if activities is None:
+            # القائمة ستُبنى في الحساب الكامل التالي
+            return
+        activities.insert(0, activity)
+        cache.set(self._recent_key, activities[:self.RECENT_ACTIVITY_LIMIT], timeout=None)
+
+    def invalidate_categories(self):
+        cache.delete(self._categories_key)
+
+    # === الحساب الكامل ===
+
+    def rebuild(self):
+        """حساب الوثيقة كاملة من قاعدة البيانات وتصفير الزيادات"""
+        doc = self.compute()
+        recent = self.compute_recent_activity()
+
+        # الزيادات التي تصل بين الحساب والحذف تُفقد ويصححها الحساب التالي
+        cache.set_many({
+            self._doc_key: doc,
+            self._recent_key: recent,
+            self._categories_key: self.compute_categories(),
+        }, timeout=None)
+        cache.delete_many(self._delta_keys())
+
+        return doc
+
+    def compute(self):
+        from content.models import Playlist, PlaylistItem, Comment, EngagementDaily
+        from .models import Newsletter, ContactMessage
+
+        now = timezone.now()
+        current_month, last_month = self._current_months()
+        current_month_start = timezone.localtime(now).replace(
+            day=1, hour=0, minute=0, second=0, microsecond=0
+        )
+        last_month_start = (current_month_start - timedelta(days=1)).replace(day=1)
+
+        playlists = Playlist.objects.aggregate(
+            total=Count('id'),
+            published=Count('id', filter=Q(is_published=True))
+        )
+        items = PlaylistItem.objects.aggregate(
+            total=Count('id'),
+            published=Count('id', filter=Q(is_published=True)),
+            views=Sum('views_count'),
+            youtube_downloads=Sum('youtube_downloads'),
+            soundcloud_downloads=Sum('soundcloud_downloads'),
+            current_month=Count('id', filter=Q(created_at__gte=current_month_start)),
+            last_month=Count('id', filter=Q(
+                created_at__gte=last_month_start, created_at__lt=current_month_start
+            )),
+            outdated=Count('id', filter=Q(
+                updated_at__lt=now - timedelta(days=30), youtube_url__isnull=False
+            ) & ~Q(youtube_url=''))
+        )
+        subscribers = Newsletter.objects.aggregate(
+            active=Count('id', filter=Q(is_active=True)),
+            current_month=Count('id', filter=Q(subscribed_at__gte=current_month_start)),
+            last_month=Count('id', filter=Q(
+                subscribed_at__gte=last_month_start, subscribed_at__lt=current_month_start
+            ))
+        )
+        content_types = dict(
+            PlaylistItem.objects.values('content_type').annotate(
+                count=Count('id')
+            ).values_list('content_type', 'count')
+        )
+        comments = Comment.objects.aggregate(
+            total=Count('id'),
+            pending=Count('id', filter=Q(is_approved=False, is_spam=False))
+        )
+
+        # التفاعل اليومي لآخر 30 يوم
+        start_day = timezone.localdate() - timedelta(days=29)
+        daily = {
+            row['day'].isoformat(): {field: row[f'total_{field}'] or 0 for field in self.DAILY_FIELDS}
+            for row in EngagementDaily.objects.filter(day__gte=start_day).values('day').annotate(
+                **{f'total_{field}': Sum(field) for field in self.DAILY_FIELDS}
+            )
+        }
+
+        return {
+            'computed_at': now,
+            'counters': {
+                'playlists_total': playlists['total'],
+                'playlists_published': playlists['published'],
+                'items_total': items['total'],
+                'items_published': items['published'],
+                'total_views': items['views'] or 0,
+                'youtube_downloads': items['youtube_downloads'] or 0,
+                'soundcloud_downloads': items['soundcloud_downloads'] or 0,
+                'users_total': User.objects.count(),
+                'subscribers_active': subscribers['active'],
+                'comments_total': comments['total'],
+                'comments_pending': comments['pending'],
+                'messages_unread': ContactMessage.objects.filter(is_read=False).count(),
+                **{
+                    f'type:{value}': content_types.get(value, 0)
+                    for value, _ in self._content_types()
+                },
+            },
+            'months': {
+                current_month: {'items': items['current_month'], 'subscribers': subscribers['current_month']},
+                last_month: {'items': items['last_month'], 'subscribers': subscribers['last_month']},
+            },
+            'daily': daily,
+            'outdated_items': items['outdated'],
+        }
+
+    def compute_categories(self):
+        from .models import Category
+
+        categories = Category.objects.annotate(
+            playlist_count=Count('playlist', filter=Q(playlist__is_published=True))
+        ).filter(playlist_count__gt=0).order_by('-playlist_count')[:self.CATEGORIES_LIMIT]
+
+        return [
+            {
+                'name': category.name,
+                'count': category.playlist_count,
+                'color': self.CATEGORY_COLORS[category.id % len(self.CATEGORY_COLORS)]
+            }
+            for category in categories
+        ]
+
+    def compute_recent_activity(self):
+        from content.models import Playlist, Comment
+        from .models import ContactMessage
+
+        activities = []
+        for playlist in Playlist.objects.select_related('created_by').order_by('-created_at')[:5]:
+            activities.append(self.playlist_activity(playlist))
+        for comment in Comment.objects.select_related('playlist_item').order_by('-created_at')[:5]:
+            activities.append(self.comment_activity(comment))
+        for message in ContactMessage.objects.order_by('-created_at')[:3]:
+            activities.append(self.message_activity(message))
+
+        activities.sort(key=lambda x: x['time'], reverse=True)
+        return activities[:self.RECENT_ACTIVITY_LIMIT]
+
+    # === عناصر النشاط ===
+
+    def playlist_activity(self, playlist):
+        return {
+            'type': 'playlist_created',
+            'title': f'تم إنشاء قائمة تشغيل جديدة: {playlist.title}',
+            'user': playlist.created_by.get_full_name() or playlist.created_by.username,
+            'time': playlist.created_at,
+            'url': f'/admin/content/playlist/{playlist.id}/change/',
+            'icon': 'bi-collection-play',
+            'color': 'primary'
+        }
+
+    def comment_activity(self, comment):
+        return {
+            'type': 'comment_added',
+            'title': f'تعليق جديد على: {comment.playlist_item.title}',
+            'user': comment.author_name,
+            'time': comment.created_at,
+            'url': f'/admin/content/comment/{comment.id}/change/',
+            'icon': 'bi-chat-dots',
+            'color': 'info'
+        }
+
+    def message_activity(self, message):
+        return {
+            'type': 'message_received',
+            'title': f'رسالة جديدة: {message.subject}',
+            'user': message.name,
+            'time': message.created_at,
+            'url': f'/admin/core/contactmessage/{message.id}/change/',
+            'icon': 'bi-envelope',
+            'color': 'warning' if not message.is_read else 'success'
+        }
+
+    # === القراءة ===
+
+    def get(self):
+        """لقطة لوحة التحكم الحالية (قراءة واحدة من الذاكرة المؤقتة)"""
+        delta_keys = self._delta_keys()
+        values = cache.get_many([self._doc_key, self._recent_key, self._categories_key] + delta_keys)
+
+        doc = values.get(self._doc_key)
+        if doc is None or (timezone.now() - doc['computed_at']).total_seconds() > self.refresh_interval * 3:
+            # لا توجد لقطة أو المهمة الدورية متوقفة: حساب فوري
+            self.rebuild()
+            values = cache.get_many([self._doc_key, self._recent_key, self._categories_key])
+            doc = values[self._doc_key]
+
+        categories = values.get(self._categories_key)
+        if categories is None:
+            categories = self.compute_categories()
+            cache.set(self._categories_key, categories, timeout=None)
+
+        counters = {
+            name: doc['counters'].get(name, 0) + values.get(self._counter_key(name), 0)
+            for name in self._counter_names()
+        }
+
+        months = {}
+        for month in self._current_months():
+            base = doc['months'].get(month, {})
+            months[month] = {
+                name: base.get(name, 0) + values.get(self._month_key(month, name), 0)
+                for name in ('items', 'subscribers')
+            }
+
+        daily = {day: dict(fields) for day, fields in doc['daily'].items()}
+        today = timezone.localdate()
+        for day in (today - timedelta(days=1), today):
+            for field in self.DAILY_FIELDS:
+                delta = values.get(self._day_key(day.isoformat(), field), 0)
+                if delta:
+                    row = daily.setdefault(day.isoformat(), dict.fromkeys(self.DAILY_FIELDS, 0))
+                    row[field] += delta
+
+        return {
+            'computed_at': doc['computed_at'],
+            'age_seconds': int((timezone.now() - doc['computed_at']).total_seconds()),
+            'stats': self.build_stats(counters, months),
+            'charts_data': self.build_charts(counters, daily, categories),
+            'recent_activity': values.get(self._recent_key) or [],
+            'alerts': self.build_alerts(counters, doc['outdated_items']),
+        }
+
+    def get_counters(self, *names):
+        """قيم عدادات محددة من اللقطة وزياداتها (قراءة واحدة من الذاكرة المؤقتة)"""
+        counter_keys = {name: self._counter_key(name) for name in names}
+        values = cache.get_many([self._doc_key, *counter_keys.values()])
+
+        doc = values.get(self._doc_key)
+        if doc is None:
+            # لا توجد لقطة بعد: حساب كامل مرة واحدة يصفر الزيادات
+            doc = self.rebuild()
+            values = {}
+
+        return {
+            name: doc['counters'].get(name, 0) + values.get(key, 0)
+            for name, key in counter_keys.items()
+        }
+
+    def build_stats(self, counters, months):
+        current_month, last_month = self._current_months()
+        total_items = counters['items_total']
+        published_items = counters['items_published']
+        total_views = counters['total_views']
+
+        return {
+            'content': {
+                'total_playlists': counters['playlists_total'],
+                'published_playlists': counters['playlists_published'],
+                'total_items': total_items,
+                'published_items': published_items,
+                'publish_rate': round((published_items / total_items * 100) if total_items > 0 else 0, 1)
+            },
+            'engagement': {
+                'total_views': total_views,
+                'total_youtube_downloads': counters['youtube_downloads'],
+                'total_soundcloud_downloads': counters['soundcloud_downloads'],
+                'avg_views_per_item': round(total_views / published_items if published_items > 0 else 0, 1)
+            },
+            'community': {
+                'total_users': counters['users_total'],
+                'newsletter_subscribers': counters['subscribers_active'],
+                'total_comments': counters['comments_total'],
+                'pending_comments': counters['comments_pending'],
+                'unread_messages': counters['messages_unread']
+            },
+            'growth': {
+                'content_growth': self.percentage_change(
+                    months[last_month]['items'], months[current_month]['items']
+                ),
+                'subscriber_growth': self.percentage_change(
+                    months[last_month]['subscribers'], months[current_month]['subscribers']
+                )
+            }
+        }
+
+    @staticmethod
+    def percentage_change(old_value, new_value):
+        """حساب النسبة المئوية للتغيير"""
+        if old_value == 0:
+            return 100 if new_value > 0 else 0
+        return round(((new_value - old_value) / old_value) * 100, 1)
+
+    def build_charts(self, counters, daily, categories):
+        today = timezone.localdate()
+        start_day = today - timedelta(days=29)
+
+        views_chart = []
+        totals = dict.fromkeys(self.DAILY_FIELDS, 0)
+        for i in range(30):
+            day = start_day + timedelta(days=i)
+            row = daily.get(day.isoformat(), {})
+            for field in self.DAILY_FIELDS:
+                totals[field] += row.get(field, 0)
+            views_chart.append({
+                'date': day.strftime('%Y-%m-%d'),
+                'views': row.get('views', 0),
+                'label': day.strftime('%d/%m')
+            })
+
+        return {
+            'views_chart': views_chart,
+            'content_chart': sorted(
+                [
+                    {'type': value, 'count': counters[f'type:{value}'], 'label': str(label)}
+                    for value, label in self._content_types()
+                    if counters[f'type:{value}'] > 0
+                ],
+                key=lambda item: item['count'], reverse=True
+            ),
+            'engagement_chart': [
+                {'label': 'المشاهدات', 'value': totals['views']},
+                {'label': 'تحميلات يوتيوب', 'value': totals['youtube_downloads']},
+                {'label': 'تحميلات ساوند كلاود', 'value': totals['soundcloud_downloads']},
+                {'label': 'نسخ النص', 'value': totals['text_copies']},
+                {'label': 'المشاركات', 'value': totals['shares']}
+            ],
+            'categories_chart': categories
+        }
+
+    def build_alerts(self, counters, outdated_items):
+        alerts = []
+
+        if counters['comments_pending'] > 0:
+            alerts.append({
+                'type': 'warning',
+                'title': f"{counters['comments_pending']} تعليق في انتظار الموافقة",
+                'action': '/admin/content/comment/?is_approved__exact=0&is_spam__exact=0',
+                'icon': 'bi-chat-dots'
+            })
+
+        if counters['messages_unread'] > 0:
+            alerts.append({
+                'type': 'info',
+                'title': f"{counters['messages_unread']} رسالة غير مقروءة",
+                'action': '/admin/core/contactmessage/?is_read__exact=0',
+                'icon': 'bi-envelope'
+            })
+
+        unpublished_items = counters['items_total'] - counters['items_published']
+        if unpublished_items > 0:
+            alerts.append({
+                'type': 'secondary',
+                'title': f'{unpublished_items} عنصر غير منشور',
+                'action': '/admin/content/playlistitem/?is_published__exact=0',
+                'icon': 'bi-eye-slash'
+            })
+
+        if outdated_items > 0:
+            alerts.append({
+                'type': 'primary',
+                'title': f'{outdated_items} عنصر يحتاج تحديث معلومات',
+                'action': '/admin/content/sync-media/',
+                'icon': 'bi-arrow-repeat'
+            })
+
+        return alerts
+
+
+# إنشاء instance للاستخدام
+dashboard_snapshot = DashboardSnapshot()
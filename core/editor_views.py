@@ -295,6 +295,7 @@ def editor_link_checker(request):
         
         import requests
         from urllib.parse import urlparse
+        from .http_client import http_client
         
         # التحقق من صيغة الرابط
         parsed = urlparse(url)
@@ -303,7 +304,7 @@ def editor_link_checker(request):
         
         # فحص الرابط
         try:
-            response = requests.head(url, timeout=10, allow_redirects=True)
+            response = http_client.head(url, timeout=10, allow_redirects=True)
             
             return JsonResponse({
                 'success': True,
@@ -0,0 +1,204 @@
+# core/http_client.py
+
+from collections import defaultdict, deque
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib.parse import urlsplit
+from urllib3.util.retry import Retry
+import logging
+import requests
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class HttpStats:
+    """إحصائيات الطلبات الخارجية لكل مضيف (زمن، أخطاء، بايتات)
+
+    يُسجل كخطاف في HttpClient، ويحتفظ بآخر LATENCY_SAMPLES زمناً لكل
+    مضيف لحساب الوسيط وp95.
+    """
+
+    LATENCY_SAMPLES = 1000
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._hosts = defaultdict(lambda: {
+                'requests': 0,
+                'errors': 0,
+                'bytes': 0,
+                'latencies': deque(maxlen=self.LATENCY_SAMPLES),
+            })
+
+    def __call__(self, event):
+        with self._lock:
+            host = self._hosts[event['host']]
+            host['requests'] += 1
+            host['bytes'] += event['bytes']
+            host['latencies'].append(event['elapsed'])
+            if event['error'] or (event['status'] or 0) >= 500:
+                host['errors'] += 1
+
+    def snapshot(self):
+        """{المضيف: {requests, errors, error_rate, bytes, p50_ms, p95_ms}}"""
+        with self._lock:
+            hosts = {name: dict(data, latencies=sorted(data['latencies'])) for name, data in self._hosts.items()}
+
+        report = {}
+        for name, data in hosts.items():
+            latencies = data['latencies']
+            report[name] = {
+                'requests': data['requests'],
+                'errors': data['errors'],
+                'error_rate': data['errors'] / data['requests'] if data['requests'] else 0,
+                'bytes': data['bytes'],
+                'p50_ms': latencies[len(latencies) // 2] * 1000 if latencies else 0,
+                'p95_ms': latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000 if latencies else 0,
+            }
+        return report
+
+
+class HttpClient:
+    """عميل HTTP مشترك لكل الطلبات الخارجية
+
+    جلسة requests واحدة بمجمع اتصالات لكل مضيف (keep-alive) فلا يُدفع
+    اتصال TCP وTLS جديد لكل طلب، مع إعادة محاولة أخطاء الاتصال وردود
+    البوابة (502/503/504) بتراجع أسي، ومهلة افتراضية لكل طلب، وحد
+    للطلبات المتزامنة لكل مضيف. كل طلب يُبلغ الخطافات المسجلة بحدث
+    {method, host, status, elapsed, bytes, error}.
+
+    429 و500 لا يُعاد طلبهما هنا: media_fetcher يعالجهما بحد المعدل المتكيف.
+    الطلبات بـ retry_status=False (طلبات media_fetcher) تمر بجلسة ثانية لا
+    تعيد ردود البوابة أيضاً، فكل رمز من حد المعدل طلب واحد للمزود وكل رد
+    مرفوض يصل إلى التكيف فوراً؛ أخطاء الاتصال تُعاد في الجلستين.
+    """
+
+    RETRY_STATUSES = (502, 503, 504)
+    RETRY_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS'})
+
+    def __init__(self):
+        self.timeout = (settings.HTTP_CONNECT_TIMEOUT, settings.HTTP_READ_TIMEOUT)
+        self.max_per_host = settings.HTTP_MAX_PER_HOST
+        self.hooks = []
+        self.stats = HttpStats()
+        self.add_hook(self.stats)
+
+        self._sessions = {}
+        self._session_lock = threading.Lock()
+        self._semaphores = {}
+        self._semaphores_lock = threading.Lock()
+
+    # === الجلسة ===
+
+    def _build_session(self, retry_status=True):
+        retry = Retry(
+            total=settings.HTTP_RETRIES,
+            backoff_factor=settings.HTTP_RETRY_BACKOFF,
+            status=None if retry_status else 0,
+            status_forcelist=self.RETRY_STATUSES if retry_status else (),
+            allowed_methods=self.RETRY_METHODS,
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=settings.HTTP_POOL_HOSTS,
+            pool_maxsize=max(settings.HTTP_POOL_SIZE, self.max_per_host),
+            max_retries=retry,
+        )
+        session = requests.Session()
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        session.headers['User-Agent'] = settings.HTTP_USER_AGENT
+        return session
+
+    @property
+    def session(self):
+        return self._session(True)
+
+    def _session(self, retry_status):
+        session = self._sessions.get(retry_status)
+        if session is None:
+            with self._session_lock:
+                session = self._sessions.get(retry_status)
+                if session is None:
+                    session = self._sessions[retry_status] = self._build_session(retry_status)
+        return session
+
+    def _semaphore(self, host):
+        semaphore = self._semaphores.get(host)
+        if semaphore is None:
+            with self._semaphores_lock:
+                semaphore = self._semaphores.setdefault(host, threading.BoundedSemaphore(self.max_per_host))
+        return semaphore
+
+    # === الخطافات ===
+
+    def add_hook(self, hook):
+        """hook(event) يُستدعى بعد كل طلب"""
+        self.hooks.append(hook)
+
+    def remove_hook(self, hook):
+        if hook in self.hooks:
+            self.hooks.remove(hook)
+
+    def _emit(self, event):
+        for hook in list(self.hooks):
+            try:
+                hook(event)
+            except Exception as e:
+                logger.warning(f'خطأ في خطاف عميل HTTP: {e}')
+
+    # === الطلبات ===
+
+    def request(self, method, url, retry_status=True, **kwargs):
+        """طلب عبر الجلسة المشتركة؛ نفس واجهة requests.request
+
+        retry_status=False يعيد ردود 502/503/504 للمستدعي دون إعادة محاولة.
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        host = urlsplit(url).netloc
+
+        semaphore = self._semaphore(host)
+        if not semaphore.acquire(timeout=sum(self.timeout)):
+            raise requests.ConnectionError(f'انتهت مهلة انتظار اتصال متاح بـ {host}')
+
+        started = time.perf_counter()
+        response = error = None
+        try:
+            response = self._session(retry_status).request(method, url, **kwargs)
+            return response
+        except requests.RequestException as e:
+            error = e
+            raise
+        finally:
+            semaphore.release()
+            if response is not None and not kwargs.get('stream'):
+                size = len(response.content)
+            elif response is not None:
+                size = int(response.headers.get('Content-Length') or 0)
+            else:
+                size = 0
+            self._emit({
+                'method': method.upper(),
+                'host': host,
+                'status': response.status_code if response is not None else None,
+                'elapsed': time.perf_counter() - started,
+                'bytes': size,
+                'error': error,
+            })
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def head(self, url, **kwargs):
+        kwargs.setdefault('allow_redirects', False)
+        return self.request('HEAD', url, **kwargs)
+
+
+# إنشاء instance للاستخدام
+http_client = HttpClient()
@@ -0,0 +1,103 @@
+# core/management/commands/benchmark_analyzer.py
+
+from django.core.management.base import BaseCommand
+import random
+import time
+
+from core.search import analyzer
+
+
+# نص عربي نموذجي لتوليد مدونة اختبار عند عدم توفر محتوى كافٍ
+SAMPLE_TEXT = (
+    'الحَمْدُ لِلَّهِ رَبِّ العَالَمِينَ وَالصَّلاةُ والسَّلامُ على أشرفِ الأنبياءِ والمرسلين، '
+    'أمّا بعدُ فهذه دروسٌ في الفقهِ والعقيدةِ والتفسيرِ يُلقيها الشيخُ في المسجدِ '
+    'كلَّ أسبوعٍ، وتتناولُ أحكامَ الطهارةِ والصلاةِ والزكاةِ والصيامِ والحجِّ '
+    'مع إجاباتٍ عن أسئلةِ المستمعين، الدرسُ ١٢ من السلسلةِ — Lesson 12 of the series.'
+)
+
+
+class Command(BaseCommand):
+    help = 'قياس سرعة محلل النصوص العربية (كلمة في الثانية)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--words',
+            type=int,
+            default=1000000,
+            help='عدد كلمات المدونة المولدة (الافتراضي مليون)'
+        )
+        parser.add_argument(
+            '--use-db',
+            action='store_true',
+            help='استخدام نصوص العناصر والمقالات من قاعدة البيانات'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=3,
+            help='عدد مرات التكرار'
+        )
+
+    def handle(self, *args, **options):
+        documents = self.load_corpus(options)
+        total_chars = sum(len(document) for document in documents)
+        self.stdout.write(f'المدونة: {len(documents)} وثيقة، {total_chars / 1e6:.1f} مليون حرف')
+
+        analyzer.stem.cache_clear()
+
+        for run in range(1, options['repeat'] + 1):
+            started = time.perf_counter()
+            tokens = 0
+            for document in documents:
+                tokens += len(analyzer.analyze_tokens(document))
+            elapsed = time.perf_counter() - started
+
+            self.stdout.write(
+                f'الدورة {run}: {tokens} كلمة في {elapsed:.2f} ث '
+                f'= {tokens / elapsed:,.0f} كلمة/ث ({total_chars / elapsed / 1e6:.1f} مليون حرف/ث)'
+            )
+
+        # مراحل التحليل منفصلة لمعرفة كلفة كل مرحلة
+        started = time.perf_counter()
+        for document in documents:
+            analyzer.normalize(document)
+        normalize_time = time.perf_counter() - started
+
+        started = time.perf_counter()
+        for document in documents:
+            analyzer.tokenize(document)
+        tokenize_time = time.perf_counter() - started
+
+        cache_info = analyzer.stem.cache_info()
+        self.stdout.write(
+            f'التطبيع: {normalize_time:.2f} ث، التطبيع + التقسيم: {tokenize_time:.2f} ث، '
+            f'ذاكرة التجذيع: {cache_info.hits} إصابة / {cache_info.misses} إخفاق'
+        )
+
+        sample = documents[0][:120]
+        self.stdout.write(f'مثال: {sample}')
+        self.stdout.write(self.style.SUCCESS(f'=> {analyzer.analyze(sample)}'))
+
+    def load_corpus(self, options):
+        if options['use_db']:
+            from content.models import PlaylistItem
+            from blog.models import Post
+
+            documents = list(PlaylistItem.objects.exclude(content_text='').values_list('content_text', flat=True))
+            documents += list(Post.objects.values_list('content', flat=True))
+            if documents:
+                return documents
+
+        # توليد مدونة بخلط كلمات النص النموذجي مع أرقام متغيرة لتنويع المفردات
+        rng = random.Random(42)
+        words = SAMPLE_TEXT.split()
+        documents = []
+        remaining = options['words']
+        while remaining > 0:
+            size = min(remaining, 500)
+            documents.append(' '.join(
+                rng.choice(words) if rng.random() < 0.9 else f'{rng.choice(words)}{rng.randint(1, 5000)}'
+                for _ in range(size)
+            ))
+            remaining -= size
+        return documents
@@ -0,0 +1,74 @@
+# core/management/commands/benchmark_http_client.py
+
+from concurrent.futures import ThreadPoolExecutor
+from django.core.management.base import BaseCommand
+import requests
+import statistics
+import time
+
+from content.utils.youtube_stub import YouTubeStubServer
+from core.http_client import http_client
+
+
+class Command(BaseCommand):
+    help = 'قياس طلبات requests.get المنفردة مقابل عميل HTTP المشترك على خادم محلي'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=500,
+            help='عدد الطلبات لكل حالة'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=8,
+            help='عدد الخيوط في الحالة المتزامنة'
+        )
+        parser.add_argument(
+            '--url',
+            help='رابط خارجي للقياس بدلاً من الخادم المحلي (يظهر أثر TLS)'
+        )
+
+    def handle(self, *args, **options):
+        count = options['requests']
+        http_client.stats.reset()
+
+        with YouTubeStubServer(latency=0) as stub:
+            url = options['url'] or f'{stub.base_url}/videos?id=abc,def&part=snippet'
+
+            def direct(_):
+                return self.timed(lambda: requests.get(url, timeout=http_client.timeout))
+
+            def pooled(_):
+                return self.timed(lambda: http_client.get(url))
+
+            self.stdout.write(f'{"الحالة":<24} {"طلب/ث":>10} {"الوسيط ms":>10} {"p95 ms":>8}')
+            for label, func, workers in (
+                ('requests.get', direct, 1),
+                ('http_client', pooled, 1),
+                (f'requests.get x{options["workers"]}', direct, options['workers']),
+                (f'http_client x{options["workers"]}', pooled, options['workers']),
+            ):
+                started = time.perf_counter()
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    timings = sorted(executor.map(func, range(count)))
+                elapsed = time.perf_counter() - started
+                self.stdout.write(
+                    f'{label:<24} {count / elapsed:>10,.0f} {statistics.median(timings):>10.2f} '
+                    f'{timings[int(len(timings) * 0.95)]:>8.2f}'
+                )
+
+        self.stdout.write('\nإحصائيات العميل المشترك:')
+        for host, data in http_client.stats.snapshot().items():
+            self.stdout.write(
+                f'  {host}: {data["requests"]} طلب، أخطاء {data["error_rate"]:.1%}، '
+                f'{data["bytes"]:,} بايت، الوسيط {data["p50_ms"]:.2f} ms، p95 {data["p95_ms"]:.2f} ms'
+            )
+
+    def timed(self, func):
+        started = time.perf_counter()
+        response = func()
+        response.raise_for_status()
+        return (time.perf_counter() - started) * 1000
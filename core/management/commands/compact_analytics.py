@@ -0,0 +1,25 @@
+# core/management/commands/compact_analytics.py
+
+from django.core.management.base import BaseCommand
+
+from core.analytics import EventStore
+
+
+class Command(BaseCommand):
+    help = 'ضغط ملفات أحداث التحليلات الخام إلى ملفات عمودية يومية'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--include-current',
+            action='store_true',
+            help='ضغط المقاطع الحالية أيضاً (عند إيقاف الخادم)'
+        )
+
+    def handle(self, *args, **options):
+        result = EventStore().compact(include_current=options['include_current'])
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"تم ضغط {result['events']} حدث من {result['files']} ملف"
+            )
+        )
@@ -0,0 +1,49 @@
+# core/management/commands/rebuild_autocomplete.py
+
+from django.core.management.base import BaseCommand
+import random
+import time
+
+from core.search.autocomplete import autocomplete
+
+
+class Command(BaseCommand):
+    help = 'إعادة بناء فهرس الإكمال التلقائي وقياس زمن الاستعلام'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--benchmark',
+            type=int,
+            default=0,
+            help='عدد استعلامات البادئات العشوائية لقياس زمن الاستجابة'
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        count = autocomplete.rebuild()
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            self.style.SUCCESS(f'تم بناء الفهرس ({count} مدخل) في {elapsed * 1000:.0f} ms')
+        )
+
+        queries = options['benchmark']
+        if not queries or not count:
+            return
+
+        labels = [entry[0] for entry in autocomplete._index.entries.values()]
+        prefixes = []
+        for _ in range(queries):
+            words = random.choice(labels).split() or ['a']
+            word = random.choice(words)
+            prefixes.append(word[:random.randint(1, max(1, len(word)))])
+
+        timings = []
+        for prefix in prefixes:
+            started = time.perf_counter()
+            autocomplete.search(prefix)
+            timings.append((time.perf_counter() - started) * 1000)
+
+        timings.sort()
+        p50 = timings[len(timings) // 2]
+        p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+        self.stdout.write(f'{queries} استعلام: p50={p50:.3f} ms, p99={p99:.3f} ms, max={timings[-1]:.3f} ms')
@@ -0,0 +1,22 @@
+# core/management/commands/rebuild_search_index.py
+
+from django.core.management.base import BaseCommand
+
+from core.search import search_index
+from core.search.backends import get_backend
+
+
+class Command(BaseCommand):
+    help = 'إعادة بناء فهرس البحث النصي الكامل لكل المحتوى المنشور'
+
+    def handle(self, *args, **options):
+        counts = search_index.rebuild()
+
+        for document_type, count in counts.items():
+            self.stdout.write(f'{document_type}: {count} وثيقة')
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'تم بناء الفهرس ({sum(counts.values())} وثيقة) باستخدام محرك {get_backend().name}'
+            )
+        )
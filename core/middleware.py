@@ -0,0 +1,37 @@
+# core/middleware.py
+
+from django.conf import settings
+
+from .activity import activity_tracker
+
+
+class ActivityTrackingMiddleware:
+    """تسجيل مشاهدات الصفحات في متتبع النشاط المباشر"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.ignored_prefixes = tuple(
+            prefix for prefix in (settings.STATIC_URL, settings.MEDIA_URL, '/favicon.ico')
+            if prefix
+        )
+
+    def __call__(self, request):
+        response = self.get_response(request)
+
+        if self.should_track(request, response):
+            try:
+                activity_tracker.record(request)
+            except Exception:
+                # التتبع لا يجب أن يعطل الاستجابة
+                pass
+
+        return response
+
+    def should_track(self, request, response):
+        return (
+            request.method == 'GET'
+            and response.status_code < 400
+            and not request.path.startswith(self.ignored_prefixes)
+            and request.headers.get('x-requested-with') != 'XMLHttpRequest'
+            and 'text/html' in response.get('Content-Type', '')
+        )
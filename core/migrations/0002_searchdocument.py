@@ -0,0 +1,32 @@
+# Generated by Django 5.0.6 on 2026-10-17 03:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('document_type', models.CharField(choices=[('playlist', 'قائمة تشغيل'), ('playlist_item', 'عنصر قائمة تشغيل'), ('blog_post', 'مقال')], max_length=20, verbose_name='نوع الوثيقة')),
+                ('object_id', models.PositiveBigIntegerField(verbose_name='معرف الكائن')),
+                ('title', models.CharField(max_length=200, verbose_name='العنوان')),
+                ('summary', models.TextField(blank=True, verbose_name='الملخص')),
+                ('date', models.DateTimeField(verbose_name='التاريخ')),
+                ('title_index', models.TextField(blank=True, verbose_name='نص العنوان المفهرس')),
+                ('body_index', models.TextField(blank=True, verbose_name='نص المحتوى المفهرس')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='تاريخ التحديث')),
+            ],
+            options={
+                'verbose_name': 'وثيقة بحث',
+                'verbose_name_plural': 'وثائق البحث',
+                'unique_together': {('document_type', 'object_id')},
+            },
+        ),
+    ]
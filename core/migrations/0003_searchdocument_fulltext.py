@@ -0,0 +1,104 @@
+# فهرس النص الكامل حسب قاعدة البيانات: FTS5 في SQLite و GIN/tsvector في PostgreSQL
+
+from django.db import migrations
+
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS core_searchdocument_fts USING fts5(
+        title_index, body_index,
+        content='core_searchdocument', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS core_searchdocument_fts_ai AFTER INSERT ON core_searchdocument BEGIN
+        INSERT INTO core_searchdocument_fts(rowid, title_index, body_index)
+        VALUES (new.id, new.title_index, new.body_index);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS core_searchdocument_fts_ad AFTER DELETE ON core_searchdocument BEGIN
+        INSERT INTO core_searchdocument_fts(core_searchdocument_fts, rowid, title_index, body_index)
+        VALUES ('delete', old.id, old.title_index, old.body_index);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS core_searchdocument_fts_au AFTER UPDATE ON core_searchdocument BEGIN
+        INSERT INTO core_searchdocument_fts(core_searchdocument_fts, rowid, title_index, body_index)
+        VALUES ('delete', old.id, old.title_index, old.body_index);
+        INSERT INTO core_searchdocument_fts(rowid, title_index, body_index)
+        VALUES (new.id, new.title_index, new.body_index);
+    END
+    """,
+    "INSERT INTO core_searchdocument_fts(core_searchdocument_fts) VALUES ('rebuild')",
+]
+
+SQLITE_BACKWARD = [
+    "DROP TRIGGER IF EXISTS core_searchdocument_fts_ai",
+    "DROP TRIGGER IF EXISTS core_searchdocument_fts_ad",
+    "DROP TRIGGER IF EXISTS core_searchdocument_fts_au",
+    "DROP TABLE IF EXISTS core_searchdocument_fts",
+]
+
+POSTGRES_FORWARD = [
+    """
+    CREATE INDEX IF NOT EXISTS core_searchdocument_tsv_idx ON core_searchdocument
+    USING GIN ((
+        setweight(to_tsvector('simple', title_index), 'A') ||
+        setweight(to_tsvector('simple', body_index), 'B')
+    ))
+    """,
+]
+
+POSTGRES_BACKWARD = [
+    "DROP INDEX IF EXISTS core_searchdocument_tsv_idx",
+]
+
+
+def sqlite_has_fts5(cursor):
+    try:
+        cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+        return bool(cursor.fetchone()[0])
+    except Exception:
+        return False
+
+
+def create_fulltext_index(apps, schema_editor):
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            if not sqlite_has_fts5(cursor):
+                # البحث يعمل بالمطابقة البسيطة عند غياب FTS5
+                return
+            statements = SQLITE_FORWARD
+        elif connection.vendor == 'postgresql':
+            statements = POSTGRES_FORWARD
+        else:
+            return
+
+        for statement in statements:
+            cursor.execute(statement)
+
+
+def drop_fulltext_index(apps, schema_editor):
+    connection = schema_editor.connection
+    statements = {
+        'sqlite': SQLITE_BACKWARD,
+        'postgresql': POSTGRES_BACKWARD,
+    }.get(connection.vendor, [])
+
+    with connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_searchdocument'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fulltext_index, drop_fulltext_index),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.0.6 on 2026-10-17 03:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+from importlib import import_module
+
+# إضافة عمود في SQLite تعيد إنشاء الجدول فتُحذف مشغلات FTS5، لذا يُعاد إنشاؤها
+fulltext = import_module('core.migrations.0003_searchdocument_fulltext')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_searchdocument_fulltext'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='searchdocument',
+            name='fuzzy_terms',
+            field=models.TextField(blank=True, verbose_name='كلمات البحث التقريبي'),
+        ),
+        migrations.CreateModel(
+            name='SearchTrigram',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('trigram', models.CharField(max_length=3, verbose_name='المقطع الثلاثي')),
+                ('document', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='trigrams', to='core.searchdocument', verbose_name='الوثيقة')),
+            ],
+            options={
+                'verbose_name': 'مقطع ثلاثي',
+                'verbose_name_plural': 'المقاطع الثلاثية',
+                'unique_together': {('trigram', 'document')},
+            },
+        ),
+        migrations.RunPython(fulltext.create_fulltext_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.6 on 2026-10-17 03:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_searchtrigram'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='published_playlists_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='عدد القوائم المنشورة'),
+        ),
+    ]
@@ -4,8 +4,10 @@
 
 from django.db import models
 from django.utils.translation import gettext_lazy as _
+from django.core.cache import cache
 from django.core.validators import URLValidator
 from django.contrib.auth.models import User
+import copy
 
 class SiteSettings(models.Model):
     """إعدادات الموقع العامة"""
@@ -54,12 +56,53 @@ class SiteSettings(models.Model):
         verbose_name = _('إعدادات الموقع')
         verbose_name_plural = _('إعدادات الموقع')
     
+    VERSION_CACHE_KEY = 'site-settings:version'
+    
+    # (الإصدار، الكائن) محفوظة في ذاكرة العملية
+    _local_cache = (None, None)
+    
     def __str__(self):
         return self.site_name
     
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # رفع الإصدار يجعل كل العمليات تعيد التحميل في الطلب التالي
+        SiteSettings.bump_version()
+    
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        SiteSettings.bump_version()
+        return result
+    
+    @classmethod
+    def bump_version(cls):
+        try:
+            cache.incr(cls.VERSION_CACHE_KEY)
+        except ValueError:
+            cache.add(cls.VERSION_CACHE_KEY, 1, timeout=None)
+        cls._local_cache = (None, None)
+    
     @classmethod
     def get_settings(cls):
-        """الحصول على إعدادات الموقع (إنشاء واحدة جديدة إذا لم تكن موجودة)"""
+        """الحصول على إعدادات الموقع من ذاكرة العملية
+
+        يُقرأ من قاعدة البيانات فقط عندما يتغير الإصدار في الذاكرة المشتركة،
+        وتُعاد نسخة حتى لا يعدّل المستدعي الكائن المشترك.
+        """
+        version = cache.get(cls.VERSION_CACHE_KEY)
+        if version is None:
+            cache.add(cls.VERSION_CACHE_KEY, 0, timeout=None)
+            version = cache.get(cls.VERSION_CACHE_KEY, 0)
+        
+        cached_version, settings = cls._local_cache
+        if settings is None or cached_version != version:
+            settings = cls.load_settings()
+            cls._local_cache = (version, settings)
+        return copy.copy(settings)
+    
+    @classmethod
+    def load_settings(cls):
+        """قراءة الإعدادات من قاعدة البيانات (إنشاء واحدة جديدة إذا لم تكن موجودة)"""
         settings, created = cls.objects.get_or_create(
             pk=1,
             defaults={
@@ -87,6 +130,9 @@ class Category(models.Model):
     order = models.PositiveIntegerField(_('الترتيب'), default=0)
     is_active = models.BooleanField(_('مفعل'), default=True)
     
+    # عدد قوائم التشغيل المنشورة (محسوب مسبقاً)
+    published_playlists_count = models.PositiveIntegerField(_('عدد القوائم المنشورة'), default=0, editable=False)
+    
     created_at = models.DateTimeField(_('تاريخ الإنشاء'), auto_now_add=True)
     updated_at = models.DateTimeField(_('تاريخ التحديث'), auto_now=True)
     
@@ -183,6 +229,60 @@ class Advertisement(models.Model):
         return f'{self.title} - {self.get_placement_display()}'
 
 
+class SearchDocument(models.Model):
+    """وثيقة فهرس البحث النصي الكامل (للمحتوى المنشور فقط)"""
+    DOCUMENT_TYPE_CHOICES = [
+        ('playlist', _('قائمة تشغيل')),
+        ('playlist_item', _('عنصر قائمة تشغيل')),
+        ('blog_post', _('مقال')),
+    ]
+    
+    document_type = models.CharField(_('نوع الوثيقة'), max_length=20, choices=DOCUMENT_TYPE_CHOICES)
+    object_id = models.PositiveBigIntegerField(_('معرف الكائن'))
+    
+    # بيانات العرض في نتائج البحث
+    title = models.CharField(_('العنوان'), max_length=200)
+    summary = models.TextField(_('الملخص'), blank=True)
+    date = models.DateTimeField(_('التاريخ'))
+    
+    # النص المُحلل الذي يُبنى منه الفهرس
+    title_index = models.TextField(_('نص العنوان المفهرس'), blank=True)
+    body_index = models.TextField(_('نص المحتوى المفهرس'), blank=True)
+    
+    # كلمات العنوان والعلامات بعد التطبيع وبدون تجذيع (للبحث التقريبي)
+    fuzzy_terms = models.TextField(_('كلمات البحث التقريبي'), blank=True)
+    
+    updated_at = models.DateTimeField(_('تاريخ التحديث'), auto_now=True)
+    
+    class Meta:
+        verbose_name = _('وثيقة بحث')
+        verbose_name_plural = _('وثائق البحث')
+        unique_together = ['document_type', 'object_id']
+    
+    def __str__(self):
+        return f'{self.get_document_type_display()}: {self.title}'
+
+
+class SearchTrigram(models.Model):
+    """فهرس مقلوب للمقاطع الثلاثية في كلمات العنوان والعلامات
+
+    يولد المرشحين للبحث التقريبي دون المرور على كل الوثائق.
+    """
+    trigram = models.CharField(_('المقطع الثلاثي'), max_length=3)
+    document = models.ForeignKey(
+        SearchDocument, on_delete=models.CASCADE,
+        related_name='trigrams', verbose_name=_('الوثيقة')
+    )
+    
+    class Meta:
+        verbose_name = _('مقطع ثلاثي')
+        verbose_name_plural = _('المقاطع الثلاثية')
+        unique_together = ['trigram', 'document']
+    
+    def __str__(self):
+        return self.trigram
+
+
 # إشارات Django لإنشاء إعدادات افتراضية
 from django.db.models.signals import post_migrate
 from django.dispatch import receiver
@@ -0,0 +1,164 @@
+# core/page_cache.py
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+from django.utils import translation
+from functools import wraps
+import hashlib
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+# رمز CSRF يختلف لكل زائر فيُستبدل بعلامة قبل التخزين ويُعاد توليده عند العرض
+CSRF_INPUT_RE = re.compile(r'(name="csrfmiddlewaretoken" value=")[^"]*(")')
+CSRF_PLACEHOLDER = '__PAGE_CACHE_CSRF__'
+
+
+class PageCache:
+    """تخزين الصفحات الكاملة للزوار غير المسجلين مع مفاتيح بديلة للإبطال
+
+    كل صفحة تُوسم بالمفاتيح التي تعتمد عليها (playlist:ID، item:ID،
+    category:ID، post:ID، nav ...). لكل مفتاح رقم جيل في الذاكرة المؤقتة
+    يُحفظ مع الصفحة، والإبطال يرفع جيل المفتاح فقط فتصبح الصفحات
+    المعتمدة عليه قديمة دون المساس بغيرها.
+    """
+
+    KEY_PREFIX = 'pagecache'
+
+    def __init__(self):
+        self.timeout = settings.PAGE_CACHE_TIMEOUT
+
+    def _page_key(self, request):
+        url = request.get_full_path()
+        language = translation.get_language() or ''
+        digest = hashlib.md5(f'{language}:{url}'.encode('utf-8')).hexdigest()
+        return f'{self.KEY_PREFIX}:page:{digest}'
+
+    def _generation_key(self, surrogate_key):
+        return f'{self.KEY_PREFIX}:gen:{surrogate_key}'
+
+    # === الوسم والإبطال ===
+
+    def add_keys(self, request, *keys):
+        """تسجيل مفاتيح بديلة تعتمد عليها الصفحة الجاري عرضها"""
+        surrogate_keys = getattr(request, '_surrogate_keys', None)
+        if surrogate_keys is not None:
+            surrogate_keys.update(keys)
+
+    def purge(self, *keys):
+        """إبطال كل الصفحات الموسومة بأي من المفاتيح"""
+        for key in set(keys):
+            generation_key = self._generation_key(key)
+            try:
+                cache.incr(generation_key)
+            except ValueError:
+                cache.add(generation_key, 1, timeout=None)
+
+    def generations(self, keys):
+        """أجيال المفاتيح الحالية (تُنشأ المفقودة بالجيل 1)"""
+        generation_keys = {self._generation_key(key): key for key in keys}
+        values = cache.get_many(generation_keys)
+        missing = [k for k in generation_keys if k not in values]
+        for generation_key in missing:
+            cache.add(generation_key, 1, timeout=None)
+        if missing:
+            values.update(cache.get_many(missing))
+        return {generation_keys[k]: v for k, v in values.items()}
+
+    # === القراءة والكتابة ===
+
+    def is_cacheable_request(self, request):
+        return (
+            request.method in ('GET', 'HEAD')
+            and not request.user.is_authenticated
+            and 'messages' not in request.COOKIES
+        )
+
+    def get(self, request):
+        entry = cache.get(self._page_key(request))
+        if entry is None:
+            return None
+
+        generation_keys = [self._generation_key(key) for key in entry['generations']]
+        current = cache.get_many(generation_keys)
+        for key, generation in entry['generations'].items():
+            if current.get(self._generation_key(key)) != generation:
+                return None
+
+        content = entry['content']
+        if CSRF_PLACEHOLDER in content:
+            content = content.replace(CSRF_PLACEHOLDER, get_token(request))
+
+        response = HttpResponse(content, content_type=entry['content_type'])
+        response['X-Page-Cache'] = 'HIT'
+
+        if entry['ads']:
+            from .ads import ad_resolver
+            ad_resolver.record_impression_ids(entry['ads'])
+        return response
+
+    def set(self, request, response):
+        keys = getattr(request, '_surrogate_keys', set()) | {'nav'}
+        content = CSRF_INPUT_RE.sub(
+            rf'\g<1>{CSRF_PLACEHOLDER}\g<2>',
+            response.content.decode(response.charset)
+        )
+        timeout = self.timeout
+        if 'ads' in keys:
+            # الصفحة تنتهي عندما قد تتغير مجموعة الإعلانات النشطة
+            from .ads import ad_resolver
+            timeout = min(timeout, ad_resolver.seconds_until_change())
+
+        cache.set(self._page_key(request), {
+            'content': content,
+            'content_type': response['Content-Type'],
+            'generations': self.generations(keys),
+            'ads': getattr(request, '_page_cache_ads', []),
+        }, timeout)
+
+    def is_cacheable_response(self, response):
+        return (
+            response.status_code == 200
+            and not response.streaming
+            and not response.cookies
+            and 'no-cache' not in response.get('Cache-Control', '')
+        )
+
+
+# إنشاء instance للاستخدام
+page_cache = PageCache()
+
+
+def cache_anonymous_page(view_func):
+    """تخزين الصفحة الناتجة للزوار غير المسجلين (يُستخدم مع method_decorator على dispatch)"""
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        if not page_cache.is_cacheable_request(request):
+            return view_func(request, *args, **kwargs)
+
+        try:
+            response = page_cache.get(request)
+        except Exception as e:
+            logger.warning(f'تعذرت قراءة الصفحة المخزنة: {e}')
+            response = None
+        if response is not None:
+            return response
+
+        request._surrogate_keys = set()
+        request._page_cache_ads = []
+        response = view_func(request, *args, **kwargs)
+        if hasattr(response, 'render') and callable(response.render):
+            response = response.render()
+
+        if page_cache.is_cacheable_response(response):
+            try:
+                page_cache.set(request, response)
+                response['X-Page-Cache'] = 'MISS'
+            except Exception as e:
+                logger.warning(f'تعذر تخزين الصفحة: {e}')
+        return response
+
+    return wrapper
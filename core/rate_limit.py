@@ -0,0 +1,115 @@
+# core/rate_limit.py
+
+from django.conf import settings
+from django.core.cache import cache
+import logging
+import math
+import random
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimiter:
+    """حدود معدل لكل مزود مشتركة بين العمليات عبر الذاكرة المؤقتة
+
+    لكل مزود دلو رموز يُملأ في كل نافذة زمنية: النافذة ثانية واحدة (أو
+    1/المعدل للمعدلات الأقل من طلب في الثانية) وتمنح round(المعدل × طول
+    النافذة) رمزاً. الرمز يُؤخذ بـ cache.incr على عداد النافذة، وهو ذري في
+    Redis فيتشارك كل عمال Celery الحد نفسه (مع الذاكرة المحلية يكون الحد
+    لكل عملية).
+
+    المعدل نفسه متكيف (AIMD): يُنصف عند 429 أو 5xx مع إيقاف المزود حتى
+    Retry-After أو مهلة تراجع، ويزداد بمقدار ثابت مرة في كل نافذة ناجحة
+    حتى الحد المضبوط، فيبقى الإرسال قريباً من المعدل المسموح دون تجاوزه.
+    """
+
+    KEY_PREFIX = 'ratelimit'
+    MIN_RATE = 0.1  # طلب كل عشر ثوانٍ
+    DECREASE_FACTOR = 0.5
+    INCREASE_STEP = 0.1  # نسبة من الحد المضبوط تُضاف في كل نافذة ناجحة
+    DEFAULT_BACKOFF = 5  # ثواني الإيقاف عند غياب Retry-After
+    MAX_BACKOFF = 300
+
+    def __init__(self):
+        self.limits = getattr(settings, 'MEDIA_RATE_LIMITS', {})
+
+    def _key(self, provider, name):
+        return f'{self.KEY_PREFIX}:{provider}:{name}'
+
+    def max_rate(self, provider):
+        return float(self.limits.get(provider, self.limits.get('default', 5)))
+
+    def current_rate(self, provider):
+        """المعدل الحالي بعد التكيف (طلب/ثانية)"""
+        rate = cache.get(self._key(provider, 'rate'))
+        return self.max_rate(provider) if rate is None else rate
+
+    def _window(self, rate, now):
+        """(رقم النافذة، طولها، رموزها) للمعدل الحالي"""
+        length = max(1.0, 1.0 / rate)
+        return int(now // length), length, max(1, round(rate * length))
+
+    # === أخذ الرموز ===
+
+    def acquire(self, provider, timeout=None):
+        """انتظار رمز للمزود؛ يعيد False إذا انتهت المهلة قبل توفره"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            now = time.time()
+            paused_until = cache.get(self._key(provider, 'paused'))
+            if paused_until and paused_until > now:
+                wait = paused_until - now
+            else:
+                window, length, tokens = self._window(self.current_rate(provider), now)
+                window_key = self._key(provider, f'window:{length:g}:{window}')
+                cache.add(window_key, 0, timeout=math.ceil(length) + 1)
+                try:
+                    used = cache.incr(window_key)
+                except ValueError:
+                    # انتهت صلاحية العداد بين add وincr
+                    continue
+                if used <= tokens:
+                    return True
+                wait = (window + 1) * length - now
+
+            # توزيع عشوائي صغير حتى لا تستيقظ كل الخيوط معاً
+            wait += random.uniform(0, 0.05)
+            if deadline is not None and time.monotonic() + wait > deadline:
+                return False
+            time.sleep(wait)
+
+    # === التكيف ===
+
+    def on_success(self, provider):
+        """زيادة جمعية مرة واحدة لكل نافذة عند نجاح الطلبات"""
+        max_rate = self.max_rate(provider)
+        rate = self.current_rate(provider)
+        if rate >= max_rate:
+            return
+        window, length, _ = self._window(rate, time.time())
+        if cache.add(self._key(provider, f'grow:{window}'), 1, timeout=math.ceil(length) + 1):
+            cache.set(self._key(provider, 'rate'), min(max_rate, rate + max_rate * self.INCREASE_STEP), None)
+
+    def on_throttle(self, provider, retry_after=None):
+        """تخفيض ضربي للمعدل وإيقاف المزود بعد 429 أو 5xx
+
+        الردود المرفوضة من الدفعة المتزامنة نفسها حدث ازدحام واحد، فيُخفض
+        المعدل مرة واحدة لكل فترة إيقاف.
+        """
+        pause = self.DEFAULT_BACKOFF if retry_after is None else retry_after
+        pause = min(self.MAX_BACKOFF, max(0, pause))
+        if pause:
+            cache.set(self._key(provider, 'paused'), time.time() + pause, math.ceil(pause) + 1)
+
+        if cache.add(self._key(provider, 'shrink'), 1, timeout=max(1, math.ceil(pause))):
+            rate = max(self.MIN_RATE, self.current_rate(provider) * self.DECREASE_FACTOR)
+            cache.set(self._key(provider, 'rate'), rate, None)
+            logger.warning(f'تخفيض معدل {provider} إلى {rate:.2f} طلب/ث وإيقافه {pause:g} ث')
+
+    def reset(self, provider):
+        cache.delete_many([self._key(provider, name) for name in ('rate', 'paused', 'shrink')])
+
+
+# إنشاء instance للاستخدام
+rate_limiter = RateLimiter()
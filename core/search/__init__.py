@@ -0,0 +1,4 @@
+# core/search/__init__.py
+
+from .index import search_index
+from .results import SearchResults
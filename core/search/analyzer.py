@@ -0,0 +1,90 @@
+# core/search/analyzer.py
+
+from functools import lru_cache
+import re
+
+# === جداول التحويل المترجمة مسبقاً (str.translate يعمل بسرعة C) ===
+
+# الحركات وعلامات القرآن والتطويل تُحذف
+ARABIC_DIACRITICS = (
+    [chr(c) for c in range(0x064B, 0x0653)]      # الفتحتان .. السكون
+    + [chr(c) for c in range(0x0610, 0x061B)]    # علامات قرآنية
+    + [chr(c) for c in range(0x06D6, 0x06EE)]    # علامات الوقف القرآنية
+    + ['ٰ', 'ـ']                       # الألف الخنجرية والتطويل
+)
+
+ARABIC_NORMALIZATION = {
+    'أ': 'ا', 'إ': 'ا', 'آ': 'ا', 'ٱ': 'ا',     # صور الهمزة على الألف
+    'ؤ': 'و', 'ئ': 'ي',
+    'ة': 'ه',                                    # التاء المربوطة
+    'ى': 'ي',                                    # الألف المقصورة
+    'ک': 'ك', 'ی': 'ي',                          # أشكال فارسية شائعة
+}
+
+# الأرقام العربية الهندية والفارسية -> أرقام لاتينية
+DIGITS = {chr(0x0660 + i): str(i) for i in range(10)}
+DIGITS.update({chr(0x06F0 + i): str(i) for i in range(10)})
+
+NORMALIZE_TABLE = str.maketrans({
+    **dict.fromkeys(ARABIC_DIACRITICS, None),
+    **ARABIC_NORMALIZATION,
+    **DIGITS,
+})
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+ARABIC_RE = re.compile(r'[ء-ي]')
+
+# السوابق واللواحق الخفيفة (بعد التطبيع، لذا ة أصبحت ه)
+PREFIXES = ('وال', 'بال', 'كال', 'فال', 'لل', 'ال')
+SUFFIXES = ('ها', 'ان', 'ات', 'ون', 'ين', 'يه', 'ه', 'ي')
+MIN_PREFIX_STEM_LENGTH = 2
+MIN_SUFFIX_STEM_LENGTH = 3
+
+
+def normalize(text):
+    """إزالة التشكيل والتطويل وتوحيد الهمزات والتاء المربوطة والألف المقصورة والأرقام"""
+    return (text or '').lower().translate(NORMALIZE_TABLE)
+
+
+@lru_cache(maxsize=100000)
+def stem(token):
+    """تجذيع خفيف للكلمات العربية (حذف السوابق واللواحق الشائعة)
+
+    الكلمات غير العربية تُعاد كما هي. النتيجة مخزنة مؤقتاً لأن المفردات
+    المتكررة تشكل معظم أي نص.
+    """
+    if not ARABIC_RE.match(token):
+        return token
+
+    if len(token) > 3 and token[0] == 'و':
+        token = token[1:]
+
+    for prefix in PREFIXES:
+        if token.startswith(prefix) and len(token) - len(prefix) >= MIN_PREFIX_STEM_LENGTH:
+            token = token[len(prefix):]
+            break
+
+    for suffix in SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= MIN_SUFFIX_STEM_LENGTH:
+            token = token[:-len(suffix)]
+
+    return token
+
+
+def tokenize(text):
+    """تطبيع النص وتقسيمه إلى كلمات (عربية ولاتينية وأرقام)"""
+    return TOKEN_RE.findall(normalize(text))
+
+
+def analyze_tokens(text):
+    return [stem(token) for token in tokenize(text)]
+
+
+def analyze(text):
+    """تحويل النص إلى الصيغة المخزنة في الفهرس"""
+    return ' '.join(analyze_tokens(text))
+
+
+def analyze_query(query):
+    """كلمات الاستعلام بعد التحليل بنفس طريقة الفهرسة (بدون تكرار)"""
+    return list(dict.fromkeys(analyze_tokens(query)))
@@ -0,0 +1,340 @@
+# core/search/autocomplete.py
+
+from bisect import bisect_left
+from django.core.cache import cache
+from django.db import connection
+import heapq
+import logging
+import pickle
+import threading
+import time
+import zlib
+
+from .analyzer import tokenize
+
+logger = logging.getLogger(__name__)
+
+
+class PrefixIndex:
+    """فهرس بادئات في الذاكرة: مصفوفة مرتبة من المفاتيح مع bisect
+
+    لكل عنوان تُخزن مفاتيح تبدأ من كل كلمة فيه، فتطابق البادئة
+    بداية أي كلمة في العنوان. النتائج مرتبة حسب الوزن (المشاهدات).
+    """
+
+    MAX_KEY_LENGTH = 60
+    MAX_CACHED_PREFIXES = 5000  # نتائج البادئات المتكررة تُحفظ حتى أول تعديل
+
+    def __init__(self, entries=None):
+        # entry_id -> (label, url, type, weight)
+        self.entries = dict(entries or {})
+        self._keys = []
+        self._ids = []
+        self._heads = {}
+
+        pairs = sorted(
+            (key, entry_id)
+            for entry_id, entry in self.entries.items()
+            for key in self.keys_for(entry[0])
+        )
+        self._keys = [key for key, _ in pairs]
+        self._ids = [entry_id for _, entry_id in pairs]
+
+    @classmethod
+    def keys_for(cls, label):
+        tokens = tokenize(label)
+        keys = set()
+        for i, token in enumerate(tokens):
+            key = ' '.join(tokens[i:])[:cls.MAX_KEY_LENGTH]
+            keys.add(key)
+            # "الحديث" تطابق أيضاً عند كتابة "حديث"
+            if token.startswith('ال') and len(token) > 3:
+                keys.add(key[2:])
+        return keys
+
+    @staticmethod
+    def normalize_query(query):
+        return ' '.join(tokenize(query))
+
+    def upsert(self, entry_id, entry):
+        self.remove(entry_id)
+        self.entries[entry_id] = entry
+        for key in self.keys_for(entry[0]):
+            index = bisect_left(self._keys, key)
+            self._keys.insert(index, key)
+            self._ids.insert(index, entry_id)
+        self._heads.clear()
+
+    def remove(self, entry_id):
+        entry = self.entries.pop(entry_id, None)
+        if entry is None:
+            return
+        for key in self.keys_for(entry[0]):
+            index = bisect_left(self._keys, key)
+            while index < len(self._keys) and self._keys[index] == key:
+                if self._ids[index] == entry_id:
+                    del self._keys[index]
+                    del self._ids[index]
+                    break
+                index += 1
+        self._heads.clear()
+
+    def search(self, query, limit=8):
+        prefix = self.normalize_query(query)
+        if not prefix:
+            return []
+
+        cache_key = (prefix, limit)
+        results = self._heads.get(cache_key)
+        if results is not None:
+            return results
+
+        # كل المفاتيح التي تبدأ بالبادئة تقع في نطاق متصل من المصفوفة المرتبة
+        start = bisect_left(self._keys, prefix)
+        end = bisect_left(self._keys, prefix + '\uffff', start)
+        entries = self.entries
+        top = heapq.nlargest(limit, set(self._ids[start:end]), key=lambda entry_id: entries[entry_id][3])
+        results = [entries[entry_id] for entry_id in top]
+
+        if len(self._heads) >= self.MAX_CACHED_PREFIXES:
+            self._heads.clear()
+        self._heads[cache_key] = results
+        return results
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class Autocomplete:
+    """خدمة الإكمال التلقائي المشتركة بين العمليات
+
+    لقطة مضغوطة من المدخلات تُخزن في الذاكرة المؤقتة مع رقم إصدار،
+    والتعديلات الصغيرة تُسجل في سجل تغييرات يطبقه كل عامل على نسخته
+    المحلية دون إعادة بناء كاملة.
+
+    إذا غابت اللقطة (ذاكرة باردة أو إخلاء أو نشر جديد) لا يُعاد البناء داخل
+    طلب المستخدم: عامل واحد يحصل على قفل ويبني اللقطة في الخلفية، وحتى
+    اكتمالها تُستخدم النسخة المحلية القديمة أو لا تُعرض اقتراحات.
+    """
+
+    KEY_PREFIX = 'autocomplete'
+    SYNC_INTERVAL = 2  # ثواني بين فحوصات الإصدار في نفس العملية
+    LOG_LIMIT = 200    # عدد التغييرات قبل دمجها في لقطة جديدة
+    REBUILD_LOCK_TIMEOUT = 5 * 60  # أقصى مدة لقفل إعادة البناء إذا توقف العامل
+
+    def __init__(self):
+        self._index = None
+        self._snapshot_version = None
+        self._applied_version = 0
+        self._last_check = 0
+        self._lock = threading.Lock()
+
+    @property
+    def _snapshot_key(self):
+        return f'{self.KEY_PREFIX}:snapshot'
+
+    @property
+    def _log_key(self):
+        return f'{self.KEY_PREFIX}:log'
+
+    @property
+    def _snapshot_version_key(self):
+        return f'{self.KEY_PREFIX}:snapshot_version'
+
+    @property
+    def _version_key(self):
+        return f'{self.KEY_PREFIX}:version'
+
+    @property
+    def _rebuild_lock_key(self):
+        return f'{self.KEY_PREFIX}:rebuild-lock'
+
+    # === بناء المدخلات ===
+
+    def entry_for(self, instance):
+        """(معرف المدخل، المدخل) أو (معرف المدخل، None) إذا لم يعد قابلاً للعرض"""
+        from content.models import Playlist, PlaylistItem, Tag
+        from blog.models import Post
+
+        if isinstance(instance, Playlist):
+            entry_id = f'playlist:{instance.pk}'
+            visible = instance.is_published
+            entry_type, weight = 'playlist', instance.views_count
+        elif isinstance(instance, PlaylistItem):
+            entry_id = f'playlist_item:{instance.pk}'
+            visible = instance.is_published and instance.playlist.is_published
+            entry_type, weight = 'playlist_item', instance.views_count
+        elif isinstance(instance, Post):
+            entry_id = f'blog_post:{instance.pk}'
+            visible = instance.is_published
+            entry_type, weight = 'blog_post', instance.views_count
+        elif isinstance(instance, Tag):
+            entry_id = f'tag:{instance.pk}'
+            visible = instance.usage_count > 0
+            entry_type, weight = 'tag', instance.usage_count
+        else:
+            return None, None
+
+        if not visible:
+            return entry_id, None
+        return entry_id, (instance.name if entry_type == 'tag' else instance.title,
+                          self.url_for(entry_type, instance), entry_type, weight or 0)
+
+    def url_for(self, entry_type, instance):
+        if entry_type == 'tag':
+            from django.urls import reverse
+            from django.utils.http import urlencode
+            return f"{reverse('core:search')}?{urlencode({'q': instance.name})}"
+        return instance.get_absolute_url()
+
+    def build_entries(self):
+        from content.models import Playlist, PlaylistItem, Tag
+        from blog.models import Post
+
+        entries = {}
+        querysets = [
+            Playlist.objects.filter(is_published=True).only('id', 'title', 'slug', 'is_published', 'views_count'),
+            PlaylistItem.objects.filter(is_published=True, playlist__is_published=True).select_related(
+                'playlist'
+            ).only('id', 'title', 'slug', 'is_published', 'views_count', 'playlist__slug', 'playlist__is_published'),
+            Post.objects.filter(is_published=True).only('id', 'title', 'slug', 'is_published', 'views_count'),
+            Tag.objects.filter(usage_count__gt=0).only('id', 'name', 'usage_count'),
+        ]
+        for queryset in querysets:
+            for instance in queryset.iterator(chunk_size=2000):
+                entry_id, entry = self.entry_for(instance)
+                if entry:
+                    entries[entry_id] = entry
+        return entries
+
+    # === اللقطة المشتركة ===
+
+    def rebuild(self):
+        """بناء لقطة كاملة من قاعدة البيانات ونشرها لكل العمليات"""
+        entries = self.build_entries()
+        version = self._next_version()
+        self._publish(version, entries)
+        with self._lock:
+            self._index = PrefixIndex(entries)
+            self._snapshot_version = self._applied_version = version
+        return len(entries)
+
+    def _rebuild_in_background(self):
+        """إعادة بناء واحدة في الخلفية عبر كل العمليات"""
+        if not cache.add(self._rebuild_lock_key, 1, self.REBUILD_LOCK_TIMEOUT):
+            return
+
+        def task():
+            try:
+                self.rebuild()
+            except Exception as e:
+                logger.error(f'خطأ في إعادة بناء فهرس الإكمال التلقائي: {e}')
+            finally:
+                cache.delete(self._rebuild_lock_key)
+                # الخيط خارج دورة الطلب فيُغلق اتصال قاعدة البيانات هنا
+                connection.close()
+
+        threading.Thread(target=task, name='autocomplete-rebuild', daemon=True).start()
+
+    def _publish(self, version, entries):
+        data = zlib.compress(pickle.dumps(entries, protocol=pickle.HIGHEST_PROTOCOL))
+        cache.set_many({
+            self._snapshot_key: data,
+            self._snapshot_version_key: version,
+            self._log_key: [],
+        }, timeout=None)
+
+    def _next_version(self):
+        try:
+            return cache.incr(self._version_key)
+        except ValueError:
+            cache.add(self._version_key, 0, timeout=None)
+            return cache.incr(self._version_key)
+
+    def update(self, instance):
+        """تحديث مدخل واحد وتسجيله في سجل التغييرات المشترك"""
+        entry_id, entry = self.entry_for(instance)
+        if entry_id is not None:
+            self._record(entry_id, entry)
+
+    def remove(self, instance):
+        entry_id, _ = self.entry_for(instance)
+        if entry_id is not None:
+            self._record(entry_id, None)
+
+    def _record(self, entry_id, entry):
+        # التعديلات المتزامنة النادرة قد تفقد تغييراً، وإعادة البناء الدورية تصححه
+        try:
+            log = cache.get(self._log_key)
+            if log is None:
+                # لا توجد لقطة بعد: ستُبنى كاملة في الخلفية عند أول طلب
+                return
+            log.append((self._next_version(), entry_id, entry))
+
+            if len(log) > self.LOG_LIMIT:
+                self._compact(log)
+            else:
+                cache.set(self._log_key, log, timeout=None)
+        except Exception as e:
+            logger.warning(f'تعذر تحديث فهرس الإكمال التلقائي: {e}')
+
+    def _compact(self, log):
+        """دمج سجل التغييرات في لقطة جديدة"""
+        data = cache.get(self._snapshot_key)
+        if data is None:
+            return
+        entries = pickle.loads(zlib.decompress(data))
+        for _, entry_id, entry in log:
+            if entry is None:
+                entries.pop(entry_id, None)
+            else:
+                entries[entry_id] = entry
+        self._publish(log[-1][0], entries)
+
+    def _sync(self):
+        """تحميل اللقطة أو تطبيق التغييرات الجديدة على النسخة المحلية"""
+        now = time.monotonic()
+        if self._index is not None and now - self._last_check < self.SYNC_INTERVAL:
+            return
+        self._last_check = now
+
+        values = cache.get_many([self._version_key, self._snapshot_version_key])
+        if self._index is not None and values.get(self._version_key) == self._applied_version:
+            return
+
+        snapshot_version = values.get(self._snapshot_version_key)
+        if snapshot_version is None:
+            self._rebuild_in_background()
+            return
+
+        with self._lock:
+            if snapshot_version != self._snapshot_version:
+                data = cache.get(self._snapshot_key)
+                if data is None:
+                    self._snapshot_version = None
+                    self._rebuild_in_background()
+                    return
+                self._index = PrefixIndex(pickle.loads(zlib.decompress(data)))
+                self._snapshot_version = self._applied_version = snapshot_version
+
+            for version, entry_id, entry in cache.get(self._log_key) or []:
+                if version <= self._applied_version:
+                    continue
+                if entry is None:
+                    self._index.remove(entry_id)
+                else:
+                    self._index.upsert(entry_id, entry)
+                self._applied_version = version
+
+    def search(self, query, limit=8):
+        self._sync()
+        if self._index is None:
+            return []
+        return [
+            {'label': label, 'url': url, 'type': entry_type}
+            for label, url, entry_type, _ in self._index.search(query, limit)
+        ]
+
+
+# إنشاء instance للاستخدام
+autocomplete = Autocomplete()
@@ -0,0 +1,165 @@
+# core/search/backends.py
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Case, IntegerField, Q, Value, When
+
+from core.models import SearchDocument
+
+
+class BaseSearchBackend:
+    """واجهة محركات البحث: عدد النتائج وصفحة من معرفات الوثائق مرتبة بالصلة"""
+
+    name = 'base'
+
+    def count(self, terms, document_type=None):
+        raise NotImplementedError
+
+    def search(self, terms, offset, limit, document_type=None):
+        """قائمة معرفات SearchDocument مرتبة حسب الصلة"""
+        raise NotImplementedError
+
+
+class SimpleSearchBackend(BaseSearchBackend):
+    """مطابقة جزئية على جدول الوثائق (لقواعد بيانات بدون بحث نصي كامل)"""
+
+    name = 'simple'
+
+    def _queryset(self, terms, document_type):
+        queryset = SearchDocument.objects.all()
+        for term in terms:
+            queryset = queryset.filter(Q(title_index__contains=term) | Q(body_index__contains=term))
+        if document_type:
+            queryset = queryset.filter(document_type=document_type)
+        return queryset
+
+    def count(self, terms, document_type=None):
+        return self._queryset(terms, document_type).count()
+
+    def search(self, terms, offset, limit, document_type=None):
+        title_match = Q()
+        for term in terms:
+            title_match &= Q(title_index__contains=term)
+
+        return list(
+            self._queryset(terms, document_type).annotate(
+                title_rank=Case(
+                    When(title_match, then=Value(1)),
+                    default=Value(0),
+                    output_field=IntegerField()
+                )
+            ).order_by('-title_rank', '-date').values_list('id', flat=True)[offset:offset + limit]
+        )
+
+
+class SQLiteFTSBackend(BaseSearchBackend):
+    """فهرس FTS5 مقلوب في SQLite مع ترتيب BM25 (العنوان أثقل وزناً)"""
+
+    name = 'sqlite_fts5'
+    TABLE = 'core_searchdocument_fts'
+    TITLE_WEIGHT = 10.0
+    BODY_WEIGHT = 1.0
+
+    def _match(self, terms):
+        # كل كلمة بين علامتي تنصيص لتجنب تفسير رموز FTS5 الخاصة
+        return ' '.join('"{}"'.format(term.replace('"', '""')) for term in terms)
+
+    def _where(self, terms, document_type):
+        sql = f'{self.TABLE} MATCH %s'
+        params = [self._match(terms)]
+        if document_type:
+            sql += ' AND d.document_type = %s'
+            params.append(document_type)
+        return sql, params
+
+    def count(self, terms, document_type=None):
+        where, params = self._where(terms, document_type)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT COUNT(*) FROM {self.TABLE} '
+                f'JOIN core_searchdocument d ON d.id = {self.TABLE}.rowid WHERE {where}',
+                params
+            )
+            return cursor.fetchone()[0]
+
+    def search(self, terms, offset, limit, document_type=None):
+        where, params = self._where(terms, document_type)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT d.id FROM {self.TABLE} '
+                f'JOIN core_searchdocument d ON d.id = {self.TABLE}.rowid WHERE {where} '
+                f'ORDER BY bm25({self.TABLE}, %s, %s), d.date DESC LIMIT %s OFFSET %s',
+                params + [self.TITLE_WEIGHT, self.BODY_WEIGHT, limit, offset]
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+class PostgresSearchBackend(BaseSearchBackend):
+    """بحث tsvector في PostgreSQL باستخدام فهرس GIN على نفس التعبير"""
+
+    name = 'postgres'
+
+    VECTOR = (
+        "setweight(to_tsvector('simple', d.title_index), 'A') || "
+        "setweight(to_tsvector('simple', d.body_index), 'B')"
+    )
+
+    def _where(self, terms, document_type):
+        sql = f"({self.VECTOR}) @@ to_tsquery('simple', %s)"
+        params = [' & '.join(term.replace("'", "''") for term in terms)]
+        if document_type:
+            sql += ' AND d.document_type = %s'
+            params.append(document_type)
+        return sql, params
+
+    def count(self, terms, document_type=None):
+        where, params = self._where(terms, document_type)
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT COUNT(*) FROM core_searchdocument d WHERE {where}', params)
+            return cursor.fetchone()[0]
+
+    def search(self, terms, offset, limit, document_type=None):
+        where, params = self._where(terms, document_type)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT d.id FROM core_searchdocument d WHERE {where} "
+                f"ORDER BY ts_rank({self.VECTOR}, to_tsquery('simple', %s)) DESC, d.date DESC "
+                f"LIMIT %s OFFSET %s",
+                params + [params[0], limit, offset]
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+_backend = None
+
+
+def sqlite_fts_available():
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s",
+            [SQLiteFTSBackend.TABLE]
+        )
+        return cursor.fetchone() is not None
+
+
+def get_backend():
+    """اختيار محرك البحث حسب الإعداد أو نوع قاعدة البيانات"""
+    global _backend
+    if _backend is not None:
+        return _backend
+
+    name = getattr(settings, 'SEARCH_BACKEND', 'auto')
+    if name == 'auto':
+        if connection.vendor == 'sqlite' and sqlite_fts_available():
+            name = SQLiteFTSBackend.name
+        elif connection.vendor == 'postgresql':
+            name = PostgresSearchBackend.name
+        else:
+            name = SimpleSearchBackend.name
+
+    backends = {
+        backend.name: backend
+        for backend in (SimpleSearchBackend, SQLiteFTSBackend, PostgresSearchBackend)
+    }
+    _backend = backends[name]()
+    return _backend
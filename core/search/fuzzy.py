@@ -0,0 +1,164 @@
+# core/search/fuzzy.py
+
+from django.conf import settings
+from django.db.models import Count
+
+from core.models import SearchDocument, SearchTrigram
+from .analyzer import tokenize
+
+MIN_WORD_LENGTH = 3
+CANDIDATE_LIMIT = 200
+
+
+def word_trigrams(word):
+    """المقاطع الثلاثية لكلمة مع حشو المسافات (مثل pg_trgm) لترجيح بداية الكلمة"""
+    padded = f'  {word} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def strip_article(word):
+    # "البخاري" و"بخاري" كلمة واحدة في المطابقة التقريبية
+    if word.startswith('ال') and len(word) > MIN_WORD_LENGTH + 1:
+        return word[2:]
+    return word
+
+
+def fuzzy_words(text):
+    """الكلمات المطبعة القابلة للمطابقة التقريبية (بدون تجذيع ولا تكرار)"""
+    return list(dict.fromkeys(
+        strip_article(word) for word in tokenize(text) if len(word) >= MIN_WORD_LENGTH
+    ))
+
+
+def text_trigrams(text):
+    trigrams = set()
+    for word in fuzzy_words(text):
+        trigrams |= word_trigrams(word)
+    return trigrams
+
+
+def max_distance(word):
+    """عدد الأخطاء المسموح بها حسب طول الكلمة"""
+    return 1 if len(word) <= 5 else 2
+
+
+def bounded_levenshtein(a, b, limit):
+    """مسافة التحرير بين كلمتين، أو limit + 1 بمجرد تجاوز الحد
+
+    يُحسب شريط عرضه 2 * limit + 1 حول القطر فقط، ويتوقف الحساب
+    عندما تتجاوز كل خلايا الصف الحد.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    if a == b:
+        return 0
+
+    over = limit + 1
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        start = max(1, i - limit)
+        end = min(len(b), i + limit)
+        current = [over] * (len(b) + 1)
+        if start == 1:
+            current[0] = i
+        row_min = current[0] if start == 1 else over
+        char = a[i - 1]
+        for j in range(start, end + 1):
+            cost = previous[j - 1] + (char != b[j - 1])
+            if previous[j] + 1 < cost:
+                cost = previous[j] + 1
+            if current[j - 1] + 1 < cost:
+                cost = current[j - 1] + 1
+            current[j] = cost
+            if cost < row_min:
+                row_min = cost
+        if row_min > limit:
+            return over
+        previous = current
+    return min(previous[len(b)], over)
+
+
+class FuzzySearch:
+    """بحث تقريبي يتحمل الأخطاء الإملائية
+
+    المرشحون يُجلبون من فهرس المقاطع الثلاثية (تجميع واحد على الفهرس)،
+    ثم تُقارن كلمات الاستعلام بكلمات كل مرشح بمسافة تحرير محدودة.
+    """
+
+    def search(self, query, document_type=None, exclude=(), limit=50):
+        """معرفات الوثائق مرتبة حسب التشابه"""
+        words = fuzzy_words(query)
+        if not words:
+            return []
+
+        candidates = self.candidates(words, document_type, exclude)
+        if not candidates:
+            return []
+
+        terms = dict(
+            SearchDocument.objects.filter(pk__in=candidates).values_list('id', 'fuzzy_terms')
+        )
+
+        scored = []
+        for document_id, shared in candidates.items():
+            score = self.score(words, terms.get(document_id, '').split())
+            if score:
+                scored.append((score, shared, document_id))
+
+        scored.sort(reverse=True)
+        return [document_id for _, _, document_id in scored[:limit]]
+
+    def candidates(self, words, document_type=None, exclude=()):
+        """الوثائق التي تشترك مع الاستعلام في عدد كافٍ من المقاطع الثلاثية"""
+        trigrams = set()
+        for word in words:
+            trigrams |= word_trigrams(word)
+
+        # كل خطأ يُفسد ثلاثة مقاطع على الأكثر
+        min_shared = max(1, min(
+            len(word_trigrams(word)) - 3 * max_distance(word) for word in words
+        ))
+
+        queryset = SearchTrigram.objects.filter(trigram__in=trigrams)
+        if document_type:
+            queryset = queryset.filter(document__document_type=document_type)
+        if exclude:
+            queryset = queryset.exclude(document_id__in=exclude)
+
+        rows = queryset.values('document_id').annotate(
+            shared=Count('id')
+        ).filter(shared__gte=min_shared).order_by('-shared')[:CANDIDATE_LIMIT]
+        return {row['document_id']: row['shared'] for row in rows}
+
+    def score(self, words, document_words):
+        """متوسط تشابه كلمات الاستعلام مع أقرب كلمة في الوثيقة
+
+        يجب أن تطابق نصف كلمات الاستعلام على الأقل (بحدود الأخطاء المسموحة).
+        """
+        total = 0.0
+        matched = 0
+        for word in words:
+            limit = max_distance(word)
+            best = limit + 1
+            for candidate in document_words:
+                distance = bounded_levenshtein(word, candidate, limit)
+                if distance < best:
+                    best = distance
+                    if best == 0:
+                        break
+            if best <= limit:
+                matched += 1
+                total += 1 - best / (len(word) + 1)
+
+        if matched * 2 < len(words):
+            return 0
+        return total / len(words)
+
+
+def get_min_results():
+    """عدد النتائج الدقيقة الذي يُفعّل دونه البحث التقريبي"""
+    return getattr(settings, 'SEARCH_FUZZY_MIN_RESULTS', 3)
+
+
+# إنشاء instance للاستخدام
+fuzzy_search = FuzzySearch()
@@ -0,0 +1,219 @@
+# core/search/index.py
+
+from django.core.cache import cache
+from django.db import transaction
+import logging
+
+from core.models import SearchDocument, SearchTrigram
+from .analyzer import analyze
+from .fuzzy import fuzzy_words, text_trigrams
+
+logger = logging.getLogger(__name__)
+
+
+CONTENT_VERSION_KEY = 'search:content-version'
+
+
+def get_content_version():
+    """إصدار محتوى البحث الحالي (جزء من مفاتيح نتائج البحث المخزنة)"""
+    version = cache.get(CONTENT_VERSION_KEY)
+    if version is None:
+        cache.add(CONTENT_VERSION_KEY, 1, timeout=None)
+        version = cache.get(CONTENT_VERSION_KEY, 1)
+    return version
+
+
+def bump_content_version():
+    """إبطال كل نتائج البحث المخزنة بعد تغير أي وثيقة"""
+    try:
+        cache.incr(CONTENT_VERSION_KEY)
+    except ValueError:
+        cache.add(CONTENT_VERSION_KEY, 2, timeout=None)
+
+
+def truncate(text, length=200):
+    text = text or ''
+    return text[:length] + '...' if len(text) > length else text
+
+
+class SearchIndex:
+    """صيانة وثائق البحث للمحتوى المنشور
+
+    كل نموذج قابل للبحث له دالة تبني حقول وثيقته، والوثيقة تُحذف
+    عندما يصبح الكائن غير منشور.
+    """
+
+    BATCH_SIZE = 500
+
+    def _models(self):
+        from content.models import Playlist, PlaylistItem
+        from blog.models import Post
+
+        return {
+            'playlist': Playlist,
+            'playlist_item': PlaylistItem,
+            'blog_post': Post,
+        }
+
+    def document_type_for(self, instance):
+        for document_type, model in self._models().items():
+            if isinstance(instance, model):
+                return document_type
+        return None
+
+    # === بناء الوثائق ===
+
+    def is_searchable(self, document_type, instance):
+        if document_type == 'playlist_item':
+            return instance.is_published and instance.playlist.is_published
+        return instance.is_published
+
+    def build_fields(self, document_type, instance):
+        tags = ''
+        if document_type == 'playlist':
+            title, body = instance.title, instance.description
+            summary = instance.description
+        elif document_type == 'playlist_item':
+            # أسماء العلامات تُفهرس مع نص العنصر
+            tags = ' '.join(item_tag.tag.name for item_tag in instance.playlistitemtag_set.all())
+            title, body = instance.title, f'{tags}\n{instance.content_text}'
+            summary = truncate(instance.content_text)
+        else:
+            title, body = instance.title, f'{instance.excerpt}\n{instance.content}'
+            summary = instance.excerpt or truncate(instance.content)
+
+        return {
+            'title': title,
+            'summary': summary or '',
+            'date': instance.created_at,
+            'title_index': analyze(title),
+            'body_index': analyze(body),
+            'fuzzy_terms': ' '.join(fuzzy_words(f'{title} {tags}')),
+        }
+
+    # === التحديث ===
+
+    def update(self, instance):
+        """تحديث وثيقة كائن واحد (أو حذفها إذا لم يعد قابلاً للبحث)"""
+        document_type = self.document_type_for(instance)
+        if document_type is None:
+            return
+
+        if not self.is_searchable(document_type, instance):
+            self.remove(instance)
+            return
+
+        document, _ = SearchDocument.objects.update_or_create(
+            document_type=document_type,
+            object_id=instance.pk,
+            defaults=self.build_fields(document_type, instance)
+        )
+        self.update_trigrams([document])
+        bump_content_version()
+
+    def remove(self, instance):
+        document_type = self.document_type_for(instance)
+        if document_type:
+            deleted, _ = SearchDocument.objects.filter(
+                document_type=document_type, object_id=instance.pk
+            ).delete()
+            if deleted:
+                bump_content_version()
+
+    def item_queryset(self, queryset):
+        return queryset.select_related('playlist').prefetch_related('playlistitemtag_set__tag')
+
+    def update_playlist_items(self, playlist):
+        """إعادة فهرسة عناصر قائمة تغيرت حالة نشرها"""
+        items = self.item_queryset(playlist.playlistitem_set.all())
+        if playlist.is_published:
+            self.index_queryset('playlist_item', items)
+        else:
+            SearchDocument.objects.filter(
+                document_type='playlist_item',
+                object_id__in=items.values('pk')
+            ).delete()
+            bump_content_version()
+
+    def update_tag_items(self, tag):
+        """إعادة فهرسة العناصر التي تحمل علامة تغير اسمها"""
+        from content.models import PlaylistItem
+
+        items = PlaylistItem.objects.filter(playlistitemtag__tag=tag)
+        return self.index_queryset('playlist_item', self.item_queryset(items))
+
+    def index_queryset(self, document_type, queryset):
+        """فهرسة مجمعة لمجموعة كائنات على دفعات"""
+        indexed = 0
+        batch = []
+        for instance in queryset.iterator(chunk_size=self.BATCH_SIZE):
+            if self.is_searchable(document_type, instance):
+                batch.append(instance)
+            if len(batch) >= self.BATCH_SIZE:
+                indexed += self._index_batch(document_type, batch)
+                batch = []
+        if batch:
+            indexed += self._index_batch(document_type, batch)
+        return indexed
+
+    def _index_batch(self, document_type, instances):
+        existing = dict(
+            SearchDocument.objects.filter(
+                document_type=document_type,
+                object_id__in=[instance.pk for instance in instances]
+            ).values_list('object_id', 'id')
+        )
+
+        to_create = []
+        to_update = []
+        for instance in instances:
+            document = SearchDocument(
+                document_type=document_type,
+                object_id=instance.pk,
+                **self.build_fields(document_type, instance)
+            )
+            if instance.pk in existing:
+                document.id = existing[instance.pk]
+                to_update.append(document)
+            else:
+                to_create.append(document)
+
+        with transaction.atomic():
+            SearchDocument.objects.bulk_create(to_create)
+            SearchDocument.objects.bulk_update(
+                to_update, ['title', 'summary', 'date', 'title_index', 'body_index', 'fuzzy_terms']
+            )
+            self.update_trigrams(to_create + to_update)
+        bump_content_version()
+        return len(instances)
+
+    def update_trigrams(self, documents):
+        """إعادة كتابة المقاطع الثلاثية لمجموعة وثائق"""
+        SearchTrigram.objects.filter(document__in=[d.pk for d in documents]).delete()
+
+        rows = []
+        for document in documents:
+            rows.extend(
+                SearchTrigram(trigram=trigram, document_id=document.pk)
+                for trigram in text_trigrams(document.fuzzy_terms)
+            )
+        SearchTrigram.objects.bulk_create(rows, batch_size=2000)
+
+    def rebuild(self):
+        """إعادة بناء الفهرس كاملاً"""
+        models = self._models()
+        SearchTrigram.objects.all().delete()
+        SearchDocument.objects.all().delete()
+
+        counts = {}
+        for document_type, model in models.items():
+            queryset = model.objects.all()
+            if document_type == 'playlist_item':
+                queryset = self.item_queryset(queryset)
+            counts[document_type] = self.index_queryset(document_type, queryset)
+        bump_content_version()
+        return counts
+
+
+# إنشاء instance للاستخدام
+search_index = SearchIndex()
@@ -0,0 +1,147 @@
+# core/search/results.py
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import translation
+import hashlib
+
+from core.models import SearchDocument
+from .analyzer import analyze_query, tokenize
+from .backends import get_backend
+from .fuzzy import fuzzy_search, get_min_results
+from .index import get_content_version
+
+
+class SearchResults:
+    """نتائج بحث كسولة تُجلب صفحة بصفحة من محرك البحث
+
+    تدعم len() والتقطيع فيعمل Paginator عليها مباشرة: استعلام عدّ واحد
+    واستعلام واحد للصفحة المطلوبة بدلاً من تحميل كل النتائج.
+
+    إذا قلت النتائج الدقيقة عن SEARCH_FUZZY_MIN_RESULTS تُلحق بها نتائج
+    البحث التقريبي (is_fuzzy) وتُحفظ المعرفات كاملة لأنها قليلة.
+
+    العدد ومعرفات كل صفحة تُخزن مؤقتاً بمفتاح يتضمن إصدار المحتوى، فأي
+    تعديل على وثيقة يُبطل كل النتائج المخزنة دون حذفها واحدة واحدة.
+    """
+
+    def __init__(self, query, document_type=None, backend=None, fuzzy=True):
+        self.query = query
+        self.terms = analyze_query(query)
+        self.document_type = document_type
+        self.backend = backend or get_backend()
+        self.fuzzy = fuzzy
+        self.is_fuzzy = False
+        self._count = None
+        self._ids = None
+        self._key_prefix = None
+
+    def cache_key(self, part):
+        if self._key_prefix is None:
+            # الاستعلام المطبع (بدون تجذيع) يحدد الكلمات الدقيقة والتقريبية معاً
+            signature = '|'.join([
+                ' '.join(tokenize(self.query)),
+                self.document_type or '',
+                translation.get_language() or '',
+                str(self.fuzzy),
+            ])
+            digest = hashlib.md5(signature.encode('utf-8')).hexdigest()
+            self._key_prefix = f'search:results:{get_content_version()}:{digest}'
+        return f'{self._key_prefix}:{part}'
+
+    def count(self):
+        if self._count is None:
+            if not self.terms:
+                self._count = 0
+                return self._count
+
+            cached = cache.get(self.cache_key('count'))
+            if cached is not None:
+                self._count, self.is_fuzzy, self._ids = cached
+                return self._count
+
+            self._count = self.backend.count(self.terms, self.document_type)
+            if self.fuzzy and self._count < get_min_results():
+                self._add_fuzzy_results()
+            cache.set(
+                self.cache_key('count'),
+                (self._count, self.is_fuzzy, self._ids),
+                settings.SEARCH_CACHE_TIMEOUT
+            )
+        return self._count
+
+    def _add_fuzzy_results(self):
+        exact_ids = self.backend.search(self.terms, 0, self._count, self.document_type) if self._count else []
+        fuzzy_ids = fuzzy_search.search(self.query, self.document_type, exclude=exact_ids)
+        if fuzzy_ids:
+            self.is_fuzzy = True
+            self._ids = list(exact_ids) + fuzzy_ids
+            self._count = len(self._ids)
+
+    def __len__(self):
+        return self.count()
+
+    def __bool__(self):
+        return self.count() > 0
+
+    def __iter__(self):
+        return iter(self[0:self.count()])
+
+    def __getitem__(self, key):
+        if isinstance(key, int):
+            results = self[key:key + 1]
+            if not results:
+                raise IndexError(key)
+            return results[0]
+
+        start = key.start or 0
+        stop = key.stop if key.stop is not None else self.count()
+        if not self.terms or stop <= start:
+            return []
+
+        if self.count() and self._ids is not None:
+            ids = self._ids[start:stop]
+        else:
+            key = self.cache_key(f'ids:{start}:{stop}')
+            ids = cache.get(key)
+            if ids is None:
+                ids = self.backend.search(self.terms, start, stop - start, self.document_type)
+                cache.set(key, ids, settings.SEARCH_CACHE_TIMEOUT)
+        return self.hydrate(ids)
+
+    def hydrate(self, ids):
+        """تحويل معرفات الوثائق إلى نتائج قابلة للعرض بنفس ترتيب الصلة"""
+        from content.models import Playlist, PlaylistItem
+        from blog.models import Post
+
+        documents = SearchDocument.objects.in_bulk(ids)
+        documents = [documents[pk] for pk in ids if pk in documents]
+
+        # الوثائق قد تتأخر عن حالة النشر (تحديث مجمع)، فلا يُعرض إلا المنشور
+        querysets = {
+            'playlist': Playlist.objects.filter(is_published=True).only('id', 'slug'),
+            'playlist_item': PlaylistItem.objects.filter(
+                is_published=True, playlist__is_published=True
+            ).select_related('playlist').only('id', 'slug', 'playlist__id', 'playlist__slug'),
+            'blog_post': Post.objects.filter(is_published=True).only('id', 'slug'),
+        }
+        objects = {}
+        for document_type, queryset in querysets.items():
+            object_ids = [d.object_id for d in documents if d.document_type == document_type]
+            if object_ids:
+                objects[document_type] = queryset.in_bulk(object_ids)
+
+        results = []
+        for document in documents:
+            obj = objects.get(document.document_type, {}).get(document.object_id)
+            if obj is None:
+                continue
+            results.append({
+                'type': document.document_type,
+                'object': obj,
+                'title': document.title,
+                'description': document.summary,
+                'url': obj.get_absolute_url(),
+                'date': document.date,
+            })
+        return results
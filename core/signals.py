@@ -0,0 +1,345 @@
+# core/signals.py
+
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from blog.models import Post
+from projects.models import Project
+from content.models import Playlist, PlaylistItem, Comment, Tag, PlaylistItemTag
+from content.utils.counters import counters_flushed
+from .dashboard_snapshot import dashboard_snapshot
+from .ads import ad_resolver
+from .models import Category, Newsletter, ContactMessage, Advertisement, SiteSettings
+from .page_cache import page_cache
+from .search import search_index
+from .search.autocomplete import autocomplete
+
+
+# === مساهمة كل كائن في عدادات لوحة التحكم ===
+
+def playlist_counters(state):
+    return {
+        'playlists_total': 1,
+        'playlists_published': int(bool(state['is_published'])),
+    }
+
+
+def item_counters(state):
+    counters = {
+        'items_total': 1,
+        'items_published': int(bool(state['is_published'])),
+    }
+    if state['content_type']:
+        counters[f"type:{state['content_type']}"] = 1
+    return counters
+
+
+def comment_counters(state):
+    return {
+        'comments_total': 1,
+        'comments_pending': int(not state['is_approved'] and not state['is_spam']),
+    }
+
+
+def newsletter_counters(state):
+    return {'subscribers_active': int(bool(state['is_active']))}
+
+
+def message_counters(state):
+    return {'messages_unread': int(not state['is_read'])}
+
+
+TRACKED_MODELS = {
+    Playlist: (('is_published', 'category_id'), playlist_counters),
+    PlaylistItem: (('is_published', 'content_type'), item_counters),
+    Comment: (('is_approved', 'is_spam'), comment_counters),
+    Newsletter: (('is_active',), newsletter_counters),
+    ContactMessage: (('is_read',), message_counters),
+}
+
+
+def get_state(instance):
+    fields, _ = TRACKED_MODELS[type(instance)]
+    # القراءة من __dict__ تتجنب تحميل الحقول المؤجلة
+    return {field: instance.__dict__.get(field) for field in fields}
+
+
+def apply_counters(counters, sign):
+    dashboard_snapshot.add(**{name: value * sign for name, value in counters.items()})
+
+
+# === التقاط الحالة السابقة ===
+
+def remember_state(sender, instance, **kwargs):
+    instance._dashboard_state = get_state(instance)
+
+
+def update_snapshot_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+
+    _, counters_for = TRACKED_MODELS[sender]
+    new_state = get_state(instance)
+    old_state = getattr(instance, '_dashboard_state', None)
+
+    if created:
+        apply_counters(counters_for(new_state), 1)
+    elif old_state is not None and old_state != new_state:
+        apply_counters(counters_for(old_state), -1)
+        apply_counters(counters_for(new_state), 1)
+
+    instance._dashboard_state = new_state
+
+    if sender is Playlist:
+        if created:
+            dashboard_snapshot.push_activity(dashboard_snapshot.playlist_activity(instance))
+        if new_state['is_published'] or (old_state and old_state['is_published']):
+            if created or old_state != new_state:
+                dashboard_snapshot.invalidate_categories()
+
+    elif sender is PlaylistItem and created:
+        dashboard_snapshot.add_month(instance.created_at, 'items')
+
+    elif sender is Comment and created:
+        dashboard_snapshot.push_activity(dashboard_snapshot.comment_activity(instance))
+
+    elif sender is Newsletter and created:
+        dashboard_snapshot.add_month(instance.subscribed_at, 'subscribers')
+
+    elif sender is ContactMessage and created:
+        dashboard_snapshot.push_activity(dashboard_snapshot.message_activity(instance))
+
+
+def update_snapshot_on_delete(sender, instance, **kwargs):
+    _, counters_for = TRACKED_MODELS[sender]
+    apply_counters(counters_for(get_state(instance)), -1)
+
+    if sender is PlaylistItem:
+        dashboard_snapshot.add(
+            total_views=-(instance.views_count or 0),
+            youtube_downloads=-(instance.youtube_downloads or 0),
+            soundcloud_downloads=-(instance.soundcloud_downloads or 0),
+        )
+    elif sender is Playlist and instance.is_published:
+        dashboard_snapshot.invalidate_categories()
+
+
+for model in TRACKED_MODELS:
+    post_init.connect(remember_state, sender=model, dispatch_uid=f'dashboard_state_{model.__name__}')
+    post_save.connect(update_snapshot_on_save, sender=model, dispatch_uid=f'dashboard_save_{model.__name__}')
+    post_delete.connect(update_snapshot_on_delete, sender=model, dispatch_uid=f'dashboard_delete_{model.__name__}')
+
+
+@receiver(post_save, sender=User)
+def update_users_on_save(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        dashboard_snapshot.add(users_total=1)
+
+
+@receiver(post_delete, sender=User)
+def update_users_on_delete(sender, instance, **kwargs):
+    dashboard_snapshot.add(users_total=-1)
+
+
+@receiver([post_save, post_delete], sender=Category)
+def update_categories_chart(sender, instance, **kwargs):
+    dashboard_snapshot.invalidate_categories()
+
+
+@receiver([post_save, post_delete], sender=Advertisement)
+def invalidate_active_ads(sender, instance, **kwargs):
+    ad_resolver.invalidate()
+
+
+# حقول عدادات العناصر -> (عداد الإجمالي، حقل التفاعل اليومي)
+ITEM_COUNTER_FIELDS = {
+    'views_count': ('total_views', 'views'),
+    'youtube_downloads': ('youtube_downloads', 'youtube_downloads'),
+    'soundcloud_downloads': ('soundcloud_downloads', 'soundcloud_downloads'),
+    'text_copies': (None, 'text_copies'),
+    'shares_count': (None, 'shares'),
+}
+
+
+@receiver(counters_flushed)
+def update_snapshot_engagement(sender, deltas, **kwargs):
+    """إضافة زيادات عدادات التفاعل المكتوبة إلى اللقطة"""
+    totals = {}
+    for fields in deltas.get('content.playlistitem', {}).values():
+        for field, value in fields.items():
+            totals[field] = totals.get(field, 0) + value
+
+    for field, value in totals.items():
+        total_name, daily_field = ITEM_COUNTER_FIELDS[field]
+        if total_name:
+            dashboard_snapshot.add(**{total_name: value})
+        dashboard_snapshot.add_daily(daily_field, value)
+
+
+# === فهرس البحث ===
+
+@receiver(post_init, sender=Playlist)
+def remember_playlist_published(sender, instance, **kwargs):
+    instance._search_published = instance.__dict__.get('is_published')
+
+
+@receiver(post_save, sender=Playlist)
+@receiver(post_save, sender=PlaylistItem)
+@receiver(post_save, sender=Post)
+def update_search_document(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+
+    search_index.update(instance)
+    autocomplete.update(instance)
+
+    if sender is Playlist:
+        # حالة نشر القائمة تحدد ظهور عناصرها في البحث
+        if instance._search_published != instance.is_published:
+            search_index.update_playlist_items(instance)
+            for item in instance.playlistitem_set.select_related('playlist'):
+                autocomplete.update(item)
+        instance._search_published = instance.is_published
+
+
+@receiver(post_delete, sender=Playlist)
+@receiver(post_delete, sender=PlaylistItem)
+@receiver(post_delete, sender=Post)
+def remove_search_document(sender, instance, **kwargs):
+    search_index.remove(instance)
+    autocomplete.remove(instance)
+
+
+@receiver(post_save, sender=PlaylistItemTag)
+@receiver(post_delete, sender=PlaylistItemTag)
+def update_item_tags_document(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    try:
+        search_index.update(instance.playlist_item)
+    except PlaylistItem.DoesNotExist:
+        # العنصر نفسه يُحذف (حذف متتالي)
+        pass
+
+
+@receiver(post_init, sender=Tag)
+def remember_tag_name(sender, instance, **kwargs):
+    instance._search_name = instance.__dict__.get('name')
+
+
+@receiver(post_save, sender=Tag)
+def update_tag_documents(sender, instance, created, raw=False, **kwargs):
+    # إعادة الفهرسة عند تغيير الاسم فقط (وليس عند تحديث عداد الاستخدام)
+    if raw:
+        return
+    if not created and instance._search_name != instance.name:
+        search_index.update_tag_items(instance)
+    instance._search_name = instance.name
+    autocomplete.update(instance)
+
+
+@receiver(post_delete, sender=Tag)
+def remove_tag_suggestion(sender, instance, **kwargs):
+    autocomplete.remove(instance)
+
+
+# === ذاكرة الصفحات: إبطال الصفحات المعتمدة على الكائن فقط ===
+
+# الحقول التي تغير ظهور الكائن أو ترتيبه في صفحات القوائم
+LISTING_FIELDS = {
+    Playlist: ('is_published', 'is_featured', 'category_id'),
+    Post: ('is_published', 'is_featured', 'published_at'),
+}
+
+
+def listing_state(instance):
+    return {field: instance.__dict__.get(field) for field in LISTING_FIELDS[type(instance)]}
+
+
+def remember_listing_state(sender, instance, **kwargs):
+    instance._listing_state = listing_state(instance)
+
+
+def listing_changed(instance, created):
+    changed = created or instance._listing_state != listing_state(instance)
+    instance._listing_state = listing_state(instance)
+    return changed
+
+
+for model in LISTING_FIELDS:
+    post_init.connect(remember_listing_state, sender=model, dispatch_uid=f'page_cache_state_{model.__name__}')
+
+
+@receiver(post_save, sender=Playlist)
+def purge_playlist_pages(sender, instance, created, raw=False, **kwargs):
+    keys = [f'playlist:{instance.pk}']
+    old_category = instance._listing_state.get('category_id')
+    if listing_changed(instance, created):
+        keys += ['playlist-list', f'category:{instance.category_id}', f'category:{old_category}']
+    page_cache.purge(*keys)
+
+
+@receiver(post_save, sender=Post)
+def purge_post_pages(sender, instance, created, raw=False, **kwargs):
+    keys = [f'post:{instance.pk}']
+    if listing_changed(instance, created):
+        keys.append('post-list')
+    page_cache.purge(*keys)
+
+
+@receiver(post_delete, sender=Playlist)
+def purge_deleted_playlist_pages(sender, instance, **kwargs):
+    page_cache.purge(f'playlist:{instance.pk}', 'playlist-list', f'category:{instance.category_id}')
+
+
+@receiver(post_delete, sender=Post)
+def purge_deleted_post_pages(sender, instance, **kwargs):
+    page_cache.purge(f'post:{instance.pk}', 'post-list')
+
+
+@receiver(post_init, sender=PlaylistItem)
+def remember_item_playlist(sender, instance, **kwargs):
+    instance._page_playlist_id = instance.__dict__.get('playlist_id')
+
+
+@receiver([post_save, post_delete], sender=PlaylistItem)
+def purge_item_pages(sender, instance, **kwargs):
+    # نقل العنصر لقائمة أخرى يغير صفحتي القائمتين
+    old_playlist = instance._page_playlist_id
+    page_cache.purge(
+        f'item:{instance.pk}', f'playlist:{instance.playlist_id}',
+        *([f'playlist:{old_playlist}'] if old_playlist else []),
+    )
+    instance._page_playlist_id = instance.playlist_id
+
+
+@receiver([post_save, post_delete], sender=Comment)
+def purge_comment_pages(sender, instance, **kwargs):
+    page_cache.purge(f'item:{instance.playlist_item_id}')
+
+
+@receiver([post_save, post_delete], sender=Tag)
+def purge_tag_pages(sender, instance, **kwargs):
+    page_cache.purge(f'tag:{instance.pk}', 'tags')
+
+
+@receiver([post_save, post_delete], sender=PlaylistItemTag)
+def purge_item_tag_pages(sender, instance, **kwargs):
+    page_cache.purge(f'tag:{instance.tag_id}', f'item:{instance.playlist_item_id}', 'tags')
+
+
+@receiver([post_save, post_delete], sender=Project)
+def purge_project_pages(sender, instance, **kwargs):
+    page_cache.purge('project-list')
+
+
+@receiver([post_save, post_delete], sender=Category)
+def purge_category_pages(sender, instance, **kwargs):
+    # التصنيفات تظهر في التنقل في كل الصفحات
+    page_cache.purge(f'category:{instance.pk}', 'nav')
+
+
+@receiver(post_save, sender=SiteSettings)
+def purge_site_settings_pages(sender, instance, **kwargs):
+    page_cache.purge('nav')
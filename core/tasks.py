@@ -0,0 +1,35 @@
+# core/tasks.py
+
+from celery import shared_task
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def compact_analytics_events():
+    """ضغط ملفات أحداث التحليلات الخام إلى التخزين العمودي اليومي"""
+    from .analytics import EventStore
+
+    result = EventStore().compact()
+    if result['files']:
+        logger.info(f"تم ضغط {result['events']} حدث من {result['files']} ملف")
+    return result
+
+
+@shared_task
+def rebuild_dashboard_snapshot():
+    """إعادة حساب لقطة لوحة التحكم كاملة لتصحيح أي انحراف في الزيادات"""
+    from .dashboard_snapshot import dashboard_snapshot
+
+    dashboard_snapshot.rebuild()
+    return {'status': 'success'}
+
+
+@shared_task
+def rebuild_autocomplete_index():
+    """إعادة بناء لقطة الإكمال التلقائي (تحدّث أوزان المشاهدات المكتوبة بالجملة)"""
+    from .search.autocomplete import autocomplete
+
+    count = autocomplete.rebuild()
+    return {'status': 'success', 'entries': count}
@@ -1,3 +1,124 @@
-from django.test import TestCase
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from unittest import mock
 
-# Create your tests here.
+from .conditional import conditional_page
+from .page_cache import cache_anonymous_page, page_cache
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'core-tests'}}
+
+
+class ViewMixin:
+    """عرض بسيط يعد مرات تنفيذه ويوسم صفحته بمفاتيح بديلة"""
+
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+        self.calls = 0
+
+    def view(self, request):
+        self.calls += 1
+        page_cache.add_keys(request, 'playlist:1', 'category:1')
+        return HttpResponse(f'render {self.calls}')
+
+    def get(self, view, path='/page/', **headers):
+        request = self.factory.get(path, **headers)
+        request.user = AnonymousUser()
+        return view(request)
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class PageCacheTests(ViewMixin, SimpleTestCase):
+    """إبطال الصفحات المخزنة برفع أجيال المفاتيح البديلة"""
+
+    def test_page_is_served_until_a_key_it_depends_on_is_purged(self):
+        view = cache_anonymous_page(self.view)
+
+        first = self.get(view)
+        self.assertEqual(first['X-Page-Cache'], 'MISS')
+
+        second = self.get(view)
+        self.assertEqual(second['X-Page-Cache'], 'HIT')
+        self.assertEqual(second.content, first.content)
+
+        page_cache.purge('playlist:2', 'post-list')
+        self.assertEqual(self.get(view)['X-Page-Cache'], 'HIT')
+        self.assertEqual(self.calls, 1)
+
+        page_cache.purge('playlist:1')
+        third = self.get(view)
+        self.assertEqual(third['X-Page-Cache'], 'MISS')
+        self.assertEqual(third.content, b'render 2')
+
+    def test_global_nav_key_purges_every_page(self):
+        view = cache_anonymous_page(self.view)
+        self.get(view, '/a/')
+        self.get(view, '/b/')
+
+        page_cache.purge('nav')
+
+        self.assertEqual(self.get(view, '/a/')['X-Page-Cache'], 'MISS')
+        self.assertEqual(self.get(view, '/b/')['X-Page-Cache'], 'MISS')
+        self.assertEqual(self.calls, 4)
+
+    def test_authenticated_requests_bypass_the_cache(self):
+        view = cache_anonymous_page(self.view)
+        request = self.factory.get('/page/')
+        request.user = mock.Mock(is_authenticated=True, pk=1)
+
+        self.assertFalse(view(request).has_header('X-Page-Cache'))
+        self.assertEqual(self.get(view)['X-Page-Cache'], 'MISS')
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class ConditionalPageTests(ViewMixin, SimpleTestCase):
+    """304 عند تطابق ETag و200 عند تغير الحالة أو الأجيال"""
+
+    def setUp(self):
+        super().setUp()
+        self.state = ('v1',)
+        self.view_func = conditional_page(self.freshness)(self.view)
+
+    def freshness(self, request):
+        if self.state is None:
+            return None
+        return ('playlist:1',), self.state
+
+    def test_matching_etag_is_answered_without_rendering(self):
+        first = self.get(self.view_func)
+        self.assertEqual(first.status_code, 200)
+        self.assertTrue(first['ETag'].startswith('W/"'))
+        self.assertIn('no-cache', first['Cache-Control'])
+
+        revalidated = self.get(self.view_func, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(revalidated.status_code, 304)
+        self.assertEqual(revalidated['ETag'], first['ETag'])
+        self.assertEqual(self.calls, 1)
+
+    def test_changed_state_or_purged_key_returns_a_fresh_page(self):
+        etag = self.get(self.view_func)['ETag']
+
+        self.state = ('v2',)
+        changed = self.get(self.view_func, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed['ETag'], etag)
+
+        etag = changed['ETag']
+        page_cache.purge('nav')
+        purged = self.get(self.view_func, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(purged.status_code, 200)
+        self.assertNotEqual(purged['ETag'], etag)
+        self.assertEqual(self.calls, 3)
+
+    def test_if_modified_since_alone_is_not_trusted(self):
+        response = self.get(self.view_func, HTTP_IF_MODIFIED_SINCE='Fri, 01 Jan 2100 00:00:00 GMT')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('Last-Modified'))
+
+    def test_unknown_state_falls_through_to_the_view(self):
+        self.state = None
+        response = self.get(self.view_func, HTTP_IF_NONE_MATCH='*')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('ETag'))
@@ -18,6 +18,7 @@ urlpatterns = [
 
     # البحث
     path(_('search/'), views.SearchView.as_view(), name='search'),
+    path('search/autocomplete/', views.autocomplete, name='search_autocomplete'),
 
     # النشرة الإخبارية
     path(_('newsletter/subscribe/'), views.NewsletterSubscribeView.as_view(), name='newsletter_subscribe'),
@@ -8,16 +8,27 @@ from django.contrib import messages
 from django.utils.translation import gettext_lazy as _
 from django.http import JsonResponse, Http404
 from django.core.paginator import Paginator
-from django.db.models import Q
 from django.utils import translation
 from django.conf import settings
+from django.core.cache import cache
 
 from .models import SiteSettings, Newsletter, ContactMessage
 from content.models import Playlist, PlaylistItem, Category
+from content.utils.sampling import random_sampler
 from blog.models import Post
 from projects.models import Project
 from django.views import View
 from django.http import HttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+import json
+
+from .analytics import analytics_spool, build_records, MAX_BODY_SIZE
+from .search import SearchResults
+from .search.autocomplete import autocomplete as autocomplete_index
+from .page_cache import cache_anonymous_page, page_cache
+from content.utils.counters import engagement_counter
+from django.utils.decorators import method_decorator
 
 
 
@@ -37,6 +48,7 @@ except AttributeError:
         LANGUAGE_SESSION_KEY = '_language'
 
 
+@method_decorator(cache_anonymous_page, name='dispatch')
 class HomeView(TemplateView):
     """الصفحة الرئيسية"""
     template_name = 'core/home.html'
@@ -58,6 +70,14 @@ class HomeView(TemplateView):
             is_active=True
         ).order_by('order', 'name')[:6]
         
+        # اكتشف: قوائم عشوائية غير المعروضة أعلاه
+        shown = {playlist.pk for playlist in context['featured_playlists']}
+        shown.update(playlist.pk for playlist in context['recent_playlists'])
+        context['discover_playlists'] = random_sampler.sample(
+            Playlist.objects.filter(is_published=True).select_related('category'),
+            4, 'published-playlists', exclude=shown
+        )
+        
         # آخر منشورات المدونة
         context['recent_posts'] = Post.objects.filter(
             is_published=True
@@ -69,6 +89,14 @@ class HomeView(TemplateView):
             is_featured=True
         ).order_by('-created_at')[:3]
         
+        page_cache.add_keys(
+            self.request, 'playlist-list', 'post-list', 'project-list',
+            *(f'playlist:{playlist.pk}' for playlist in context['featured_playlists']),
+            *(f'playlist:{playlist.pk}' for playlist in context['recent_playlists']),
+            *(f'playlist:{playlist.pk}' for playlist in context['discover_playlists']),
+            *(f'post:{post.pk}' for post in context['recent_posts'])
+        )
+        
         return context
 
 
@@ -136,65 +164,8 @@ class SearchView(ListView):
         if not query:
             return []
         
-        # البحث في قوائم التشغيل
-        playlists = Playlist.objects.filter(
-            Q(title__icontains=query) |
-            Q(description__icontains=query),
-            is_published=True
-        ).select_related('category')
-        
-        # البحث في عناصر قوائم التشغيل
-        playlist_items = PlaylistItem.objects.filter(
-            Q(title__icontains=query) |
-            Q(content_text__icontains=query),
-            is_published=True,
-            playlist__is_published=True
-        ).select_related('playlist', 'playlist__category')
-        
-        # البحث في منشورات المدونة
-        blog_posts = Post.objects.filter(
-            Q(title__icontains=query) |
-            Q(content__icontains=query) |
-            Q(excerpt__icontains=query),
-            is_published=True
-        ).select_related('author')
-        
-        # دمج النتائج
-        results = []
-        for playlist in playlists:
-            results.append({
-                'type': 'playlist',
-                'object': playlist,
-                'title': playlist.title,
-                'description': playlist.description,
-                'url': playlist.get_absolute_url(),
-                'date': playlist.created_at,
-            })
-        
-        for item in playlist_items:
-            results.append({
-                'type': 'playlist_item',
-                'object': item,
-                'title': item.title,
-                'description': item.content_text[:200] + '...' if item.content_text else '',
-                'url': item.get_absolute_url(),
-                'date': item.created_at,
-            })
-        
-        for post in blog_posts:
-            results.append({
-                'type': 'blog_post',
-                'object': post,
-                'title': post.title,
-                'description': post.excerpt or (post.content[:200] + '...'),
-                'url': post.get_absolute_url(),
-                'date': post.created_at,
-            })
-        
-        # ترتيب النتائج حسب التاريخ
-        results.sort(key=lambda x: x['date'], reverse=True)
-        
-        return results
+        # نتائج مرتبة بالصلة تُجلب صفحة بصفحة من فهرس البحث
+        return SearchResults(query)
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -205,10 +176,28 @@ class SearchView(ListView):
             {'title': _('الرئيسية'), 'url': '/'},
             {'title': _('البحث'), 'url': None}
         ]
-        context['total_results'] = len(self.get_queryset()) if query else 0
+        context['total_results'] = context['paginator'].count if query else 0
+        # النتائج تشمل مطابقات تقريبية لأخطاء إملائية محتملة
+        context['is_fuzzy'] = bool(query) and getattr(self.object_list, 'is_fuzzy', False)
         return context
 
 
+def autocomplete(request):
+    """اقتراحات البحث أثناء الكتابة من فهرس البادئات في الذاكرة"""
+    query = request.GET.get('q', '').strip()[:100]
+    try:
+        limit = min(max(int(request.GET.get('limit', 8)), 1), 20)
+    except ValueError:
+        limit = 8
+
+    response = JsonResponse({
+        'query': query,
+        'suggestions': autocomplete_index.search(query, limit) if query else [],
+    })
+    response['Cache-Control'] = 'public, max-age=60'
+    return response
+
+
 class NewsletterSubscribeView(TemplateView):
     """الاشتراك في النشرة الإخبارية"""
     
@@ -358,3 +347,75 @@ def switch_language(request):
         return response
     
     return HttpResponseRedirect(next_url)
+
+
+# النماذج التي تُسجل مشاهداتها من المتصفح
+HIT_MODELS = {
+    'playlist': Playlist,
+    'playlist_item': PlaylistItem,
+    'post': Post,
+}
+
+# مدة تذكر أن الكائن منشور (ثواني) حتى لا تقرأ كل مشاهدة قاعدة البيانات
+HIT_TARGET_TIMEOUT = 300
+
+
+def is_hit_target(model, object_id):
+    """هل المعرف لكائن منشور؟ النتائج الإيجابية فقط تُخزن مؤقتاً
+
+    المعرفات العشوائية لا تنشئ مفاتيح في الذاكرة المؤقتة، فلا تزاحم
+    عداداتها ومفاتيح صفحاتها.
+    """
+    if not 0 < object_id <= engagement_counter.MAX_PK:
+        return False
+
+    key = f'hit-target:{model._meta.label_lower}:{object_id}'
+    if cache.get(key):
+        return True
+    if not model.objects.filter(pk=object_id, is_published=True).exists():
+        return False
+    cache.set(key, 1, HIT_TARGET_TIMEOUT)
+    return True
+
+
+@csrf_exempt
+@require_POST
+def record_hit(request):
+    """تسجيل مشاهدة صفحة (تعمل أيضاً مع الصفحات المعروضة من ذاكرة الصفحات)
+
+    زيادة واحدة في عدادات التفاعل المجمعة؛ التحقق من أن الكائن منشور
+    يُقرأ من الذاكرة المؤقتة بعد أول مشاهدة.
+    """
+    model = HIT_MODELS.get(request.POST.get('type'))
+    try:
+        object_id = int(request.POST.get('id', ''))
+    except ValueError:
+        return HttpResponse(status=400)
+    if model is None:
+        return HttpResponse(status=400)
+    if not is_hit_target(model, object_id):
+        return HttpResponse(status=404)
+
+    engagement_counter.increment_pk(model, object_id, 'views_count')
+    return HttpResponse(status=204)
+
+
+@csrf_exempt
+@require_POST
+def collect_analytics(request):
+    """استقبال دفعات أحداث التحليلات من navigator.sendBeacon
+
+    لا كتابة على القرص هنا: الدفعة تُوضع في طابور غير حاجب وتعود الاستجابة فوراً.
+    """
+    if len(request.body) > MAX_BODY_SIZE:
+        return HttpResponse(status=413)
+
+    try:
+        payload = json.loads(request.body)
+    except ValueError:
+        return HttpResponse(status=400)
+
+    if isinstance(payload, dict):
+        analytics_spool.submit(build_records(payload, request))
+
+    return HttpResponse(status=204)
@@ -47,6 +47,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.middleware.ActivityTrackingMiddleware',  # إحصائيات النشاط المباشر
 ]
 
 ROOT_URLCONF = 'multimedia_cms.urls'
@@ -64,6 +65,7 @@ TEMPLATES = [
                 'django.contrib.messages.context_processors.messages',
                 'django.template.context_processors.i18n',  # للغات المتعددة
                 'core.context_processors.site_settings',  # إعدادات الموقع العامة
+                'core.context_processors.ads_context',  # الإعلانات حسب الموضع
             ],
         },
     },
@@ -153,6 +155,57 @@ EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='')
 CELERY_BROKER_URL = config('CELERY_BROKER_URL', default='redis://localhost:6379')
 CELERY_RESULT_BACKEND = config('CELERY_RESULT_BACKEND', default='redis://localhost:6379')
 
+# Cache Configuration (ذاكرة مشتركة بين العمليات)
+# عند تحديد CACHE_URL يتم استخدام Redis، وإلا ذاكرة محلية للتطوير
+CACHE_URL = config('CACHE_URL', default='')
+
+if CACHE_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'multimedia-cms',
+            'OPTIONS': {
+                'MAX_ENTRIES': 10000,
+            },
+        }
+    }
+
+# عدادات التفاعل (المشاهدات والتحميلات) - تخزين مؤقت ثم كتابة مجمعة
+ENGAGEMENT_COUNTER_FLUSH_INTERVAL = config('ENGAGEMENT_COUNTER_FLUSH_INTERVAL', default=60, cast=int)  # ثواني
+
+# لقطة لوحة التحكم: فترة إعادة الحساب الكامل (ثواني)
+DASHBOARD_SNAPSHOT_REFRESH_INTERVAL = config('DASHBOARD_SNAPSHOT_REFRESH_INTERVAL', default=600, cast=int)
+
+# ذاكرة الصفحات الكاملة للزوار غير المسجلين (ثواني)، وتُبطل فوراً بالمفاتيح البديلة
+PAGE_CACHE_TIMEOUT = config('PAGE_CACHE_TIMEOUT', default=300, cast=int)
+
+# النشاط المباشر (نوافذ زمنية بالدقائق)
+ACTIVITY_ONLINE_WINDOW = config('ACTIVITY_ONLINE_WINDOW', default=5, cast=int)
+ACTIVITY_SESSION_WINDOW = config('ACTIVITY_SESSION_WINDOW', default=30, cast=int)
+
+# التحليلات: مجلد الأحداث الخام والتخزين العمودي المضغوط
+ANALYTICS_ROOT = config('ANALYTICS_ROOT', default=str(BASE_DIR / 'analytics_data'))
+
+# محرك البحث: auto (FTS5 في SQLite أو tsvector في PostgreSQL) أو simple
+SEARCH_BACKEND = config('SEARCH_BACKEND', default='auto')
+
+# البحث التقريبي بالمقاطع الثلاثية يُفعّل عندما تقل النتائج الدقيقة عن هذا العدد
+SEARCH_FUZZY_MIN_RESULTS = config('SEARCH_FUZZY_MIN_RESULTS', default=3, cast=int)
+
+# مدة تخزين معرفات نتائج البحث (ثواني)، وتُبطل فوراً عند تغير المحتوى
+SEARCH_CACHE_TIMEOUT = config('SEARCH_CACHE_TIMEOUT', default=600, cast=int)
+
+# التوصيات: عدد الجيران المحفوظ لكل عنصر ووزن الشعبية في الدرجة (0 = تشابه العلامات فقط)
+RECOMMENDATIONS_TOP_K = config('RECOMMENDATIONS_TOP_K', default=8, cast=int)
+RECOMMENDATIONS_POPULARITY_WEIGHT = config('RECOMMENDATIONS_POPULARITY_WEIGHT', default=0.2, cast=float)
+
 # SEO Settings
 META_SITE_PROTOCOL = 'https'
 META_SITE_DOMAIN = config('SITE_DOMAIN', default='localhost:8000')
@@ -173,9 +226,53 @@ SOCIAL_MEDIA = {
 
 # API Keys (يتم إدخالها من خلال admin dashboard)
 YOUTUBE_API_KEY = config('YOUTUBE_API_KEY', default='')
+# عنوان YouTube Data API (يُغير لخادم محلي بديل عند القياس)
+YOUTUBE_API_BASE_URL = config('YOUTUBE_API_BASE_URL', default='https://www.googleapis.com/youtube/v3')
 SOUNDCLOUD_CLIENT_ID = config('SOUNDCLOUD_CLIENT_ID', default='')
 TELEGRAM_BOT_TOKEN = config('TELEGRAM_BOT_TOKEN', default='')
 
+# حدود معدل طلبات مزودي الوسائط (طلب/ثانية) مشتركة بين العمال عبر الذاكرة المؤقتة
+MEDIA_RATE_LIMITS = {
+    'youtube': config('YOUTUBE_RATE_LIMIT', default=5, cast=float),
+    'soundcloud': config('SOUNDCLOUD_RATE_LIMIT', default=2, cast=float),
+    'media-download': config('MEDIA_DOWNLOAD_RATE_LIMIT', default=10, cast=float),
+}
+
+# عدد الخيوط المتزامنة لجلب معلومات الوسائط وصورها
+MEDIA_FETCH_WORKERS = config('MEDIA_FETCH_WORKERS', default=8, cast=int)
+
+# مخزن معلومات الوسائط (ثواني): الصلاحية، فترة خدمة النسخة القديمة مع التحديث
+# في الخلفية، صلاحية السجل السلبي، وأقصى انتظار لجلب يقوم به طلب آخر
+MEDIA_METADATA_TTL = config('MEDIA_METADATA_TTL', default=6 * 60 * 60, cast=int)
+MEDIA_METADATA_STALE_TTL = config('MEDIA_METADATA_STALE_TTL', default=7 * 24 * 60 * 60, cast=int)
+MEDIA_METADATA_NEGATIVE_TTL = config('MEDIA_METADATA_NEGATIVE_TTL', default=60 * 60, cast=int)
+MEDIA_METADATA_WAIT = config('MEDIA_METADATA_WAIT', default=5, cast=float)
+
+# جدولة مزامنة الوسائط (ثواني): الفترة الأساسية بين مزامنتين، أقصاها للمحتوى
+# الذي لا يتغير، الفترة للعناصر الحديثة (أحدث من MEDIA_SYNC_RECENT_DAYS يوماً)
+# وأول إعادة محاولة بعد الفشل (تتضاعف مع تكرار الفشل)
+MEDIA_SYNC_INTERVAL = config('MEDIA_SYNC_INTERVAL', default=7 * 24 * 60 * 60, cast=int)
+MEDIA_SYNC_MAX_INTERVAL = config('MEDIA_SYNC_MAX_INTERVAL', default=60 * 24 * 60 * 60, cast=int)
+MEDIA_SYNC_RECENT_INTERVAL = config('MEDIA_SYNC_RECENT_INTERVAL', default=24 * 60 * 60, cast=int)
+MEDIA_SYNC_RECENT_DAYS = config('MEDIA_SYNC_RECENT_DAYS', default=30, cast=int)
+MEDIA_SYNC_RETRY = config('MEDIA_SYNC_RETRY', default=60 * 60, cast=int)
+
+# ميزانية كل تشغيل لمزامنة الوسائط بوحدات طلبات المزود (طلب YouTube يغطي 50 فيديو)
+MEDIA_SYNC_BUDGET = {
+    'youtube': config('YOUTUBE_SYNC_BUDGET', default=100, cast=int),
+    'soundcloud': config('SOUNDCLOUD_SYNC_BUDGET', default=500, cast=int),
+}
+
+# عميل HTTP الخارجي: مجمع اتصالات لكل مضيف، إعادة المحاولة، المهل، حد التزامن لكل مضيف
+HTTP_POOL_HOSTS = config('HTTP_POOL_HOSTS', default=20, cast=int)
+HTTP_POOL_SIZE = config('HTTP_POOL_SIZE', default=10, cast=int)
+HTTP_MAX_PER_HOST = config('HTTP_MAX_PER_HOST', default=10, cast=int)
+HTTP_RETRIES = config('HTTP_RETRIES', default=2, cast=int)
+HTTP_RETRY_BACKOFF = config('HTTP_RETRY_BACKOFF', default=0.5, cast=float)
+HTTP_CONNECT_TIMEOUT = config('HTTP_CONNECT_TIMEOUT', default=5, cast=float)
+HTTP_READ_TIMEOUT = config('HTTP_READ_TIMEOUT', default=15, cast=float)
+HTTP_USER_AGENT = config('HTTP_USER_AGENT', default='multimedia-cms/1.0')
+
 # Security Settings
 if not DEBUG:
     SECURE_BROWSER_XSS_FILTER = True
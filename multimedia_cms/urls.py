@@ -31,12 +31,19 @@ from django.conf.urls.static import static
 from django.conf.urls.i18n import i18n_patterns
 from django.utils.translation import gettext_lazy as _
 
+from core.admin_views import admin_dashboard_urls
+from core.views import collect_analytics, record_hit
+
 # URLs غير متعددة اللغات (للـ API وملفات الوسائط)
 urlpatterns = [
     # API URLs
 #temp    path('api/', include('content.api_urls')),  # سيتم إنشاؤها لاحقاً
     
+    # استقبال أحداث التحليلات (sendBeacon)
+    path('analytics/collect/', collect_analytics, name='analytics_collect'),
+    
     # AJAX URLs
+    path('ajax/hit/', record_hit, name='record_hit'),
 #temp    path('ajax/', include('core.ajax_urls')),  # سيتم إنشاؤها لاحقاً
     
     # Sitemap والـ RSS
@@ -44,6 +51,9 @@ urlpatterns = [
 #temp    path('rss/', include('core.rss_urls')),  # سيتم إنشاؤها لاحقاً
 ]
 
+# لوحة التحكم المخصصة وإحصائياتها المباشرة
+urlpatterns += admin_dashboard_urls
+
 # URLs متعددة اللغات
 urlpatterns += i18n_patterns(
     # لوحة الإدارة
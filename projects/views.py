@@ -5,8 +5,8 @@
 
 from django.shortcuts import render, get_object_or_404
 from django.views.generic import ListView, DetailView
-from django.db.models import F
 from .models import Project
+from content.utils.counters import engagement_counter
 
 class ProjectListView(ListView):
     model = Project
@@ -24,7 +24,8 @@ class ProjectDetailView(DetailView):
     
     def get_object(self):
         obj = get_object_or_404(Project, slug=self.kwargs['slug'], is_published=True)
-        Project.objects.filter(pk=obj.pk).update(views_count=F('views_count') + 1)
+        engagement_counter.increment(obj, 'views_count')
+        engagement_counter.apply_pending(obj)
         return obj
 class ProjectDetailView(DetailView):
     model = Project
@@ -8,6 +8,8 @@ class AdvancedMediaPlayer {
         this.isPlaying = false;
         this.autoPlay = false;
         this.shuffle = false;
+        this.shuffleOrder = []; // تبديلة مواضع القائمة للدورة الحالية
+        this.shufflePosition = 0;
         this.repeat = 'none'; // none, one, all
         this.volume = 1.0;
         this.playerElement = null;
@@ -24,6 +26,9 @@ class AdvancedMediaPlayer {
         // مشغل محلي للصوت
         this.audioElement = null;
         
+        // نسب التقدم المسجلة للمقطع الحالي (للتحليلات)
+        this.reportedMilestones = new Set();
+        
         this.init();
     }
 
@@ -244,11 +249,13 @@ class AdvancedMediaPlayer {
         switch (event.data) {
             case YT.PlayerState.PLAYING:
                 this.isPlaying = true;
+                this.trackEvent('play');
                 playIcon.className = 'bi bi-pause-fill';
                 this.startProgressUpdate();
                 break;
             case YT.PlayerState.PAUSED:
                 this.isPlaying = false;
+                this.trackEvent('pause');
                 playIcon.className = 'bi bi-play-fill';
                 this.stopProgressUpdate();
                 break;
@@ -307,6 +314,10 @@ class AdvancedMediaPlayer {
         
         this.audioElement.addEventListener('timeupdate', this.updateProgressBound);
         this.audioElement.addEventListener('ended', this.onTrackEndedBound);
+        this.audioElement.addEventListener('play', () => this.trackEvent('play'));
+        this.audioElement.addEventListener('pause', () => {
+            if (!this.audioElement.ended) this.trackEvent('pause');
+        });
         
         this.playerElement.innerHTML = `
             <div class="audio-visualizer">
@@ -407,6 +418,7 @@ class AdvancedMediaPlayer {
         if (duration > 0) {
             const percentage = (currentTime / duration) * 100;
             this.progressElement.style.width = percentage + '%';
+            this.trackProgress(percentage, currentTime);
             
             this.timeElement.textContent = this.formatTime(currentTime);
             this.durationElement.textContent = this.formatTime(duration);
@@ -425,6 +437,36 @@ class AdvancedMediaPlayer {
         this.durationElement.textContent = this.formatTime(duration);
     }
 
+    getCurrentPosition() {
+        if (this.playerType === 'youtube' && this.youtubePlayer && this.youtubePlayer.getCurrentTime) {
+            return this.youtubePlayer.getCurrentTime();
+        } else if (this.playerType === 'local' && this.audioElement) {
+            return this.audioElement.currentTime;
+        }
+        return 0;
+    }
+
+    // إرسال حدث تشغيل إلى نظام التحليلات (main.js)
+    trackEvent(event, value = 0, position = null) {
+        if (!window.Analytics || !this.currentItem) return;
+        
+        window.Analytics.track(event, {
+            itemId: this.currentItem.id,
+            position: position !== null ? position : this.getCurrentPosition(),
+            value: value
+        });
+    }
+
+    // تسجيل بلوغ 25% و50% و75% من المقطع مرة واحدة لكل تشغيل
+    trackProgress(percentage, currentTime) {
+        [25, 50, 75].forEach(milestone => {
+            if (percentage >= milestone && !this.reportedMilestones.has(milestone)) {
+                this.reportedMilestones.add(milestone);
+                this.trackEvent('progress', milestone, currentTime);
+            }
+        });
+    }
+
     startProgressUpdate() {
         this.stopProgressUpdate(); // تنظيف أي interval سابق
         this.progressInterval = setInterval(() => {
@@ -452,6 +494,7 @@ class AdvancedMediaPlayer {
         const shuffleBtn = document.getElementById('btn-shuffle');
         
         if (this.shuffle) {
+            this.buildShuffleOrder();
             shuffleBtn.classList.add('active');
             Utils.showAlert('تم تفعيل التشغيل العشوائي', 'info');
         } else {
@@ -488,11 +531,32 @@ class AdvancedMediaPlayer {
         }
     }
 
+    buildShuffleOrder() {
+        // تبديلة Fisher-Yates تبدأ بالمقطع الحالي: كل مقطع يُشغل مرة واحدة في الدورة
+        const order = this.playlist.map((_, index) => index).filter(index => index !== this.currentIndex);
+        for (let i = order.length - 1; i > 0; i--) {
+            const j = Math.floor(Math.random() * (i + 1));
+            [order[i], order[j]] = [order[j], order[i]];
+        }
+        this.shuffleOrder = [this.currentIndex, ...order];
+        this.shufflePosition = 0;
+    }
+
+    peekNextIndex() {
+        if (this.playlist.length === 0) return null;
+        if (this.shuffle) {
+            return this.shuffleOrder[this.shufflePosition + 1] ?? null;
+        }
+        return (this.currentIndex + 1) % this.playlist.length;
+    }
+
     previousTrack() {
         if (this.playlist.length === 0) return;
         
         if (this.shuffle) {
-            this.currentIndex = Math.floor(Math.random() * this.playlist.length);
+            if (this.shufflePosition === 0) return;
+            this.shufflePosition--;
+            this.currentIndex = this.shuffleOrder[this.shufflePosition];
         } else {
             this.currentIndex = (this.currentIndex - 1 + this.playlist.length) % this.playlist.length;
         }
@@ -504,7 +568,12 @@ class AdvancedMediaPlayer {
         if (this.playlist.length === 0) return;
         
         if (this.shuffle) {
-            this.currentIndex = Math.floor(Math.random() * this.playlist.length);
+            if (this.shufflePosition + 1 >= this.shuffleOrder.length) {
+                // نهاية الدورة: تبديلة جديدة
+                this.buildShuffleOrder();
+            }
+            this.shufflePosition++;
+            this.currentIndex = this.shuffleOrder[this.shufflePosition];
         } else {
             this.currentIndex = (this.currentIndex + 1) % this.playlist.length;
         }
@@ -514,6 +583,7 @@ class AdvancedMediaPlayer {
 
     onTrackEnded() {
         this.isPlaying = false;
+        this.trackEvent('progress', 100);
         this.updatePlayButton();
         
         switch (this.repeat) {
@@ -541,6 +611,7 @@ class AdvancedMediaPlayer {
         
         const track = this.playlist[this.currentIndex];
         this.currentItem = track;
+        this.reportedMilestones = new Set();
         
         // تحديث قائمة التشغيل المرئية
         this.updatePlaylistUI();
@@ -558,11 +629,54 @@ class AdvancedMediaPlayer {
         if (track.id) {
             this.recordView(track.id);
         }
+        
+        this.prefetchNextTrack();
+    }
+
+    prefetchNextTrack() {
+        // جلب الصورة المصغرة للمقطع التالي مسبقاً
+        const nextIndex = this.peekNextIndex();
+        const nextTrack = nextIndex !== null ? this.playlist[nextIndex] : null;
+        if (nextTrack && nextTrack.thumbnail) {
+            const image = new Image();
+            image.src = nextTrack.thumbnail;
+        }
+    }
+
+    static manifestToItems(manifest) {
+        // البيان يُرسل أعمدة (قائمة لكل حقل) فيُحوّل إلى عناصر
+        const columns = manifest.items;
+        return columns.id.map((id, index) => ({
+            id: id,
+            title: columns.title[index],
+            url: manifest.item_url.replace('{slug}', columns.slug[index]),
+            youtube_video_id: columns.youtube_video_id[index],
+            soundcloud_url: columns.soundcloud_url[index],
+            thumbnail: columns.thumbnail[index],
+            duration: columns.duration[index]
+        }));
+    }
+
+    async loadManifest(url, startItemId = null) {
+        // المتصفح يعيد التحقق بـ ETag فلا يُعاد إرسال البيان إذا لم يتغير
+        try {
+            const response = await fetch(url, { credentials: 'same-origin' });
+            if (!response.ok) throw new Error(response.status);
+            
+            const items = AdvancedMediaPlayer.manifestToItems(await response.json());
+            const startIndex = Math.max(0, items.findIndex(item => item.id === startItemId));
+            this.loadPlaylist(items, startIndex);
+        } catch (error) {
+            console.error('خطأ في تحميل بيان القائمة:', error);
+        }
     }
 
     loadPlaylist(items, startIndex = 0) {
         this.playlist = items;
         this.currentIndex = startIndex;
+        if (this.shuffle) {
+            this.buildShuffleOrder();
+        }
         this.updatePlaylistUI();
         
         if (items.length > 0) {
@@ -592,7 +706,7 @@ class AdvancedMediaPlayer {
                 </div>
                 <div class="track-info">
                     <div class="track-title">${track.title}</div>
-                    <div class="track-meta">${this.getTrackTypeIcon(track)} ${track.duration || ''}</div>
+                    <div class="track-meta">${this.getTrackTypeIcon(track)} ${track.duration ? this.formatTime(track.duration) : ''}</div>
                 </div>
                 <div class="track-actions">
                     <button class="btn-track-play" data-index="${index}">
@@ -603,19 +717,26 @@ class AdvancedMediaPlayer {
             
             // إضافة مستمع الحدث
             trackElement.querySelector('.btn-track-play').addEventListener('click', () => {
-                this.currentIndex = index;
-                this.playCurrentTrack();
+                this.playIndex(index);
             });
             
             trackElement.addEventListener('dblclick', () => {
-                this.currentIndex = index;
-                this.playCurrentTrack();
+                this.playIndex(index);
             });
             
             playlistContent.appendChild(trackElement);
         });
     }
 
+    playIndex(index) {
+        this.currentIndex = index;
+        if (this.shuffle) {
+            // اختيار مقطع يدوياً يبدأ دورة عشوائية جديدة منه
+            this.buildShuffleOrder();
+        }
+        this.playCurrentTrack();
+    }
+
     getTrackTypeIcon(track) {
         if (track.youtube_video_id) return '<i class="fab fa-youtube text-danger"></i>';
         if (track.soundcloud_url) return '<i class="fab fa-soundcloud text-warning"></i>';
@@ -750,6 +871,15 @@ class AdvancedMediaPlayer {
         window.advancedPlayer.autoPlay = true;
         window.advancedPlayer.loadPlaylist(items, startIndex);
     }
+
+    static loadManifest(url, startItemId = null) {
+        if (!window.advancedPlayer) {
+            window.advancedPlayer = new AdvancedMediaPlayer();
+        }
+        
+        window.advancedPlayer.autoPlay = true;
+        return window.advancedPlayer.loadManifest(url, startItemId);
+    }
 }
 
 // تهيئة المشغل عند تحميل الصفحة
@@ -293,34 +293,85 @@ const MediaPlayer = {
 
 // نظام البحث التفاعلي
 const SearchSystem = {
+    typeIcons: {
+        playlist: 'bi-collection-play',
+        playlist_item: 'bi-play-circle',
+        blog_post: 'bi-journal-text',
+        tag: 'bi-tag'
+    },
+
     init() {
         const searchInput = document.querySelector('input[name="q"]');
         if (searchInput) {
+            this.input = searchInput;
+            this.requestId = 0;
+            this.menu = document.createElement('div');
+            this.menu.className = 'dropdown-menu search-suggestions';
+            searchInput.parentElement.classList.add('position-relative');
+            searchInput.setAttribute('autocomplete', 'off');
+            searchInput.after(this.menu);
+
             // البحث أثناء الكتابة (debounced)
             let searchTimeout;
             searchInput.addEventListener('input', (e) => {
                 clearTimeout(searchTimeout);
                 searchTimeout = setTimeout(() => {
-                    this.performLiveSearch(e.target.value);
-                }, 500);
+                    this.performLiveSearch(e.target.value.trim());
+                }, 150);
+            });
+
+            document.addEventListener('click', (e) => {
+                if (!searchInput.parentElement.contains(e.target)) {
+                    this.hideSuggestions();
+                }
             });
         }
     },
 
     async performLiveSearch(query) {
-        if (query.length < 2) return;
+        const requestId = ++this.requestId;
+        if (query.length < 2) {
+            this.hideSuggestions();
+            return;
+        }
 
         try {
-            const response = await Utils.makeRequest(`/api/search/?q=${encodeURIComponent(query)}`);
-            this.displaySearchSuggestions(response.results);
+            const response = await Utils.makeRequest(`/search/autocomplete/?q=${encodeURIComponent(query)}`);
+            // تجاهل الردود المتأخرة لاستعلامات أقدم
+            if (requestId === this.requestId) {
+                this.displaySearchSuggestions(response.suggestions);
+            }
         } catch (error) {
             console.error('خطأ في البحث المباشر:', error);
         }
     },
 
     displaySearchSuggestions(results) {
-        // تنفيذ عرض اقتراحات البحث
-        console.log('نتائج البحث:', results);
+        this.menu.innerHTML = '';
+        if (!results || results.length === 0) {
+            this.hideSuggestions();
+            return;
+        }
+
+        results.forEach((result) => {
+            const link = document.createElement('a');
+            link.className = 'dropdown-item';
+            link.href = result.url;
+
+            const icon = document.createElement('i');
+            icon.className = `bi ${this.typeIcons[result.type] || 'bi-search'} me-2`;
+            link.appendChild(icon);
+            link.appendChild(document.createTextNode(result.label));
+            this.menu.appendChild(link);
+        });
+
+        this.menu.classList.add('show');
+    },
+
+    hideSuggestions() {
+        if (this.menu) {
+            this.menu.classList.remove('show');
+        }
     }
 };
 
@@ -431,15 +482,82 @@ const NewsletterSystem = {
 
 // نظام التحليلات والإحصائيات
 const Analytics = {
+    COLLECT_URL: '/analytics/collect/',
+    HIT_URL: '/ajax/hit/',
+    FLUSH_INTERVAL: 10000,
+    MAX_BATCH: 50,
+    queue: [],
+
     init() {
+        this.sessionId = this.getSessionId();
+
         // تسجيل مشاهدة الصفحة
         this.trackPageView();
         
         // تسجيل التفاعل مع المحتوى
         this.trackContentInteraction();
+
+        // إرسال الأحداث المتراكمة دورياً وعند مغادرة الصفحة
+        setInterval(() => this.flush(), this.FLUSH_INTERVAL);
+        window.addEventListener('pagehide', () => this.flush());
+    },
+
+    getSessionId() {
+        // معرف جلسة التصفح (ينتهي بإغلاق التبويب)
+        try {
+            let sid = sessionStorage.getItem('analytics_sid');
+            if (!sid) {
+                sid = Date.now().toString(36) + Math.random().toString(36).slice(2, 10);
+                sessionStorage.setItem('analytics_sid', sid);
+            }
+            return sid;
+        } catch (e) {
+            return null;
+        }
+    },
+
+    // إضافة حدث إلى الطابور: page_view, play, pause, progress, exit
+    track(event, data = {}) {
+        this.queue.push({
+            e: event,
+            t: Date.now(),
+            p: window.location.pathname,
+            i: data.itemId || null,
+            pos: data.position || 0,
+            v: data.value || 0
+        });
+
+        if (this.queue.length >= this.MAX_BATCH) {
+            this.flush();
+        }
+    },
+
+    flush() {
+        if (this.queue.length === 0) return;
+
+        const payload = JSON.stringify({
+            sid: this.sessionId,
+            now: Date.now(),
+            events: this.queue.splice(0, this.MAX_BATCH)
+        });
+
+        // sendBeacon لا يعطل الصفحة ويعمل أثناء مغادرتها
+        if (navigator.sendBeacon) {
+            navigator.sendBeacon(this.COLLECT_URL, new Blob([payload], {type: 'application/json'}));
+        } else {
+            fetch(this.COLLECT_URL, {
+                method: 'POST',
+                body: payload,
+                keepalive: true,
+                headers: {'Content-Type': 'application/json'}
+            }).catch(() => {});
+        }
     },
 
     trackPageView() {
+        this.track('page_view');
+        this.recordHit();
+
         // يمكن دمج Google Analytics أو أي نظام تحليلات آخر هنا
         if (typeof gtag !== 'undefined') {
             gtag('config', 'GA_MEASUREMENT_ID', {
@@ -449,6 +567,22 @@ const Analytics = {
         }
     },
 
+    // عداد مشاهدات المحتوى (الصفحة قد تكون معروضة من ذاكرة الصفحات)
+    recordHit() {
+        const { hitType, hitId } = document.body.dataset;
+        if (!hitType || !hitId) return;
+
+        const data = new FormData();
+        data.append('type', hitType);
+        data.append('id', hitId);
+
+        if (navigator.sendBeacon) {
+            navigator.sendBeacon(this.HIT_URL, data);
+        } else {
+            fetch(this.HIT_URL, {method: 'POST', body: data, keepalive: true}).catch(() => {});
+        }
+    },
+
     async trackContentInteraction() {
         // تسجيل الوقت المقضي في الصفحة
         let startTime = Date.now();
@@ -493,17 +627,10 @@ const Analytics = {
         }
     },
 
-    async sendTimeSpent(timeSpent) {
-        if (timeSpent > 5000) { // أكثر من 5 ثوانٍ
-            try {
-                await Utils.makeRequest('/api/analytics/time-spent/', 'POST', {
-                    time_spent: timeSpent,
-                    page: window.location.pathname
-                });
-            } catch (error) {
-                console.error('خطأ في تسجيل الوقت:', error);
-            }
-        }
+    sendTimeSpent(timeSpent) {
+        // حدث الخروج يحمل مدة البقاء بالثواني ويُرسل فوراً
+        this.track('exit', {value: Math.round(timeSpent / 1000)});
+        this.flush();
     }
 };
 
@@ -680,6 +807,7 @@ document.addEventListener('DOMContentLoaded', function() {
 // دوال مفيدة للاستخدام العام
 window.MediaPlayer = MediaPlayer;
 window.Utils = Utils;
+window.Analytics = Analytics;
 
 // معالجة الأخطاء العامة
 window.addEventListener('error', function(e) {
@@ -696,6 +824,9 @@ window.addEventListener('unhandledrejection', function(e) {
 setTimeout(() => {
     // تحميل Google Analytics إذا كان متاحاً
     if (typeof gtag !== 'undefined') {
-        Analytics.trackPageView();
+        gtag('config', 'GA_MEASUREMENT_ID', {
+            page_title: document.title,
+            page_location: window.location.href
+        });
     }
 }, 2000);